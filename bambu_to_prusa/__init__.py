@@ -1,6 +1,8 @@
 """Bambu to Prusa conversion utilities."""
 
+from .async_converter import AsyncConverter
 from .converter import BambuToPrusaConverter
+from .mesh import Mesh
 from .template_paths import get_template_paths
 
-__all__ = ["BambuToPrusaConverter", "get_template_paths"]
+__all__ = ["AsyncConverter", "BambuToPrusaConverter", "Mesh", "get_template_paths"]
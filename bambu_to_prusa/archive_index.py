@@ -0,0 +1,322 @@
+"""Index of the model members of a 3MF archive and the objects they place.
+
+Bambu Studio projects keep their meshes in ``3D/Objects/*.model`` and place
+them through the root ``3D/3dmodel.model``: each root build item instances a
+root object whose components point, through the production extension's
+``p:path``, at objects in the other members, possibly via nested root
+assemblies. :class:`ArchiveIndex` lists the model members from the central
+directory, parses the root model once and resolves component references
+lazily, starting from the build items, so only reachable objects are ever
+visited and each root object is resolved once however many items or
+components share it. The converter then opens only the members that hold
+reachable objects, each exactly once.
+
+The index also classifies every member from its name and central-directory
+entry alone, so sliced ``.gcode.3mf`` archives can be inspected, extracted
+selectively and sized up (see :class:`Preflight`) without decompressing
+their G-code, thumbnails or configuration blobs.
+"""
+
+from __future__ import annotations
+
+import logging
+import posixpath
+import zipfile
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import lxml.etree as ET
+
+from .file_ops import list_zip_members
+from .model_processing import BuildItems
+from .package_builder import MODELS_ARCDIR
+from .placement import Matrix, compose, format_transform, parse_transform
+
+ROOT_MODEL = "3D/3dmodel.model"
+
+# Member kinds, in the order summaries list them.
+ROOT_MEMBER = "root_model"
+MODEL_MEMBER = "model"
+PACKAGE_MEMBER = "package"
+METADATA_MEMBER = "metadata"
+THUMBNAIL_MEMBER = "thumbnail"
+GCODE_MEMBER = "gcode"
+OTHER_MEMBER = "other"
+MEMBER_KINDS = (
+    ROOT_MEMBER,
+    MODEL_MEMBER,
+    PACKAGE_MEMBER,
+    METADATA_MEMBER,
+    THUMBNAIL_MEMBER,
+    GCODE_MEMBER,
+    OTHER_MEMBER,
+)
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".svg")
+GCODE_SUFFIXES = (".gcode", ".gcode.md5", ".bgcode")
+PACKAGE_NAMES = frozenset({"[Content_Types].xml"})
+# Elements of the root model the index reads, and mesh elements it drops.
+ROOT_MODEL_TAGS = ("{*}object", "{*}item", "{*}vertex", "{*}triangle")
+MESH_ELEMENTS = frozenset({"vertex", "triangle"})
+
+
+def classify_member(name: str, root_model: str = ROOT_MODEL) -> str:
+    """Return the kind of archive member *name*, judged by its path alone."""
+    lowered = name.lower()
+    if name == root_model:
+        return ROOT_MEMBER
+    if lowered.endswith(".model"):
+        return MODEL_MEMBER
+    if name in PACKAGE_NAMES or lowered.endswith(".rels"):
+        return PACKAGE_MEMBER
+    if lowered.endswith(GCODE_SUFFIXES):
+        return GCODE_MEMBER
+    if lowered.endswith(IMAGE_SUFFIXES):
+        return THUMBNAIL_MEMBER
+    if lowered.startswith("metadata/"):
+        return METADATA_MEMBER
+    return OTHER_MEMBER
+
+
+class MemberEntry(NamedTuple):
+    """A member as described by the central directory."""
+
+    name: str
+    kind: str
+    compress_size: int
+    file_size: int
+    compress_type: int = zipfile.ZIP_STORED
+
+
+@dataclass
+class Preflight:
+    """Estimated cost of converting one archive, computed before any work starts.
+
+    Byte counts are uncompressed unless noted. *read_bytes* is what the
+    conversion decompresses and *skipped_bytes* what it never touches.
+    *peak_memory_bytes* is an upper estimate of the working memory of the
+    concurrent model conversions, *temp_bytes* the disk space spilled
+    results take and *output_bytes* a (compressed) size estimate of the
+    output archive. *free_bytes* is the free space where the output goes,
+    when known.
+    """
+
+    archive_bytes: int = 0
+    members: int = 0
+    models: int = 0
+    streamed_models: int = 0
+    read_bytes: int = 0
+    skipped_bytes: int = 0
+    largest_model_bytes: int = 0
+    peak_memory_bytes: int = 0
+    temp_bytes: int = 0
+    output_bytes: int = 0
+    free_bytes: Optional[int] = None
+    kinds: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def disk_bytes(self) -> int:
+        """Disk space the conversion needs at its peak: the output plus spilled results."""
+        return self.output_bytes + self.temp_bytes
+
+    def warnings(self, max_memory: Optional[int] = None) -> List[str]:
+        """Return human-readable problems the estimate predicts."""
+        problems = []
+        if self.free_bytes is not None and self.disk_bytes > self.free_bytes:
+            problems.append(
+                f"Conversion needs about {self.disk_bytes} bytes of disk space but only {self.free_bytes} are free."
+            )
+        if max_memory is not None and self.peak_memory_bytes > max_memory:
+            problems.append(
+                f"Conversion may use about {self.peak_memory_bytes} bytes of memory, more than the {max_memory} budget."
+            )
+        return problems
+
+    def as_dict(self) -> Dict[str, Any]:
+        report = asdict(self)
+        report["disk_bytes"] = self.disk_bytes
+        return report
+
+
+class Component(NamedTuple):
+    """A component reference: the object *object_id* of *member*, placed by *transform*."""
+
+    member: str
+    object_id: str
+    transform: Matrix
+
+
+# ``(member, object_id, transform)`` of an object placed relative to a root object.
+Placement = Tuple[str, str, Matrix]
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _path_attribute(element: ET._Element) -> Optional[str]:
+    # The production extension's ``p:path``; Bambu files sometimes leave the
+    # prefix undeclared, which recovering parsers keep as a literal name.
+    for name, value in element.attrib.items():
+        if name.rsplit("}", 1)[-1].rsplit(":", 1)[-1] == "path":
+            return value
+    return None
+
+
+class ArchiveIndex:
+    """Lazily resolved view of which objects of which members an archive places.
+
+    *entries* describe every member and *model_members* are the ``.model``
+    members under ``3D/Objects`` in archive order, both read from the
+    central directory without opening anything. The root model is parsed on
+    first use of :meth:`placements` or :meth:`members_to_convert`.
+    """
+
+    def __init__(self, zip_in: zipfile.ZipFile, root_model: str = ROOT_MODEL) -> None:
+        self.zip_in = zip_in
+        self.root_model = root_model
+        self.entries = [
+            MemberEntry(
+                info.filename,
+                classify_member(info.filename, root_model),
+                info.compress_size,
+                info.file_size,
+                info.compress_type,
+            )
+            for info in zip_in.infolist()
+            if not info.is_dir()
+        ]
+        self.model_members = list_zip_members(zip_in, prefix=f"{MODELS_ARCDIR}/", suffix=".model")
+        self._root_objects: Optional[Dict[str, List[Component]]] = None
+        self._build_items: List[Tuple[str, Matrix]] = []
+        self._resolved: Dict[str, List[Placement]] = {}
+        self._placements: Optional[Dict[str, BuildItems]] = None
+
+    def names(self, *kinds: str) -> List[str]:
+        """Return the names of the members of the given *kinds*, in archive order."""
+        return [entry.name for entry in self.entries if entry.kind in kinds]
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Return ``{kind: {"count", "compress_size", "file_size"}}`` for the kinds present."""
+        totals: Dict[str, Dict[str, int]] = {}
+        for entry in self.entries:
+            total = totals.setdefault(entry.kind, {"count": 0, "compress_size": 0, "file_size": 0})
+            total["count"] += 1
+            total["compress_size"] += entry.compress_size
+            total["file_size"] += entry.file_size
+        return {kind: totals[kind] for kind in MEMBER_KINDS if kind in totals}
+
+    def _load_root(self) -> Dict[str, List[Component]]:
+        if self._root_objects is not None:
+            return self._root_objects
+        self._root_objects = {}
+        try:
+            info = self.zip_in.getinfo(self.root_model)
+        except KeyError:
+            return self._root_objects
+        with self.zip_in.open(info) as stream:
+            try:
+                self._read_root(stream)
+            except ET.XMLSyntaxError as exc:
+                logging.warning("Cannot read %s: %s", self.root_model, exc)
+        return self._root_objects
+
+    def _read_root(self, stream) -> None:
+        assert self._root_objects is not None
+        # Root models may carry meshes too; vertices and triangles are dropped
+        # as they close and each object or item once read, so memory stays
+        # bounded by one object's components rather than the document.
+        for _, element in ET.iterparse(stream, tag=ROOT_MODEL_TAGS, recover=True, huge_tree=True):
+            parent = element.getparent()
+            name = _local_name(element.tag)
+            parent_name = _local_name(parent.tag) if parent is not None else None
+            if name == "object" and parent_name == "resources":
+                self._root_objects.setdefault(element.get("id", ""), []).extend(self._components(element))
+            elif name == "item" and parent_name == "build":
+                self._build_items.append((element.get("objectid", ""), parse_transform(element.get("transform"))))
+            elif name not in MESH_ELEMENTS:
+                continue
+            element.clear()
+            if parent is not None:
+                parent.remove(element)
+
+    def _components(self, element: ET._Element) -> List[Component]:
+        components = []
+        for component in element.iterfind("{*}components/{*}component"):
+            path = _path_attribute(component)
+            member = posixpath.normpath(path.lstrip("/")) if path else self.root_model
+            components.append(
+                Component(member, component.get("objectid", ""), parse_transform(component.get("transform")))
+            )
+        return components
+
+    def resolve(self, object_id: str, _visiting: Optional[Set[str]] = None) -> List[Placement]:
+        """Return the objects in other members that root object *object_id* is built from.
+
+        Nested root assemblies are followed and their transforms composed;
+        results are memoised, and reference cycles are broken with a warning.
+        """
+        resolved = self._resolved.get(object_id)
+        if resolved is not None:
+            return resolved
+        visiting = _visiting if _visiting is not None else set()
+        if object_id in visiting:
+            logging.warning("Ignoring cyclic component reference to object %s in %s.", object_id, self.root_model)
+            return []
+        visiting.add(object_id)
+        resolved = []
+        for member, child_id, transform in self._load_root().get(object_id, ()):
+            if member == self.root_model:
+                resolved.extend(
+                    (leaf_member, leaf_id, compose(leaf_transform, transform))
+                    for leaf_member, leaf_id, leaf_transform in self.resolve(child_id, visiting)
+                )
+            else:
+                resolved.append((member, child_id, transform))
+        visiting.discard(object_id)
+        self._resolved[object_id] = resolved
+        return resolved
+
+    def placements(self) -> Dict[str, BuildItems]:
+        """Return ``{member: {objectid: [transform, ...]}}`` for every object the root model places.
+
+        Each root build item contributes, for every object it reaches in
+        another member, the world transform composed from the item and the
+        components on the way.
+        """
+        if self._placements is not None:
+            return self._placements
+        self._load_root()
+        placements: Dict[str, BuildItems] = {}
+        for object_id, item_transform in self._build_items:
+            for member, leaf_id, transform in self.resolve(object_id):
+                world = format_transform(compose(transform, item_transform))
+                placements.setdefault(member, {}).setdefault(leaf_id, []).append(world)
+        self._placements = placements
+        return placements
+
+    def members_to_convert(self) -> List[str]:
+        """Return the model members holding objects the root model places, in archive order.
+
+        Archives whose root model places nothing in ``3D/Objects`` (or that
+        have no root model) keep every model member.
+        """
+        placements = self.placements()
+        missing = sorted(set(placements) - set(self.model_members))
+        if missing:
+            logging.warning("Root model references missing model file(s): %s", ", ".join(missing))
+        reachable = [member for member in self.model_members if member in placements]
+        if not reachable:
+            return list(self.model_members)
+        skipped = len(self.model_members) - len(reachable)
+        if skipped:
+            logging.info("Skipping %d model file(s) the root model does not reference.", skipped)
+        return reachable
+
+
+def read_build_transforms(zip_in: zipfile.ZipFile, root_model: str = ROOT_MODEL) -> Dict[str, BuildItems]:
+    """Return ``{member: {objectid: [transform, ...]}}`` for the objects the root model places.
+
+    Archives without a root model yield an empty mapping; see
+    :meth:`ArchiveIndex.placements`.
+    """
+    return ArchiveIndex(zip_in, root_model).placements()
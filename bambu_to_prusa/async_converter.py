@@ -0,0 +1,268 @@
+"""Asyncio front end for conversions.
+
+:class:`AsyncConverter` runs conversions on a thread or process pool so they
+never block the event loop, and caps the jobs in flight with a semaphore so
+any number of coroutines can submit work without oversubscribing the pool.
+Cancelling the awaiting task fires the job's
+:class:`~bambu_to_prusa.cancellation.CancellationToken`; the worker stops at
+its next check and removes its partial output, and the cancellation only
+propagates once it has, so a cancelled job never outlives its slot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from .batch import ConversionResult
+from .cancellation import CancellationToken
+from .converter import CANCEL_POLL_INTERVAL, BambuToPrusaConverter
+from .progress import ProgressCallback
+
+THREAD_EXECUTOR = "thread"
+PROCESS_EXECUTOR = "process"
+EXECUTORS = (THREAD_EXECUTOR, PROCESS_EXECUTOR)
+
+# Converter methods a job may run.
+_CONVERT_ARCHIVE = "convert_archive"
+_CONVERT_ONE = "convert_one"
+
+
+class _SharedFlag:
+    """Event-like view of one slot of a shared byte array, usable as a token's event.
+
+    Pool processes inherit the array when they start; jobs are then handed
+    a slot index, since events cannot be pickled into submitted calls.
+    """
+
+    def __init__(self, flags, slot: int) -> None:
+        self.flags = flags
+        self.slot = slot
+
+    def set(self) -> None:
+        self.flags[self.slot] = 1
+
+    def clear(self) -> None:
+        self.flags[self.slot] = 0
+
+    def is_set(self) -> bool:
+        return bool(self.flags[self.slot])
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_set():
+            remaining = CANCEL_POLL_INTERVAL if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, CANCEL_POLL_INTERVAL))
+        return True
+
+
+_process_converter: "BambuToPrusaConverter | None" = None
+_process_flags = None
+
+
+def _init_process_worker(settings: dict, flags) -> None:
+    # One converter per pool process, reused for every job it is handed.
+    global _process_converter, _process_flags
+    _process_converter = BambuToPrusaConverter(**settings)
+    _process_flags = flags
+
+
+def _run_in_process(method: str, input_file: str, output_file: str, slot: int):
+    assert _process_converter is not None
+    cancel = CancellationToken(event=_SharedFlag(_process_flags, slot))
+    return getattr(_process_converter, method)(input_file, output_file, cancel=cancel)
+
+
+class AsyncConverter:
+    """Run conversions from asyncio code on a bounded thread or process pool.
+
+    Every pool worker converts with its own warm copy of *converter*'s
+    settings (like the workers of
+    :meth:`~bambu_to_prusa.converter.BambuToPrusaConverter.convert_many`),
+    converting the model files of an archive one after the other; the
+    *converter*'s *workers*, statistics and, in process pools, *observer*
+    are not used. *executor* is ``"thread"`` (the default: lxml and zlib
+    release the GIL for much of a conversion) or ``"process"``. At most
+    *max_jobs* conversions run at once, ``None`` meaning one per CPU; further
+    calls wait their turn without occupying the pool.
+
+    The pool starts on first use. An instance must only be used from one
+    event loop; close it with :meth:`aclose` or ``async with``.
+    """
+
+    def __init__(
+        self,
+        converter: BambuToPrusaConverter | None = None,
+        executor: str = THREAD_EXECUTOR,
+        max_jobs: int | None = None,
+    ) -> None:
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor {executor!r}; expected one of {', '.join(EXECUTORS)}.")
+        self.converter = converter or BambuToPrusaConverter()
+        self.executor = executor
+        self.max_jobs = max_jobs if max_jobs is not None else (os.cpu_count() or 1)
+        if self.max_jobs < 1:
+            raise ValueError("max_jobs must be at least 1.")
+        self.running = 0
+        self.waiting = 0
+        self._settings = self.converter._worker_settings()
+        self._pool: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._local = threading.local()
+        self._flags = None
+        self._free_slots = list(range(self.max_jobs))
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.executor == PROCESS_EXECUTOR:
+                self._flags = multiprocessing.RawArray("b", self.max_jobs)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_jobs,
+                    initializer=_init_process_worker,
+                    initargs=(self._settings, self._flags),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="bambu2prusa")
+        return self._pool
+
+    def _thread_converter(self) -> BambuToPrusaConverter:
+        converter = getattr(self._local, "converter", None)
+        if converter is None:
+            # Copies keep each thread's cache and dedup statistics its own.
+            settings = copy.deepcopy(self._settings)
+            converter = self._local.converter = BambuToPrusaConverter(observer=self.converter.observer, **settings)
+        return converter
+
+    def _run_in_thread(
+        self,
+        method: str,
+        input_file: str,
+        output_file: str,
+        cancel: CancellationToken,
+        progress: ProgressCallback | None,
+    ):
+        converter = self._thread_converter()
+        if method == _CONVERT_ARCHIVE:
+            return converter.convert_archive(input_file, output_file, progress, cancel)
+        return converter.convert_one(input_file, output_file, cancel)
+
+    async def _run(self, method: str, input_file: str, output_file: str, progress: ProgressCallback | None = None):
+        if self._semaphore is None:
+            # Created here rather than in __init__ so it binds to the running loop.
+            self._semaphore = asyncio.Semaphore(self.max_jobs)
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            pool = self._get_pool()
+            if self.executor == PROCESS_EXECUTOR:
+                slot = self._free_slots.pop()
+                flag = _SharedFlag(self._flags, slot)
+                flag.clear()
+                try:
+                    future = pool.submit(_run_in_process, method, input_file, output_file, slot)
+                    return await self._result(future, CancellationToken(event=flag))
+                finally:
+                    self._free_slots.append(slot)
+            loop = asyncio.get_running_loop()
+
+            def _forward(update):
+                # Updates are produced on the worker thread; hand them to the loop.
+                loop.call_soon_threadsafe(progress, update)
+
+            cancel = CancellationToken()
+            callback = _forward if progress is not None else None
+            future = pool.submit(self._run_in_thread, method, input_file, output_file, cancel, callback)
+            return await self._result(future, cancel)
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    @staticmethod
+    async def _result(future: Future, cancel: CancellationToken):
+        """Await *future*, firing *cancel* and waiting for the job to stop if the task is cancelled."""
+        wrapped = asyncio.wrap_future(future)
+        try:
+            return await asyncio.shield(wrapped)
+        except asyncio.CancelledError:
+            cancel.cancel()
+            if not future.cancel():
+                # Keep the slot until the worker has noticed and cleaned up.
+                while not wrapped.done():
+                    try:
+                        await asyncio.wait({wrapped})
+                    except asyncio.CancelledError:
+                        continue
+            raise
+
+    async def convert_archive_async(
+        self, input_file: str, output_file: str, progress: ProgressCallback | None = None
+    ) -> str:
+        """Convert *input_file* into *output_file* on the pool; see
+        :meth:`~bambu_to_prusa.converter.BambuToPrusaConverter.convert_archive`.
+
+        *progress* is called on the event loop and is only supported with a
+        thread pool. Conversion errors propagate; cancelling the task
+        removes the partial output before raising
+        :class:`asyncio.CancelledError`.
+        """
+        if progress is not None and self.executor == PROCESS_EXECUTOR:
+            raise ValueError("Progress callbacks need the thread executor.")
+        return await self._run(_CONVERT_ARCHIVE, input_file, output_file, progress)
+
+    async def convert_many_async(
+        self,
+        jobs: Iterable[Tuple[str, str]],
+        on_result: Optional[Callable[[ConversionResult], None]] = None,
+    ) -> List[ConversionResult]:
+        """Convert every ``(input_file, output_file)`` pair in *jobs* concurrently.
+
+        Failures are captured in the returned results, which keep the order
+        of *jobs*; *on_result* is called on the event loop as each archive
+        finishes. Cancelling the task cancels every unfinished job.
+        """
+
+        async def convert(input_file: str, output_file: str) -> ConversionResult:
+            result = await self._run(_CONVERT_ONE, input_file, output_file)
+            if on_result:
+                on_result(result)
+            return result
+
+        tasks = [asyncio.ensure_future(convert(input_file, output_file)) for input_file, output_file in jobs]
+        if not tasks:
+            return []
+        try:
+            return list(await asyncio.gather(*tasks))
+        except Exception:
+            # A broken pool fails one job; stop the others rather than orphan them.
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks)
+            raise
+
+    def close(self) -> None:
+        """Shut the pool down, waiting for running jobs."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    async def aclose(self) -> None:
+        """Shut the pool down without blocking the event loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self) -> "AsyncConverter":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
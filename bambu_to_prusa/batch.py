@@ -0,0 +1,100 @@
+"""Helpers for converting many archives in one run."""
+
+from __future__ import annotations
+
+import glob
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from .dedup import DedupStats
+
+ARCHIVE_SUFFIX = ".3mf"
+_GLOB_CHARACTERS = frozenset("*?[")
+
+
+@dataclass
+class ConversionResult:
+    """Outcome of converting a single archive.
+
+    *dedup* counts the objects deduplication dropped in this archive.
+    """
+
+    input_file: str
+    output_file: str
+    duration: float
+    error: Optional[str] = None
+    cached: bool = False
+    dedup: Optional[DedupStats] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _glob_base(pattern: str) -> Path:
+    """Return the longest leading directory of *pattern* without glob characters."""
+
+    parts = Path(pattern).parts
+    base_parts = []
+    for part in parts[:-1]:
+        if _GLOB_CHARACTERS.intersection(part):
+            break
+        base_parts.append(part)
+    return Path(*base_parts) if base_parts else Path(".")
+
+
+def _output_key(path: Path) -> str:
+    # Compared as the file system would, which may ignore case.
+    return os.path.normcase(os.path.abspath(path))
+
+
+def collect_batch_jobs(sources: Iterable[str | os.PathLike[str]], output_dir: str | os.PathLike[str]) -> List[Tuple[str, str]]:
+    """Expand *sources* into ``(input_file, output_file)`` pairs.
+
+    Each source may be a ``.3mf`` file, a directory (searched recursively) or a
+    glob pattern (``**`` is supported). Output paths mirror each input's
+    location relative to its source directory or the fixed prefix of its glob,
+    rooted at *output_dir*; the suffix is matched case-insensitively. Duplicate
+    inputs are only converted once, and inputs that would land on the same
+    output (say ``a/plate.3mf`` and ``b/plate.3mf`` given explicitly) get a
+    numbered name such as ``plate-2.3mf`` instead of overwriting each other.
+    """
+
+    output_root = Path(output_dir)
+    jobs: List[Tuple[str, str]] = []
+    seen: set[str] = set()
+    outputs: set[str] = set()
+
+    def add(input_path: Path, base: Path) -> None:
+        key = os.path.abspath(input_path)
+        if key in seen or not input_path.is_file():
+            return
+        seen.add(key)
+        output_path = output_root / input_path.relative_to(base)
+        candidate, number = output_path, 1
+        while _output_key(candidate) in outputs:
+            number += 1
+            candidate = output_path.with_name(f"{output_path.stem}-{number}{output_path.suffix}")
+        if candidate != output_path:
+            logging.warning("%s would overwrite another output; writing %s instead.", input_path, candidate)
+        outputs.add(_output_key(candidate))
+        jobs.append((str(input_path), str(candidate)))
+
+    for source in sources:
+        source_str = os.fspath(source)
+        source_path = Path(source_str)
+        if source_path.is_dir():
+            for input_path in sorted(source_path.rglob("*")):
+                if input_path.name.lower().endswith(ARCHIVE_SUFFIX):
+                    add(input_path, source_path)
+        elif _GLOB_CHARACTERS.intersection(source_str):
+            base = _glob_base(source_str)
+            for match in sorted(glob.glob(source_str, recursive=True)):
+                if match.lower().endswith(ARCHIVE_SUFFIX):
+                    add(Path(match), base)
+        else:
+            add(source_path, source_path.parent)
+    return jobs
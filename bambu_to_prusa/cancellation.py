@@ -0,0 +1,91 @@
+"""Cooperative cancellation and deadlines for conversions.
+
+A :class:`CancellationToken` is handed to
+:meth:`~bambu_to_prusa.converter.BambuToPrusaConverter.convert_archive` (or
+``convert_many``) and checked between model members, before every chunk the
+model parser reads and after every object it produces, so an abort takes
+effect within one read chunk rather than at the end of the archive. The
+token may be cancelled from any thread and can carry a deadline.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import IO, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ConversionCancelled(Exception):
+    """Raised to abort a conversion; a progress callback may raise it to cancel."""
+
+
+class ConversionTimeout(ConversionCancelled):
+    """Raised when a conversion runs past its token's deadline."""
+
+
+class CancellationToken:
+    """Thread-safe cancellation flag with an optional deadline.
+
+    *timeout* is in seconds from construction; *deadline* is an absolute
+    :func:`time.monotonic` value. The earlier of the two applies. *event*
+    may be a :func:`multiprocessing.Event` to share the flag with pool
+    processes.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, deadline: Optional[float] = None, event=None) -> None:
+        self._event = event if event is not None else threading.Event()
+        if timeout is not None:
+            timeout_deadline = time.monotonic() + timeout
+            deadline = timeout_deadline if deadline is None else min(deadline, timeout_deadline)
+        self.deadline = deadline
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or ``None`` without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self) -> None:
+        """Raise if the token was cancelled or its deadline has passed."""
+        if self._event.is_set():
+            raise ConversionCancelled("Conversion cancelled.")
+        if self.expired:
+            raise ConversionTimeout("Conversion exceeded its deadline.")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until cancelled, the deadline passes or *timeout* elapses."""
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return self._event.wait(timeout) or self.expired
+
+    def checked(self, items: Iterable[T]) -> Iterator[T]:
+        """Yield *items*, checking the token before each one."""
+        for item in items:
+            self.check()
+            yield item
+
+
+class CancellableReader:
+    """Binary reader that checks a token before every read."""
+
+    def __init__(self, stream: IO[bytes], token: CancellationToken) -> None:
+        self.stream = stream
+        self.token = token
+
+    def read(self, size: int = -1) -> bytes:
+        self.token.check()
+        return self.stream.read(size)
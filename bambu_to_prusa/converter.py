@@ -1,45 +1,771 @@
 from __future__ import annotations
 
+import io
 import logging
+import multiprocessing
 import os
+import posixpath
+import shutil
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
 from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
 
-from .file_ops import cleanup_temp_dir, create_temp_dir, decompress_zip
-from .model_injection import build_prusa_model
-from .model_processing import convert_model_file
-from .package_builder import build_package, write_model_file
+from .archive_index import (
+    GCODE_MEMBER,
+    METADATA_MEMBER,
+    OTHER_MEMBER,
+    ROOT_MEMBER,
+    THUMBNAIL_MEMBER,
+    ArchiveIndex,
+    Preflight,
+)
+from .batch import ConversionResult
+from .cancellation import CancellableReader, CancellationToken, ConversionCancelled
+from .dedup import DedupStats, MeshDeduplicator
+from .file_ops import CompressionPolicy, cleanup_temp_dir, copy_zip_member, create_temp_dir, remove_file
+from .instrumentation import (
+    BUILD_PACKAGE,
+    CARRY_OVER_MEMBERS,
+    CACHE_LOOKUP,
+    CACHE_STORE,
+    CONVERT_ARCHIVE,
+    EXTRACT_MODEL_OBJECTS,
+    WRITE_MODEL_FILE,
+    ConversionObserver,
+    TimedIterator,
+    measure,
+    record_stage,
+)
+from .model_processing import iter_model_objects, iter_streamed_objects
+from .paint import PaintTranscoder
+from .placement import DEFAULT_BED_SIZE, SOURCE_PLACEMENT, BuildLayout
+from .progress import (
+    DEFAULT_PROGRESS_INTERVAL,
+    ProgressCallback,
+    ProgressReader,
+    ProgressTracker,
+    track_triangles,
+)
+from .package_builder import (
+    copy_model_member,
+    stream_model_member,
+    write_model_member,
+    write_package_members,
+    write_prusa_model,
+)
+from .result_cache import ResultCache
 from .template_paths import get_template_paths
+from .template_registry import get_template_registry
+
+# How often waits on pool workers wake up to check a cancellation token.
+CANCEL_POLL_INTERVAL = 0.05
+# Peak memory of object-at-a-time parsing as a multiple of a model member's
+# uncompressed size: lxml needs roughly this much per byte of mesh XML while
+# an object's subtree is built.
+TREE_MEMORY_FACTOR = 40
+# Working memory of a member streamed element by element: parser buffers and
+# one batch of serialised elements, independent of the mesh size.
+STREAMED_MEMORY_ESTIMATE = 16 << 20
+# Member kinds that may be carried over from the input archive unchanged.
+CARRY_OVER_KINDS = (THUMBNAIL_MEMBER, METADATA_MEMBER, GCODE_MEMBER, OTHER_MEMBER)
+DEFAULT_CARRY_OVER = (THUMBNAIL_MEMBER,)
+
+
+def streams_elements(file_size: int, memory_budget: float | None) -> bool:
+    """Return whether a model member of *file_size* bytes must be streamed element by element."""
+    return memory_budget is not None and file_size * TREE_MEMORY_FACTOR > memory_budget
+
+
+def model_objects(
+    source,
+    file_size: int,
+    memory_budget: float | None = None,
+    layout: BuildLayout | None = None,
+    transcoder: PaintTranscoder | None = None,
+):
+    """Return the object stream for a model member, honouring *memory_budget*.
+
+    The member's own build items are collected into *layout*, and paint is
+    transcoded with *transcoder*.
+    """
+    build_items = layout.local_transforms if layout is not None else None
+    if streams_elements(file_size, memory_budget):
+        return iter_streamed_objects(source, build_items, transcoder)
+    return iter_model_objects(source, build_items, transcoder)
+
+
+def convert_model_to_bytes(
+    zip_in: zipfile.ZipFile,
+    member: str,
+    template_paths: dict[str, str],
+    pretty_print: bool = False,
+    memory_budget: float | None = None,
+    layout: BuildLayout | None = None,
+    transcoder: PaintTranscoder | None = None,
+    dedup: MeshDeduplicator | None = None,
+) -> tuple[str, bytes]:
+    """Convert one model member of *zip_in* and return its serialised Prusa model."""
+    buffer = io.BytesIO()
+    _convert_model_to_stream(
+        zip_in, member, template_paths, buffer, pretty_print, memory_budget, layout, transcoder, dedup
+    )
+    return posixpath.basename(member), buffer.getvalue()
+
+
+def _convert_model_to_stream(
+    zip_in, member, template_paths, stream, pretty_print, memory_budget, layout, transcoder, dedup
+) -> None:
+    layout = layout or BuildLayout()
+    with zip_in.open(member) as source:
+        objects = model_objects(source, zip_in.getinfo(member).file_size, memory_budget, layout, transcoder)
+        template = get_template_registry(template_paths).model_tree()
+        write_prusa_model(stream, objects, template, pretty_print, layout, dedup)
+
+
+def _convert_model_in_worker(
+    input_file: str,
+    member: str,
+    template_paths: dict[str, str],
+    pretty_print: bool,
+    memory_budget: float | None = None,
+    spill_dir: str | None = None,
+    layout: BuildLayout | None = None,
+    transcoder: PaintTranscoder | None = None,
+    dedup: MeshDeduplicator | None = None,
+) -> tuple[str, bytes | str, float, float, DedupStats | None]:
+    # Runs in a pool process: each worker opens its own handle on the archive
+    # and reports its own wall and CPU time and deduplication counters, which
+    # the parent cannot see. With *spill_dir* the model is written to a file
+    # there and its path is returned instead of the bytes.
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    filename = posixpath.basename(member)
+    with zipfile.ZipFile(input_file, "r") as zip_in:
+        if spill_dir is None:
+            filename, model_data = convert_model_to_bytes(
+                zip_in, member, template_paths, pretty_print, memory_budget, layout, transcoder, dedup
+            )
+        else:
+            model_data = os.path.join(spill_dir, filename)
+            with open(model_data, "wb") as spill:
+                _convert_model_to_stream(
+                    zip_in, member, template_paths, spill, pretty_print, memory_budget, layout, transcoder, dedup
+                )
+    wall_s, cpu_s = time.perf_counter() - wall_started, time.process_time() - cpu_started
+    return filename, model_data, wall_s, cpu_s, dedup.stats if dedup is not None else None
+
+
+def _cleanup_when_done(futures: List[Future], temp_dir: str) -> None:
+    """Remove *temp_dir* now, and again once every one of *futures* has finished."""
+    cleanup_temp_dir(temp_dir, ignore_errors=True)
+    running = [future for future in futures if not future.done()]
+
+    def remove_if_last(_future: Future) -> None:
+        if all(future.done() for future in running):
+            cleanup_temp_dir(temp_dir, ignore_errors=True)
+
+    for future in running:
+        future.add_done_callback(remove_if_last)
+
+
+def _wait_for_result(future: Future, cancel: CancellationToken | None):
+    """Return *future*'s result, checking *cancel* while it is pending."""
+    if cancel is None:
+        return future.result()
+    while True:
+        cancel.check()
+        try:
+            return future.result(timeout=CANCEL_POLL_INTERVAL)
+        except FuturesTimeout:
+            continue
+
+
+_batch_converter: "BambuToPrusaConverter | None" = None
+_batch_cancel: CancellationToken | None = None
+
+
+def _init_batch_worker(settings: dict, stop=None) -> None:
+    # One converter per pool process, reused for every archive it is handed.
+    global _batch_converter, _batch_cancel
+    _batch_converter = BambuToPrusaConverter(**settings)
+    _batch_cancel = CancellationToken(event=stop) if stop is not None else None
+
+
+def _convert_in_batch_worker(input_file: str, output_file: str) -> ConversionResult:
+    assert _batch_converter is not None
+    return _batch_converter.convert_one(input_file, output_file, _batch_cancel)
 
 
 class BambuToPrusaConverter:
-    """Convert Bambu 3MF archives into Prusa-compatible archives."""
+    """Convert Bambu 3MF archives into Prusa-compatible archives.
+
+    *workers* controls how many model files of a single archive are converted
+    concurrently. ``1`` (the default) converts in-process; larger values use a
+    process pool, and ``None`` uses one worker per CPU.
+
+    An optional :class:`~bambu_to_prusa.result_cache.ResultCache` short-circuits
+    conversions of archives that were already converted with the same
+    templates and options.
+
+    Model files are serialised incrementally, straight into the output
+    archive; *pretty_print* re-indents them at some cost in size and speed.
+    *compression* is a :class:`~bambu_to_prusa.file_ops.CompressionPolicy` or
+    the name of one of its presets (``store``, ``fast``, ``balanced``,
+    ``small``).
+
+    *observer*, a :class:`~bambu_to_prusa.instrumentation.ConversionObserver`,
+    receives wall time, CPU time, byte counts and peak memory for each stage
+    of every conversion. Progress callbacks passed to :meth:`convert_archive`
+    are called at most once per *progress_interval* seconds.
+
+    *max_memory* (bytes) turns on the memory-budget mode. Model members whose
+    object-at-a-time conversion could exceed the budget (shared equally
+    between *workers*) are instead copied element by element, so the peak RSS
+    of converting them does not grow with mesh size, only with the size of a
+    single vertex or triangle element; whitespace in those members is not
+    preserved and *pretty_print* does not apply to them. With several
+    workers, converted models that would not all fit in half the budget are
+    spilled to a temporary directory instead of being held until they are
+    written. Without *max_memory*, peak memory grows with the largest object.
+
+    *placement* chooses the build items: ``"source"`` (the default) carries
+    over the transforms of the Bambu project, composed from the root model's
+    build items and components; ``"arrange"`` lays every instance of each
+    model file out on a *bed_size* ``(width, depth)`` bed in millimetres.
+
+    Paint segmentation is decoded, validated and re-encoded by a
+    :class:`~bambu_to_prusa.paint.PaintTranscoder`; *extruder_map* renumbers
+    painted extruder states on the way, e.g. ``{1: 2, 2: 1}``.
+
+    With *deduplicate* (the default), objects whose mesh repeats an earlier
+    object of the same model file are written once and instanced through
+    build items; :attr:`dedup_stats` counts the objects dropped and the
+    model bytes saved. Members streamed under *max_memory* are not
+    deduplicated.
+
+    Input members of the *carry_over* kinds (see
+    :func:`~bambu_to_prusa.archive_index.classify_member`; thumbnails and
+    plate previews by default) are copied into the output with their
+    compressed bytes untouched, so they cost no CPU. Members the output
+    package already has, such as template metadata, win over them.
+    """
 
-    def __init__(self, template_paths: dict[str, str] | None = None):
+    def __init__(
+        self,
+        template_paths: dict[str, str] | None = None,
+        workers: int | None = 1,
+        cache: ResultCache | None = None,
+        pretty_print: bool = False,
+        compression: CompressionPolicy | str | None = None,
+        observer: ConversionObserver | None = None,
+        progress_interval: float = DEFAULT_PROGRESS_INTERVAL,
+        max_memory: int | None = None,
+        placement: str = SOURCE_PLACEMENT,
+        bed_size: tuple[float, float] = DEFAULT_BED_SIZE,
+        extruder_map: dict[int, int] | None = None,
+        deduplicate: bool = True,
+        carry_over: Iterable[str] = DEFAULT_CARRY_OVER,
+    ):
         self.template_paths = template_paths or get_template_paths()
-        self.temp_dir = create_temp_dir()
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        if self.workers < 1:
+            raise ValueError("workers must be at least 1.")
+        self.cache = cache
+        self.pretty_print = pretty_print
+        if isinstance(compression, str):
+            compression = CompressionPolicy.from_preset(compression)
+        self.compression = compression or CompressionPolicy()
+        self.observer = observer
+        self.progress_interval = progress_interval
+        if max_memory is not None and max_memory <= 0:
+            raise ValueError("max_memory must be positive.")
+        self.max_memory = max_memory
+        # Validates *placement* up front rather than on the first archive.
+        BuildLayout(placement=placement, bed_size=bed_size)
+        self.placement = placement
+        self.bed_size = tuple(bed_size)
+        self.transcoder = PaintTranscoder(extruder_map)
+        self.deduplicate = deduplicate
+        self.dedup_stats = DedupStats()
+        self.carry_over = tuple(carry_over)
+        unknown = sorted(set(self.carry_over) - set(CARRY_OVER_KINDS))
+        if unknown:
+            raise ValueError(
+                f"Cannot carry over {', '.join(unknown)} members; expected any of {', '.join(CARRY_OVER_KINDS)}."
+            )
 
-    def convert_archive(self, input_file: str, output_file: str) -> str:
+    def _worker_settings(self) -> dict:
+        """Return constructor arguments recreating this converter in a batch worker."""
+        return {
+            "template_paths": self.template_paths,
+            "cache": self.cache,
+            "pretty_print": self.pretty_print,
+            "compression": self.compression,
+            "max_memory": self.max_memory,
+            "placement": self.placement,
+            "bed_size": self.bed_size,
+            "extruder_map": self.transcoder.extruder_map,
+            "deduplicate": self.deduplicate,
+            "carry_over": self.carry_over,
+        }
+
+    def memory_budget(self) -> float | None:
+        """Return the memory each concurrent model conversion may use, if bounded."""
+        return self.max_memory / self.workers if self.max_memory is not None else None
+
+    def output_options(self) -> dict[str, object]:
+        """Return the settings that change the bytes of a converted archive."""
+        options: dict[str, object] = {
+            "pretty_print": self.pretty_print,
+            "compression": self.compression.options(),
+            "placement": self.placement,
+            "deduplicate": self.deduplicate,
+            "carry_over": list(self.carry_over),
+        }
+        if self.placement != SOURCE_PLACEMENT:
+            options["bed_size"] = list(self.bed_size)
+        if self.transcoder.extruder_map:
+            options.update(self.transcoder.options())
+        if self.max_memory is not None:
+            # Which members are streamed, and so lose their whitespace,
+            # depends on each worker's share of the budget.
+            options["memory_budget"] = self.memory_budget()
+        return options
+
+    def preflight(self, input_file: str, output_file: str | None = None) -> Preflight:
+        """Estimate the memory, disk space and decompression work of converting *input_file*.
+
+        Only the archive's central directory and root model are read. With
+        *output_file*, the free space of its directory is reported too.
+        """
+        with zipfile.ZipFile(input_file, "r") as zip_in:
+            index = ArchiveIndex(zip_in)
+            members = index.members_to_convert()
+        return self._preflight(index, members, os.path.getsize(input_file), output_file)
+
+    def _preflight(
+        self, index: ArchiveIndex, members: list[str], archive_bytes: int, output_file: str | None
+    ) -> Preflight:
+        entries = {entry.name: entry for entry in index.entries}
+        models = [entries[member] for member in members]
+        budget = self.memory_budget()
+        streamed = [streams_elements(entry.file_size, budget) for entry in models]
+        peaks = sorted(
+            (
+                STREAMED_MEMORY_ESTIMATE if is_streamed else entry.file_size * TREE_MEMORY_FACTOR
+                for entry, is_streamed in zip(models, streamed)
+            ),
+            reverse=True,
+        )
+        workers = min(self.workers, len(models))
+        model_bytes = sum(entry.file_size for entry in models)
+        temp_bytes = 0
+        peak_memory = sum(peaks[: max(workers, 1)])
+        if workers > 1:
+            # Mirrors _write_models: results wait in the parent or on disk.
+            if self.max_memory is not None and model_bytes * 2 > self.max_memory:
+                temp_bytes = model_bytes
+            else:
+                peak_memory += model_bytes
+        read_bytes = model_bytes + sum(entry.file_size for entry in index.entries if entry.kind == ROOT_MEMBER)
+        stored = self.compression.method == zipfile.ZIP_STORED
+        output_bytes = model_bytes if stored else sum(entry.compress_size for entry in models)
+        # Carried-over members are copied raw, unless they must be inflated
+        # for a stored archive.
+        for entry in index.entries:
+            if entry.kind in self.carry_over:
+                inflated = stored and entry.compress_type != zipfile.ZIP_STORED
+                output_bytes += entry.file_size if inflated else entry.compress_size
+                read_bytes += entry.file_size if inflated else 0
+        free_bytes = None
+        if output_file is not None:
+            free_bytes = shutil.disk_usage(os.path.dirname(os.path.abspath(output_file))).free
+        return Preflight(
+            archive_bytes=archive_bytes,
+            members=len(index.entries),
+            models=len(models),
+            streamed_models=sum(streamed),
+            read_bytes=read_bytes,
+            skipped_bytes=sum(entry.file_size for entry in index.entries) - read_bytes,
+            largest_model_bytes=max((entry.file_size for entry in models), default=0),
+            peak_memory_bytes=peak_memory,
+            temp_bytes=temp_bytes,
+            output_bytes=output_bytes,
+            free_bytes=free_bytes,
+            kinds=index.summary(),
+        )
+
+    def _carry_over(
+        self,
+        index: ArchiveIndex,
+        zip_in: zipfile.ZipFile,
+        zip_out: zipfile.ZipFile,
+        cancel: CancellationToken | None,
+    ) -> None:
+        """Copy the input members of the carried-over kinds into *zip_out* unchanged."""
+        names = [name for name in index.names(*self.carry_over) if name not in zip_out.NameToInfo]
+        if not names:
+            return
+        with measure(self.observer, CARRY_OVER_MEMBERS) as stats:
+            for name in names:
+                if cancel is not None:
+                    cancel.check()
+                info = copy_zip_member(zip_in, name, zip_out, self.compression)
+                stats.bytes_in += zip_in.getinfo(name).compress_size
+                stats.bytes_out += info.compress_size
+
+    def _layout(self, member: str, transforms: dict) -> BuildLayout:
+        return BuildLayout(transforms.get(member), self.placement, self.bed_size)
+
+    def _deduplicator(self) -> MeshDeduplicator | None:
+        return MeshDeduplicator() if self.deduplicate else None
+
+    def _record_dedup(self, filename: str, stats: DedupStats | None) -> None:
+        if stats is None:
+            return
+        self.dedup_stats.add(stats)
+        if stats.duplicates:
+            logging.info(
+                "Deduplicated %d of %d object(s) in %s, saving %d bytes.",
+                stats.duplicates,
+                stats.objects,
+                filename,
+                stats.bytes_saved,
+            )
+
+    def _stream_member(
+        self,
+        zip_in: zipfile.ZipFile,
+        member: str,
+        zip_out: zipfile.ZipFile,
+        tracker: ProgressTracker | None,
+        cancel: CancellationToken | None,
+        layout: BuildLayout | None = None,
+    ) -> str:
+        """Stream one model member from *zip_in* into *zip_out* in-process."""
+        filename = posixpath.basename(member)
+        info = zip_in.getinfo(member)
+        template = get_template_registry(self.template_paths).model_tree()
+        with measure(self.observer, WRITE_MODEL_FILE, filename) as stats, zip_in.open(member) as source:
+            if cancel is not None:
+                source = CancellableReader(source, cancel)
+            if tracker is not None:
+                tracker.start_model(filename)
+                source = ProgressReader(source, tracker, info.compress_size, info.file_size)
+            objects = model_objects(source, info.file_size, self.memory_budget(), layout, self.transcoder)
+            if tracker is not None:
+                objects = track_triangles(objects, tracker)
+            if cancel is not None:
+                objects = cancel.checked(objects)
+            objects = TimedIterator(objects)
+            dedup = self._deduplicator()
+            arcname = stream_model_member(
+                objects,
+                filename,
+                template,
+                zip_out,
+                pretty_print=self.pretty_print,
+                size_hint=info.file_size,
+                compression=self.compression,
+                layout=layout,
+                dedup=dedup,
+            )
+            stats.bytes_in = info.compress_size
+            stats.bytes_out = zip_out.getinfo(arcname).compress_size
+            record_stage(
+                self.observer, EXTRACT_MODEL_OBJECTS, filename, objects.wall_s, objects.cpu_s, info.compress_size
+            )
+        self._record_dedup(filename, dedup.stats if dedup is not None else None)
+        if tracker is not None:
+            source.close_out()
+            tracker.model_done()
+        return filename
+
+    def _write_models(
+        self,
+        input_file: str,
+        zip_in: zipfile.ZipFile,
+        members: list[str],
+        zip_out: zipfile.ZipFile,
+        tracker: ProgressTracker | None = None,
+        cancel: CancellationToken | None = None,
+        transforms: dict | None = None,
+    ) -> list[str]:
+        """Convert every model member into *zip_out* and return the written filenames.
+
+        *transforms* are the root model's placements from
+        :meth:`~bambu_to_prusa.archive_index.ArchiveIndex.placements`.
+        """
+        transforms = transforms or {}
+        filenames: list[str] = []
+        workers = min(self.workers, len(members))
+        if workers <= 1:
+            for member in members:
+                if cancel is not None:
+                    cancel.check()
+                layout = self._layout(member, transforms)
+                filenames.append(self._stream_member(zip_in, member, zip_out, tracker, cancel, layout))
+            return filenames
+
+        # Finished results wait in the parent until their turn is written, so
+        # under a budget they go through disk unless all of them fit in half.
+        spill_dir = None
+        if self.max_memory is not None:
+            if sum(zip_in.getinfo(member).file_size for member in members) * 2 > self.max_memory:
+                spill_dir = create_temp_dir()
+        executor = ProcessPoolExecutor(max_workers=workers)
+        futures: List[Future] = []
+        try:
+            futures = [
+                executor.submit(
+                    _convert_model_in_worker,
+                    input_file,
+                    member,
+                    self.template_paths,
+                    self.pretty_print,
+                    self.memory_budget(),
+                    spill_dir,
+                    self._layout(member, transforms),
+                    self.transcoder,
+                    self._deduplicator(),
+                )
+                for member in members
+            ]
+            # Collecting in submission order keeps the output archive
+            # deterministic regardless of which worker finishes first.
+            for member, future in zip(members, futures):
+                filename, model_data, wall_s, cpu_s, dedup_stats = _wait_for_result(future, cancel)
+                with measure(self.observer, WRITE_MODEL_FILE, filename) as stats:
+                    stats.wall_s, stats.cpu_s = wall_s, cpu_s
+                    if isinstance(model_data, bytes):
+                        arcname = write_model_member(model_data, filename, zip_out, self.compression)
+                    else:
+                        arcname = copy_model_member(model_data, filename, zip_out, self.compression)
+                        remove_file(model_data)
+                    stats.bytes_in = zip_in.getinfo(member).compress_size
+                    stats.bytes_out = zip_out.getinfo(arcname).compress_size
+                self._record_dedup(filename, dedup_stats)
+                if tracker is not None:
+                    tracker.advance_bytes(zip_in.getinfo(member).compress_size)
+                    tracker.model_done()
+                filenames.append(filename)
+        except BaseException:
+            # Drop queued members; members already running finish in the
+            # background instead of delaying the abort, and may still write
+            # spill files, so their directory goes once they are done.
+            executor.shutdown(wait=False, cancel_futures=True)
+            if spill_dir is not None:
+                _cleanup_when_done(futures, spill_dir)
+            raise
+        executor.shutdown()
+        cleanup_temp_dir(spill_dir)
+        return filenames
+
+    def convert_archive(
+        self,
+        input_file: str,
+        output_file: str,
+        progress: ProgressCallback | None = None,
+        cancel: CancellationToken | None = None,
+    ) -> str:
+        """Convert *input_file* into *output_file*.
+
+        Model members are read straight from the input archive and written
+        straight into the output archive; nothing is staged on disk. A partial
+        output file is removed if the conversion fails.
+
+        *progress* receives :class:`~bambu_to_prusa.progress.ProgressUpdate`
+        snapshots, throttled to *progress_interval*, driven by the compressed
+        model bytes consumed, model files completed and triangles streamed.
+
+        *cancel* is a :class:`~bambu_to_prusa.cancellation.CancellationToken`
+        checked between members and on every read chunk while streaming; when
+        it fires, or its deadline passes, the conversion raises
+        :class:`~bambu_to_prusa.cancellation.ConversionCancelled` after
+        removing the partial output.
+        """
         if not input_file or not output_file:
             raise ValueError("Both input and output file paths must be provided.")
 
-        extracted_path = decompress_zip(input_file)
-        try:
-            models_dir = Path(extracted_path) / "3D" / "Objects"
-            bambu_models = list(models_dir.rglob("*.model"))
+        with measure(self.observer, CONVERT_ARCHIVE, os.path.basename(input_file)) as stats:
+            stats.bytes_in = os.path.getsize(input_file)
+            self._convert_archive(input_file, output_file, progress, cancel)
+            stats.bytes_out = os.path.getsize(output_file)
+        return output_file
+
+    def _convert_archive(
+        self,
+        input_file: str,
+        output_file: str,
+        progress: ProgressCallback | None,
+        cancel: CancellationToken | None,
+    ) -> None:
+        if cancel is not None:
+            cancel.check()
+
+        cache_key = None
+        if self.cache is not None:
+            with measure(self.observer, CACHE_LOOKUP) as stats:
+                cache_key = self.cache.key_for(input_file, self.template_paths, self.output_options())
+                try:
+                    hit = self.cache.fetch(cache_key, output_file)
+                except BaseException:
+                    remove_file(output_file)
+                    raise
+                stats.bytes_out = os.path.getsize(output_file) if hit else 0
+            if hit:
+                if progress is not None:
+                    ProgressTracker(progress, 0, 0, self.progress_interval).finish()
+                logging.info("Output file created from cache: %s", os.path.basename(output_file))
+                return
+
+        with zipfile.ZipFile(input_file, "r") as zip_in:
+            index = ArchiveIndex(zip_in)
+            bambu_models = index.members_to_convert()
             if not bambu_models:
                 raise FileNotFoundError("No .model files found in the archive.")
+            preflight = self._preflight(index, bambu_models, os.path.getsize(input_file), output_file)
+            for problem in preflight.warnings(self.max_memory):
+                logging.warning(problem)
+
+            tracker = None
+            if progress is not None:
+                bytes_total = sum(zip_in.getinfo(member).compress_size for member in bambu_models)
+                tracker = ProgressTracker(progress, bytes_total, len(bambu_models), self.progress_interval)
+                tracker.report(force=True)
+
+            try:
+                with self.compression.open_archive(output_file) as zip_out:
+                    prusa_model_filenames = self._write_models(
+                        input_file, zip_in, bambu_models, zip_out, tracker, cancel, index.placements()
+                    )
+                    if cancel is not None:
+                        cancel.check()
+                    with measure(self.observer, BUILD_PACKAGE) as stats:
+                        written = len(zip_out.infolist())
+                        write_package_members(prusa_model_filenames, self.template_paths, zip_out)
+                        stats.bytes_out = sum(info.compress_size for info in zip_out.infolist()[written:])
+                    self._carry_over(index, zip_in, zip_out, cancel)
+            except BaseException:
+                remove_file(output_file)
+                raise
+
+        if cache_key is not None:
+            with measure(self.observer, CACHE_STORE) as stats:
+                self.cache.store(cache_key, output_file)
+                stats.bytes_in = os.path.getsize(output_file)
+        if tracker is not None:
+            tracker.finish()
+        logging.info("Output file created: %s", os.path.basename(output_file))
+
+    def convert_one(
+        self, input_file: str, output_file: str, cancel: CancellationToken | None = None
+    ) -> ConversionResult:
+        """Convert one archive and report the outcome instead of raising."""
+        started = time.perf_counter()
+        hits_before = self.cache.stats.hits if self.cache else 0
+        dedup_before = DedupStats(**self.dedup_stats.as_dict())
+        try:
+            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+            self.convert_archive(input_file, output_file, cancel=cancel)
+        except Exception as exc:
+            if not isinstance(exc, ConversionCancelled):
+                logging.error("Conversion of %s failed: %s", input_file, exc)
+            return ConversionResult(
+                input_file,
+                output_file,
+                time.perf_counter() - started,
+                str(exc),
+                dedup=self.dedup_stats.since(dedup_before),
+            )
+        cached = self.cache is not None and self.cache.stats.hits > hits_before
+        return ConversionResult(
+            input_file,
+            output_file,
+            time.perf_counter() - started,
+            cached=cached,
+            dedup=self.dedup_stats.since(dedup_before),
+        )
+
+    def convert_many(
+        self,
+        jobs: Iterable[Tuple[str, str]],
+        max_jobs: int | None = 1,
+        on_result: Optional[Callable[[ConversionResult], None]] = None,
+        cancel: CancellationToken | None = None,
+    ) -> List[ConversionResult]:
+        """Convert every ``(input_file, output_file)`` pair in *jobs*.
+
+        With *max_jobs* above one the archives are spread over a process pool
+        whose workers each keep one warm converter for the whole batch;
+        ``None`` uses one process per CPU. Failures are captured in the
+        returned results rather than aborting the batch. *on_result* is called
+        as each archive finishes; the returned list keeps the order of *jobs*.
+
+        When *cancel* fires, running conversions stop at their next check and
+        every unfinished job is reported as a cancelled failure. Either way
+        :attr:`dedup_stats` accumulates the counts of every archive.
+        """
+        job_list: Sequence[Tuple[str, str]] = list(jobs)
+        max_jobs = max_jobs if max_jobs is not None else (os.cpu_count() or 1)
+        if max_jobs < 1:
+            raise ValueError("max_jobs must be at least 1.")
+
+        if max_jobs == 1 or len(job_list) <= 1:
+            results = []
+            for input_file, output_file in job_list:
+                results.append(self.convert_one(input_file, output_file, cancel))
+                if on_result:
+                    on_result(results[-1])
+            return results
+
+        # Tokens hold a thread event, which cannot reach pool processes, so
+        # workers watch a process-shared event that is set once *cancel* fires.
+        stop = multiprocessing.Event()
+
+        def check_cancel() -> None:
+            if cancel is not None and not stop.is_set() and (cancel.cancelled or cancel.expired):
+                stop.set()
 
-            prusa_model_filenames: list[str] = []
-            for model_path in bambu_models:
-                filename, objects = convert_model_file(str(model_path))
-                prusa_tree = build_prusa_model(objects, self.template_paths["models_template"])
-                write_model_file(prusa_tree, filename, self.temp_dir)
-                prusa_model_filenames.append(filename)
-
-            build_package(prusa_model_filenames, self.template_paths, self.temp_dir, output_file)
-            logging.info("Output file created: %s", os.path.basename(output_file))
-            return output_file
-        finally:
-            cleanup_temp_dir(extracted_path)
-            cleanup_temp_dir(self.temp_dir)
-            self.temp_dir = create_temp_dir()
+        check_cancel()
+        finished: dict[int, ConversionResult] = {}
+        with ProcessPoolExecutor(
+            max_workers=min(max_jobs, len(job_list)),
+            initializer=_init_batch_worker,
+            initargs=(self._worker_settings(), stop),
+        ) as executor:
+            futures = {
+                executor.submit(_convert_in_batch_worker, input_file, output_file): index
+                for index, (input_file, output_file) in enumerate(job_list)
+            }
+            pending = set(futures)
+            try:
+                while pending:
+                    done, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    check_cancel()
+                    for future in done:
+                        if future.cancelled():
+                            input_file, output_file = job_list[futures[future]]
+                            result = ConversionResult(input_file, output_file, 0.0, "Conversion cancelled.")
+                        else:
+                            result = future.result()
+                            if result.dedup is not None:
+                                # Pool workers count into their own converters.
+                                self.dedup_stats.add(result.dedup)
+                        finished[futures[future]] = result
+                        if on_result:
+                            on_result(result)
+                    if stop.is_set():
+                        for future in pending:
+                            future.cancel()
+            except BaseException:
+                # Let running workers abort at their next check instead of
+                # finishing their archives while the pool shuts down.
+                stop.set()
+                for future in pending:
+                    future.cancel()
+                raise
+        return [finished[index] for index in range(len(job_list))]
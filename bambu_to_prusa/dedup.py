@@ -0,0 +1,114 @@
+"""Deduplication of identical meshes within an output model file.
+
+Print-farm plates often carry dozens of copies of one part, each exported by
+Bambu Studio as its own full mesh object. :class:`MeshDeduplicator` hashes
+every object's payload as it is written: its mesh (vertices, triangles and
+paint) and any other children and attributes, but not its ``id`` or
+``name``. The first object with a given payload is written; later copies
+are dropped and their build items reference the first one instead, keeping
+their own transforms, which is how PrusaSlicer represents instances anyway.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import lxml.etree as ET
+
+from .model_processing import StreamedObject
+
+# Attributes naming an object rather than describing its payload.
+IDENTITY_ATTRIBUTES = frozenset({"id", "name"})
+
+PayloadKey = Tuple[bytes, int]
+
+
+@dataclass
+class DedupStats:
+    """Counters describing how many objects deduplication dropped."""
+
+    objects: int = 0
+    duplicates: int = 0
+    bytes_saved: int = 0
+
+    def add(self, other: "DedupStats") -> None:
+        self.objects += other.objects
+        self.duplicates += other.duplicates
+        self.bytes_saved += other.bytes_saved
+
+    def since(self, earlier: "DedupStats") -> "DedupStats":
+        """Return the counts accumulated after the snapshot *earlier*."""
+        return DedupStats(
+            self.objects - earlier.objects,
+            self.duplicates - earlier.duplicates,
+            self.bytes_saved - earlier.bytes_saved,
+        )
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+def payload_key(element: ET._Element) -> Optional[PayloadKey]:
+    """Return a key equal for objects with identical payloads, or ``None`` without a mesh.
+
+    The key is a 128-bit BLAKE2 digest of the serialised children and
+    payload attributes, paired with the serialised length.
+    """
+    if element.find("{*}mesh") is None:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    attributes = sorted(
+        (name, value) for name, value in element.attrib.items() if name not in IDENTITY_ATTRIBUTES
+    )
+    digest.update(repr(attributes).encode("utf-8"))
+    length = 0
+    for child in element:
+        data = ET.tostring(child, with_tail=False)
+        digest.update(data)
+        length += len(data)
+    return digest.digest(), length
+
+
+class MeshDeduplicator:
+    """Drop objects whose payload repeats an earlier object of the same model file.
+
+    Use one instance per output model file. Objects streamed element by
+    element (:class:`~bambu_to_prusa.model_processing.StreamedObject`) are
+    written before their payload is known and are never deduplicated.
+    """
+
+    def __init__(self) -> None:
+        self.stats = DedupStats()
+        self.aliases: Dict[str, str] = {}
+        self._originals: Dict[PayloadKey, str] = {}
+
+    def check(self, object_id: str, element) -> Optional[str]:
+        """Return the id of an identical earlier object, or ``None`` if *element* must be written.
+
+        Component references to dropped objects are retargeted first, so
+        assemblies of identical parts deduplicate too.
+        """
+        self.stats.objects += 1
+        if isinstance(element, StreamedObject):
+            return None
+        if self.aliases:
+            for component in element.iterfind("{*}components/{*}component"):
+                target = self.aliases.get(component.get("objectid"))
+                if target is not None:
+                    component.set("objectid", target)
+        key = payload_key(element)
+        if key is None:
+            return None
+        original = self._originals.setdefault(key, object_id)
+        if original == object_id:
+            return None
+        self.aliases[object_id] = original
+        self.stats.duplicates += 1
+        self.stats.bytes_saved += len(ET.tostring(element, with_tail=False))
+        return original
+
+    def target(self, object_id: str) -> str:
+        """Return the id build items of *object_id* should reference."""
+        return self.aliases.get(object_id, object_id)
@@ -4,6 +4,125 @@ import os
 import shutil
 import tempfile
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import IO, Deque, Dict, Iterable, List, Optional
+
+# Method and zlib level for each named preset. PrusaSlicer only reads stored
+# and deflated members, so "small" is maximum-effort deflate rather than LZMA.
+COMPRESSION_PRESETS: Dict[str, tuple[int, Optional[int]]] = {
+    "store": (zipfile.ZIP_STORED, None),
+    "fast": (zipfile.ZIP_DEFLATED, 1),
+    "balanced": (zipfile.ZIP_DEFLATED, 6),
+    "small": (zipfile.ZIP_DEFLATED, 9),
+}
+PARALLEL_BLOCK_SIZE = 1 << 20
+DEFLATE_WINDOW = 32 * 1024
+# General-purpose flag bit marking CRC and sizes as following the data.
+_DATA_DESCRIPTOR_FLAG = 0x08
+
+
+@dataclass(frozen=True)
+class CompressionPolicy:
+    """How members of an output archive are compressed.
+
+    *level* is the zlib level (``None`` for zlib's default). With *threads*
+    above one, deflated members are split into blocks that are compressed
+    concurrently on a thread pool; zlib releases the GIL while it works.
+    """
+
+    method: int = zipfile.ZIP_DEFLATED
+    level: Optional[int] = None
+    threads: int = 1
+
+    def __post_init__(self) -> None:
+        if self.threads < 1:
+            raise ValueError("Compression threads must be at least 1.")
+        if self.level is not None and not 0 <= self.level <= 9:
+            raise ValueError("Compression level must be between 0 and 9.")
+
+    @classmethod
+    def from_preset(cls, name: str = "balanced", level: Optional[int] = None, threads: int = 1) -> "CompressionPolicy":
+        """Build a policy from a preset name, optionally overriding its level."""
+        try:
+            method, preset_level = COMPRESSION_PRESETS[name]
+        except KeyError:
+            raise ValueError(f"Unknown compression preset: {name}") from None
+        if method == zipfile.ZIP_STORED:
+            level = None
+        return cls(method, preset_level if level is None else level, threads)
+
+    @property
+    def parallel(self) -> bool:
+        return self.method == zipfile.ZIP_DEFLATED and self.threads > 1
+
+    def open_archive(self, output_file: str | IO[bytes]) -> zipfile.ZipFile:
+        """Open *output_file* for writing with this policy's method and level."""
+        return zipfile.ZipFile(output_file, "w", self.method, compresslevel=self.level)
+
+    def options(self) -> Dict[str, object]:
+        """Return the settings that affect the bytes written."""
+        # Block-parallel deflate output differs from single-stream output.
+        return {"method": self.method, "level": self.level, "parallel": self.parallel}
+
+
+class ParallelDeflater:
+    """zlib-compressor look-alike that deflates fixed-size blocks on threads.
+
+    Every block but the last ends with a sync flush, so the concatenated
+    output is one valid raw deflate stream (the pigz layout). Each block is
+    primed with the previous block's last 32 KiB to keep the ratio close to
+    single-threaded deflate. At most ``2 * threads`` blocks are in flight.
+    """
+
+    def __init__(self, level: Optional[int], threads: int, block_size: int = PARALLEL_BLOCK_SIZE) -> None:
+        self.level = zlib.Z_DEFAULT_COMPRESSION if level is None else level
+        self.block_size = block_size
+        self.max_pending = threads * 2
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="bambu_deflate")
+        self._buffer = bytearray()
+        self._previous_tail = b""
+        self._pending: Deque[Future] = deque()
+
+    def _deflate(self, block: bytes, zdict: bytes, final: bool) -> bytes:
+        if zdict:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=zdict)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    def _submit(self, block: bytes, final: bool) -> None:
+        self._pending.append(self._executor.submit(self._deflate, block, self._previous_tail, final))
+        self._previous_tail = block[-DEFLATE_WINDOW:]
+
+    def _collect(self, wait_for: int) -> bytes:
+        output = bytearray()
+        while self._pending and (len(self._pending) > wait_for or self._pending[0].done()):
+            output += self._pending.popleft().result()
+        return bytes(output)
+
+    def compress(self, data: bytes) -> bytes:
+        self._buffer += data
+        while len(self._buffer) >= self.block_size * 2:
+            # Keep one block buffered so flush() always has data to finish with.
+            block = bytes(self._buffer[: self.block_size])
+            del self._buffer[: self.block_size]
+            self._submit(block, final=False)
+        return self._collect(self.max_pending)
+
+    def flush(self) -> bytes:
+        try:
+            while len(self._buffer) > self.block_size:
+                block = bytes(self._buffer[: self.block_size])
+                del self._buffer[: self.block_size]
+                self._submit(block, final=False)
+            self._submit(bytes(self._buffer), final=True)
+            self._buffer.clear()
+            return self._collect(0)
+        finally:
+            self._executor.shutdown(wait=True)
 
 
 def create_temp_dir(prefix: str = "bambu_to_prusa_") -> str:
@@ -11,31 +130,159 @@ def create_temp_dir(prefix: str = "bambu_to_prusa_") -> str:
     return tempfile.mkdtemp(prefix=prefix)
 
 
-def decompress_zip(input_file: str, destination: str | None = None) -> str:
-    """Extract *input_file* into *destination* and return the extraction path."""
+def decompress_zip(input_file: str, destination: str | None = None, members: Iterable[str] | None = None) -> str:
+    """Extract *input_file* into *destination* and return the extraction path.
+
+    With *members*, only those members are decompressed, e.g. the names an
+    :class:`~bambu_to_prusa.archive_index.ArchiveIndex` selects by kind.
+    """
     if not input_file:
         raise ValueError("Input file path is required for decompression.")
 
     target_dir = destination or create_temp_dir(prefix="bambu_extract_")
     with zipfile.ZipFile(input_file, "r") as zip_ref:
-        zip_ref.extractall(target_dir)
+        zip_ref.extractall(target_dir, members=list(members) if members is not None else None)
     return target_dir
 
 
-def compress_zip(source_dir: str, output_file: str) -> None:
+def compress_zip(source_dir: str, output_file: str, compression: CompressionPolicy | None = None) -> None:
     """Zip the contents of *source_dir* into *output_file*."""
     if not source_dir or not output_file:
         raise ValueError("Both source directory and output file are required for compression.")
 
-    with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zip_out:
+    compression = compression or CompressionPolicy()
+    with compression.open_archive(output_file) as zip_out:
         for foldername, _, filenames in os.walk(source_dir):
             for filename in filenames:
                 file_path = os.path.join(foldername, filename)
                 arcname = os.path.relpath(file_path, source_dir)
-                zip_out.write(file_path, arcname)
+                if compression.parallel:
+                    with open(file_path, "rb") as source, open_zip_member(
+                        zip_out, arcname.replace(os.sep, "/"), os.path.getsize(file_path), compression
+                    ) as target:
+                        shutil.copyfileobj(source, target, PARALLEL_BLOCK_SIZE)
+                else:
+                    zip_out.write(file_path, arcname)
+
+
+def list_zip_members(zip_ref: zipfile.ZipFile, prefix: str = "", suffix: str = "") -> List[str]:
+    """Return archive member names under *prefix* ending with *suffix*, in archive order."""
+    return [
+        info.filename
+        for info in zip_ref.infolist()
+        if not info.is_dir() and info.filename.startswith(prefix) and info.filename.endswith(suffix)
+    ]
+
+
+def write_zip_member(
+    zip_out: zipfile.ZipFile, arcname: str, data: bytes | str, compression: CompressionPolicy | None = None
+) -> None:
+    """Write *data* into *zip_out* as *arcname* using the archive's compression.
+
+    Members larger than one block are deflated on threads when *compression*
+    asks for it.
+    """
+    if compression is not None and compression.parallel and len(data) > PARALLEL_BLOCK_SIZE:
+        payload = data.encode("utf-8") if isinstance(data, str) else data
+        with open_zip_member(zip_out, arcname, len(payload), compression) as stream:
+            stream.write(payload)
+    else:
+        zip_out.writestr(arcname, data)
+
+
+def open_zip_member(
+    zip_out: zipfile.ZipFile, arcname: str, size_hint: int = 0, compression: CompressionPolicy | None = None
+) -> IO[bytes]:
+    """Open *arcname* in *zip_out* for streaming writes.
+
+    The final size is unknown up front, so ZIP64 records are forced when
+    *size_hint* suggests the member could outgrow the classic ZIP limits.
+    A parallel *compression* policy swaps the member's compressor for a
+    :class:`ParallelDeflater`; the archive must use ``ZIP_DEFLATED``.
+    """
+    force_zip64 = size_hint >= zipfile.ZIP64_LIMIT // 2
+    stream = zip_out.open(arcname, "w", force_zip64=force_zip64)
+    if compression is not None and compression.parallel and zip_out.compression == zipfile.ZIP_DEFLATED:
+        # ``_ZipWriteFile`` only needs ``compress``/``flush`` from its compressor
+        # and tracks the CRC and sizes itself.
+        stream._compressor = ParallelDeflater(compression.level, compression.threads)  # type: ignore[attr-defined]
+    return stream
+
+
+def copy_zip_member_raw(
+    zip_in: zipfile.ZipFile, member: str | zipfile.ZipInfo, zip_out: zipfile.ZipFile, arcname: str | None = None
+) -> zipfile.ZipInfo:
+    """Copy *member* of *zip_in* into *zip_out* without decompressing or recompressing it.
+
+    The compressed bytes are transferred as they are, under a fresh local
+    header carrying the source's method, CRC and sizes, so the copy costs
+    I/O but no CPU. Extra fields (timestamps, stale ZIP64 records) are not
+    carried over.
+    """
+    source_info = member if isinstance(member, zipfile.ZipInfo) else zip_in.getinfo(member)
+    info = zipfile.ZipInfo(arcname or source_info.filename, source_info.date_time)
+    info.compress_type = source_info.compress_type
+    info.CRC = source_info.CRC
+    info.compress_size = source_info.compress_size
+    info.file_size = source_info.file_size
+    info.external_attr = source_info.external_attr
+    # Sizes and CRC go in the local header, so no data descriptor follows.
+    info.flag_bits = source_info.flag_bits & ~_DATA_DESCRIPTOR_FLAG
+    zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+    with zip_in.open(source_info) as source:
+        # ``ZipExtFile`` reads its member's compressed bytes from ``_fileobj``,
+        # already positioned past the local header. On the output side this
+        # mirrors ``ZipFile.write`` for a member whose data is ready.
+        raw = source._fileobj  # type: ignore[attr-defined]
+        with zip_out._lock:  # type: ignore[attr-defined]
+            if zip_out._writing:  # type: ignore[attr-defined]
+                raise ValueError("Can't copy a member while another one is open for writing.")
+            zip_out._writecheck(info)  # type: ignore[attr-defined]
+            zip_out._didModify = True  # type: ignore[attr-defined]
+            if zip_out._seekable:  # type: ignore[attr-defined]
+                zip_out.fp.seek(zip_out.start_dir)  # type: ignore[union-attr]
+            info.header_offset = zip_out.fp.tell()  # type: ignore[union-attr]
+            zip_out.fp.write(info.FileHeader(zip64))  # type: ignore[union-attr]
+            remaining = info.compress_size
+            while remaining:
+                chunk = raw.read(min(PARALLEL_BLOCK_SIZE, remaining))
+                if not chunk:
+                    raise zipfile.BadZipFile(f"Truncated data for member {source_info.filename!r}.")
+                zip_out.fp.write(chunk)  # type: ignore[union-attr]
+                remaining -= len(chunk)
+            zip_out.start_dir = zip_out.fp.tell()  # type: ignore[union-attr]
+            zip_out.filelist.append(info)
+            zip_out.NameToInfo[info.filename] = info
+    return info
+
+
+def copy_zip_member(
+    zip_in: zipfile.ZipFile,
+    member: str | zipfile.ZipInfo,
+    zip_out: zipfile.ZipFile,
+    compression: CompressionPolicy | None = None,
+) -> zipfile.ZipInfo:
+    """Carry *member* of *zip_in* over into *zip_out* unchanged.
+
+    The compressed data is copied raw with :func:`copy_zip_member_raw`,
+    unless a ``store`` *compression* policy asks for uncompressed output and
+    the member is compressed, in which case it is inflated once and stored.
+    """
+    info = member if isinstance(member, zipfile.ZipInfo) else zip_in.getinfo(member)
+    if compression is None or compression.method != zipfile.ZIP_STORED or info.compress_type == zipfile.ZIP_STORED:
+        return copy_zip_member_raw(zip_in, info, zip_out)
+    with zip_in.open(info) as source, open_zip_member(zip_out, info.filename, info.file_size, compression) as target:
+        shutil.copyfileobj(source, target, PARALLEL_BLOCK_SIZE)
+    return zip_out.getinfo(info.filename)
+
+
+def remove_file(path: str | None) -> None:
+    """Remove the provided file if it exists."""
+    if path and os.path.isfile(path):
+        os.remove(path)
 
 
-def cleanup_temp_dir(temp_dir: str | None) -> None:
+def cleanup_temp_dir(temp_dir: str | None, ignore_errors: bool = False) -> None:
     """Remove the provided temporary directory if it exists."""
     if temp_dir and os.path.exists(temp_dir):
-        shutil.rmtree(temp_dir)
+        shutil.rmtree(temp_dir, ignore_errors=ignore_errors)
@@ -0,0 +1,169 @@
+"""Per-stage timing and memory instrumentation for conversions.
+
+Pass a :class:`ConversionObserver` to
+:class:`~bambu_to_prusa.converter.BambuToPrusaConverter` to receive a
+:class:`StageStats` record for every stage of a conversion. Stages nest:
+``convert_archive`` spans the whole call, and because model members are
+streamed, each ``write_model_file`` stage spans reading, cleaning,
+serialising and compressing one member, with the share spent producing
+objects reported separately as a nested ``extract_model_objects`` stage.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+T = TypeVar("T")
+
+CONVERT_ARCHIVE = "convert_archive"
+CACHE_LOOKUP = "cache_lookup"
+CACHE_STORE = "cache_store"
+EXTRACT_MODEL_OBJECTS = "extract_model_objects"
+WRITE_MODEL_FILE = "write_model_file"
+BUILD_PACKAGE = "build_package"
+CARRY_OVER_MEMBERS = "carry_over_members"
+
+
+def peak_rss_bytes() -> int | None:
+    """Return the process high-water RSS, or ``None`` where it is unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class StageStats:
+    """Measurements for one stage of one conversion.
+
+    *peak_memory_bytes* is the process high-water RSS when the stage ended;
+    it only grows, so a jump between stages shows which one raised it.
+    """
+
+    stage: str
+    detail: Optional[str] = None
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    peak_memory_bytes: Optional[int] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class ConversionObserver:
+    """Receives stage events from a converter; override what you need."""
+
+    def stage_started(self, stage: str, detail: Optional[str] = None) -> None:
+        pass
+
+    def stage_finished(self, stats: StageStats) -> None:
+        pass
+
+
+class StageRecorder(ConversionObserver):
+    """Observer that keeps every finished stage for a report."""
+
+    def __init__(self) -> None:
+        self.stages: List[StageStats] = []
+
+    def stage_finished(self, stats: StageStats) -> None:
+        self.stages.append(stats)
+
+    def totals(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-stage sums in the order the stages first finished."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for stats in self.stages:
+            total = totals.setdefault(
+                stats.stage, {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "bytes_in": 0, "bytes_out": 0}
+            )
+            total["count"] += 1
+            total["wall_s"] += stats.wall_s
+            total["cpu_s"] += stats.cpu_s
+            total["bytes_in"] += stats.bytes_in
+            total["bytes_out"] += stats.bytes_out
+        return totals
+
+    def report(self) -> Dict[str, Any]:
+        peaks = [stats.peak_memory_bytes for stats in self.stages if stats.peak_memory_bytes is not None]
+        return {
+            "stages": [stats.as_dict() for stats in self.stages],
+            "totals": self.totals(),
+            "peak_memory_bytes": max(peaks) if peaks else None,
+        }
+
+    def to_json(self, indent: int | None = 2) -> str:
+        return json.dumps(self.report(), indent=indent)
+
+
+@contextmanager
+def measure(
+    observer: Optional[ConversionObserver], stage: str, detail: Optional[str] = None
+) -> Iterator[StageStats]:
+    """Time the enclosed block as *stage* and report it to *observer*.
+
+    The yielded :class:`StageStats` lets the block fill in byte counts, or
+    time spent on the stage elsewhere (a pool worker), which the measured
+    time is added to. The stage is only reported when the block completes.
+    """
+    stats = StageStats(stage, detail)
+    if observer is None:
+        yield stats
+        return
+    observer.stage_started(stage, detail)
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    yield stats
+    stats.wall_s += time.perf_counter() - wall_started
+    stats.cpu_s += time.process_time() - cpu_started
+    stats.peak_memory_bytes = peak_rss_bytes()
+    observer.stage_finished(stats)
+
+
+def record_stage(
+    observer: Optional[ConversionObserver],
+    stage: str,
+    detail: Optional[str] = None,
+    wall_s: float = 0.0,
+    cpu_s: float = 0.0,
+    bytes_in: int = 0,
+    bytes_out: int = 0,
+) -> None:
+    """Report a stage that was timed elsewhere, such as in a pool worker."""
+    if observer is None:
+        return
+    observer.stage_started(stage, detail)
+    observer.stage_finished(StageStats(stage, detail, wall_s, cpu_s, bytes_in, bytes_out, peak_rss_bytes()))
+
+
+class TimedIterator(Iterator[T]):
+    """Iterator wrapper that accumulates the time spent producing items."""
+
+    def __init__(self, items: Iterable[T]) -> None:
+        self._items = iter(items)
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+
+    def __iter__(self) -> "TimedIterator[T]":
+        return self
+
+    def __next__(self) -> T:
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            return next(self._items)
+        finally:
+            self.wall_s += time.perf_counter() - wall_started
+            self.cpu_s += time.process_time() - cpu_started
@@ -0,0 +1,250 @@
+"""Compact, array-backed triangle meshes.
+
+lxml keeps every ``<vertex>`` and ``<triangle>`` of a 3MF mesh as a full
+element with string attributes, several hundred bytes apiece. :class:`Mesh`
+holds the same data in contiguous typed arrays instead: vertex coordinates
+as float64 (or float32) and triangle corners as int32, with the painted
+triangles stored sparsely alongside. NumPy is used when it is installed,
+giving ``(n, 3)`` arrays for vectorised work; otherwise the stdlib
+:mod:`array` module holds the same values as flat sequences.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import lxml.etree as ET
+
+from .model_processing import MODEL_NAMESPACE, SLIC3R_NAMESPACE
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when NumPy is absent
+    np = None
+
+HAS_NUMPY = np is not None
+
+# ``array`` type codes for the supported coordinate precisions.
+FLOAT_TYPECODES = {"float32": "f", "float64": "d"}
+INDEX_TYPECODE = "i"
+PAINT_ATTRIBUTES = ("paint_color", f"{{{SLIC3R_NAMESPACE}}}mmu_segmentation")
+PRUSA_PAINT_ATTRIBUTE = "slic3rpe:mmu_segmentation"
+MESH_WRITE_BATCH = 4096
+
+Bounds = Tuple[Tuple[float, float, float], Tuple[float, float, float]]
+
+# ``<vertices>`` and ``<triangles>`` only hold vertex and triangle children.
+# Plain strings: lxml's default "smart" results each keep a parent reference.
+_VERTEX_COORDINATES = tuple(ET.XPath(f"*/@{axis}", smart_strings=False) for axis in "xyz")
+_TRIANGLE_CORNERS = tuple(ET.XPath(f"*/@v{corner}", smart_strings=False) for corner in "123")
+_HAS_PAINT = {
+    attribute: ET.XPath(f"boolean(*/@{name})", namespaces={"slic3rpe": SLIC3R_NAMESPACE})
+    for attribute, name in zip(PAINT_ATTRIBUTES, ("paint_color", "slic3rpe:mmu_segmentation"))
+}
+
+
+def _float_array(values: Iterable, dtype: str):
+    if np is not None:
+        return np.asarray(values, dtype=np.dtype(dtype))
+    return array(FLOAT_TYPECODES[dtype], (float(value) for value in values))
+
+
+def _index_array(values: Iterable):
+    if np is not None:
+        return np.asarray(values, dtype=np.int32)
+    return array(INDEX_TYPECODE, (int(value) for value in values))
+
+
+def _interleave(columns: Sequence[Sequence[str]], convert: Callable) -> List:
+    """Flatten per-axis attribute strings into ``x0 y0 z0 x1 ...`` order."""
+    flat = [None] * (len(columns[0]) * 3)
+    for offset, column in enumerate(columns):
+        flat[offset::3] = map(convert, column)
+    return flat
+
+
+def _rows(values) -> Iterator[Sequence]:
+    """Yield the ``(a, b, c)`` rows of a vertex or triangle array as Python numbers."""
+    if np is not None and isinstance(values, np.ndarray):
+        yield from values.tolist()
+        return
+    iterator = iter(values.tolist())
+    yield from zip(iterator, iterator, iterator)
+
+
+def _number(value: float) -> str:
+    # The shortest repr that round-trips; integral coordinates stay short.
+    text = repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+def _number32(value: float) -> str:
+    # Nine significant digits round-trip any float32.
+    return f"{value:.9g}"
+
+
+def vertex_bounds(element: ET._Element) -> Optional[Bounds]:
+    """Return the vertex bounds of a ``<mesh>`` or ``<object>`` without building a :class:`Mesh`."""
+    mesh = element if ET.QName(element).localname == "mesh" else element.find("{*}mesh")
+    vertices = mesh.find("{*}vertices") if mesh is not None else None
+    if vertices is None:
+        return None
+    columns = [query(vertices) for query in _VERTEX_COORDINATES]
+    if not columns[0]:
+        return None
+    values = [list(map(float, column)) for column in columns]
+    return tuple(min(axis) for axis in values), tuple(max(axis) for axis in values)
+
+
+class Mesh:
+    """A triangle mesh backed by contiguous arrays.
+
+    *vertices* are ``(x, y, z)`` coordinates and *triangles* are
+    ``(v1, v2, v3)`` vertex indices; both may be given as rows or as flat
+    sequences. With NumPy they are stored as ``(n, 3)`` arrays, otherwise as
+    flat :class:`array.array` buffers. *paint* maps triangle indices to their
+    raw paint state string and is kept as two parallel sequences, so
+    unpainted triangles cost nothing.
+    """
+
+    def __init__(
+        self,
+        vertices: Iterable = (),
+        triangles: Iterable = (),
+        paint: Optional[Dict[int, str]] = None,
+        dtype: str = "float64",
+    ) -> None:
+        if dtype not in FLOAT_TYPECODES:
+            raise ValueError(f"Unsupported vertex dtype {dtype!r}; expected one of {sorted(FLOAT_TYPECODES)}.")
+        self.dtype = dtype
+        self.vertices = self._shaped(_float_array(self._flat(vertices), dtype))
+        self.triangles = self._shaped(_index_array(self._flat(triangles)))
+        paint = paint or {}
+        self.paint_triangles = _index_array(sorted(paint))
+        # Paint states repeat heavily, so equal strings share one object.
+        states: Dict[str, str] = {}
+        self.paint_states: List[str] = [states.setdefault(paint[index], paint[index]) for index in sorted(paint)]
+
+    @staticmethod
+    def _flat(values: Iterable) -> Iterable:
+        if np is not None and isinstance(values, np.ndarray):
+            return values.reshape(-1)
+        values = list(values) if not isinstance(values, (list, tuple, array)) else values
+        if values and isinstance(values[0], (list, tuple)):
+            return [value for row in values for value in row]
+        return values
+
+    @staticmethod
+    def _shaped(values):
+        if len(values) % 3:
+            raise ValueError("Mesh arrays need three values per vertex or triangle.")
+        return values.reshape(-1, 3) if np is not None else values
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.vertices) if np is not None else len(self.vertices) // 3
+
+    @property
+    def triangle_count(self) -> int:
+        return len(self.triangles) if np is not None else len(self.triangles) // 3
+
+    @property
+    def paint(self) -> Dict[int, str]:
+        """Return the painted triangles as ``{triangle_index: state}``."""
+        return dict(zip(self.paint_triangles.tolist(), self.paint_states))
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate bytes held by the mesh arrays (paint strings are shared)."""
+        arrays = (self.vertices, self.triangles, self.paint_triangles)
+        if np is not None:
+            array_bytes = sum(values.nbytes for values in arrays)
+        else:
+            array_bytes = sum(len(values) * values.itemsize for values in arrays)
+        return array_bytes + 8 * len(self.paint_states)
+
+    def bounds(self) -> Optional[Bounds]:
+        """Return ``((min_x, min_y, min_z), (max_x, max_y, max_z))``, or ``None`` when empty."""
+        if not self.vertex_count:
+            return None
+        if np is not None:
+            return tuple(self.vertices.min(axis=0).tolist()), tuple(self.vertices.max(axis=0).tolist())
+        axes = [self.vertices[offset::3] for offset in range(3)]
+        return tuple(min(axis) for axis in axes), tuple(max(axis) for axis in axes)
+
+    @classmethod
+    def from_element(cls, element: ET._Element, dtype: str = "float64") -> "Mesh":
+        """Build a mesh from a 3MF ``<mesh>`` element, or an ``<object>`` holding one.
+
+        Coordinates and indices are gathered with compiled XPath queries
+        rather than a Python loop over the elements. Paint states are read
+        from Bambu ``paint_color`` or Prusa ``mmu_segmentation`` attributes.
+        """
+        mesh = element if ET.QName(element).localname == "mesh" else element.find("{*}mesh")
+        if mesh is None:
+            return cls(dtype=dtype)
+        vertices = mesh.find("{*}vertices")
+        triangles = mesh.find("{*}triangles")
+        vertex_values: Iterable = ()
+        triangle_values: Iterable = ()
+        if vertices is not None:
+            vertex_values = _interleave([query(vertices) for query in _VERTEX_COORDINATES], float)
+        paint: Dict[int, str] = {}
+        if triangles is not None:
+            triangle_values = _interleave([query(triangles) for query in _TRIANGLE_CORNERS], int)
+            # Bambu states win over Prusa ones if a triangle somehow has both.
+            for attribute in reversed(PAINT_ATTRIBUTES):
+                if _HAS_PAINT[attribute](triangles):
+                    states = [triangle.get(attribute) for triangle in triangles]
+                    paint.update((index, state) for index, state in enumerate(states) if state)
+        return cls(vertex_values, triangle_values, paint, dtype)
+
+    @classmethod
+    def from_xml(cls, data: bytes | str, dtype: str = "float64") -> "Mesh":
+        """Parse a serialised ``<mesh>`` or ``<object>`` into a mesh."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        parser = ET.XMLParser(huge_tree=True, remove_blank_text=True)
+        return cls.from_element(ET.fromstring(data, parser), dtype)
+
+    def iter_xml(self, paint_attribute: str = PRUSA_PAINT_ATTRIBUTE) -> Iterator[str]:
+        """Yield the ``<mesh>`` markup in batches of elements, without a namespace declaration.
+
+        The text is meant to be written inside an ``<object>`` whose default
+        namespace is the 3MF core namespace and which binds the ``slic3rpe``
+        prefix used by the default *paint_attribute*.
+        """
+        number = _number32 if self.dtype == "float32" else _number
+        yield "<mesh><vertices>"
+        batch: List[str] = []
+        for x, y, z in _rows(self.vertices):
+            batch.append(f'<vertex x="{number(x)}" y="{number(y)}" z="{number(z)}"/>')
+            if len(batch) >= MESH_WRITE_BATCH:
+                yield "".join(batch)
+                batch.clear()
+        yield "".join(batch) + "</vertices><triangles>"
+        batch.clear()
+        painted = iter(zip(self.paint_triangles.tolist(), self.paint_states))
+        next_painted, state = next(painted, (-1, None))
+        for index, (v1, v2, v3) in enumerate(_rows(self.triangles)):
+            if index == next_painted:
+                batch.append(f'<triangle v1="{v1}" v2="{v2}" v3="{v3}" {paint_attribute}="{state}"/>')
+                next_painted, state = next(painted, (-1, None))
+            else:
+                batch.append(f'<triangle v1="{v1}" v2="{v2}" v3="{v3}"/>')
+            if len(batch) >= MESH_WRITE_BATCH:
+                yield "".join(batch)
+                batch.clear()
+        yield "".join(batch) + "</triangles></mesh>"
+
+    def to_xml(self, paint_attribute: str = PRUSA_PAINT_ATTRIBUTE) -> str:
+        """Serialise the mesh as a ``<mesh>`` fragment; see :meth:`iter_xml`."""
+        return "".join(self.iter_xml(paint_attribute))
+
+    def to_element(self) -> ET._Element:
+        """Return the mesh as a standalone lxml ``<mesh>`` element in the core namespace."""
+        wrapper = (
+            f'<object xmlns="{MODEL_NAMESPACE}" xmlns:slic3rpe="{SLIC3R_NAMESPACE}">{self.to_xml()}</object>'
+        )
+        return ET.fromstring(wrapper.encode("utf-8"), ET.XMLParser(huge_tree=True))[0]
@@ -5,9 +5,23 @@ import lxml.etree as ET
 from .model_processing import DEFAULT_TRANSFORM
 
 
-def build_prusa_model(objects, template_path: str) -> ET._ElementTree:
-    """Inject model objects into the Prusa template and return a tree."""
-    tree = ET.parse(template_path)
+def build_item_attributes(object_id, transform: str = DEFAULT_TRANSFORM) -> dict[str, str]:
+    """Return the attributes of the ``<build><item>`` referencing *object_id*."""
+    return {"objectid": str(object_id), "transform": transform, "printable": "1"}
+
+
+def build_prusa_model(objects, template: str | ET._ElementTree, layout=None, dedup=None) -> ET._ElementTree:
+    """Inject model objects into the Prusa template and return a tree.
+
+    *template* is either the template path or an already parsed template tree,
+    such as a copy handed out by :class:`~bambu_to_prusa.template_registry.TemplateRegistry`,
+    which is modified in place. *layout*, a
+    :class:`~bambu_to_prusa.placement.BuildLayout`, chooses the build items;
+    without one every object gets a single item at ``DEFAULT_TRANSFORM``.
+    *dedup*, a :class:`~bambu_to_prusa.dedup.MeshDeduplicator`, leaves out
+    objects repeating an earlier mesh and points their items at it.
+    """
+    tree = ET.parse(template) if isinstance(template, str) else template
     model = tree.getroot()
     resources = model.find(".//{*}resources")
     build = model.find(".//{*}build")
@@ -16,11 +30,18 @@ def build_prusa_model(objects, template_path: str) -> ET._ElementTree:
         raise ValueError("Template is missing required elements.")
 
     for object_id, element in objects.items():
+        if layout is not None:
+            layout.observe(object_id, element)
+        if dedup is not None and dedup.check(object_id, element) is not None:
+            continue
         resources.append(element)
-        build.append(
-            ET.Element(
-                "item", objectid=str(object_id), transform=DEFAULT_TRANSFORM, printable="1"
-            )
-        )
+    if layout is not None:
+        instances = layout.instances(objects)
+    else:
+        instances = [(object_id, DEFAULT_TRANSFORM) for object_id in objects]
+    for object_id, transform in instances:
+        if dedup is not None:
+            object_id = dedup.target(object_id)
+        build.append(ET.Element("item", build_item_attributes(object_id, transform)))
 
     return tree
@@ -1,15 +1,37 @@
 from __future__ import annotations
 
+import copy
 import os
 import re
-from typing import Dict
+import threading
+import zipfile
+from contextlib import contextmanager
+from typing import IO, Callable, Dict, Iterator, List, Optional, Union
 
 import lxml.etree as ET
 
+from .paint import PaintTranscoder
+
 MODEL_NAMESPACE = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
 SLIC3R_NAMESPACE = "http://schemas.slic3r.org/3mf/2017/06"
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
 DEFAULT_TRANSFORM = "0.799151571 0 0 0 0.799151571 0 0 0 0.799151571 184.67373 221.31425 1.61151839"
 
+PRUSA_NSMAP = {None: MODEL_NAMESPACE, "slic3rpe": SLIC3R_NAMESPACE}
+PRUSA_ROOT_ATTRIBUTES = {"unit": "millimeter", f"{{{XML_NAMESPACE}}}lang": "en-US"}
+# Attributes are matched on their local name so both declared (``p:UUID``) and
+# undeclared prefixes, which the recovering parser keeps verbatim, are caught.
+STRIPPED_ATTRIBUTES = frozenset({"UUID", "paint_seam"})
+# Bambu paint codes are transcoded into PrusaSlicer's attribute.
+PAINT_ATTRIBUTE = "paint_color"
+SEGMENTATION_ATTRIBUTE = f"{{{SLIC3R_NAMESPACE}}}mmu_segmentation"
+READ_CHUNK_SIZE = 1 << 20
+# Shared by conversions without their own transcoder; its memo only holds
+# identity transcodings.
+DEFAULT_TRANSCODER = PaintTranscoder()
+
+ModelSource = Union[str, bytes, IO[bytes]]
+
 
 def read_model_file(path: str) -> str:
     if not os.path.exists(path):
@@ -18,34 +40,441 @@ def read_model_file(path: str) -> str:
         return file_handle.read()
 
 
+def open_model_file(path: str) -> IO[bytes]:
+    """Open *path* for binary streaming into the model parser."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Model file not found: {path}")
+    return open(path, "rb")
+
+
+def _local_name(name: str) -> str:
+    # Undeclared prefixes survive recovery verbatim (``p:UUID``), so strip both forms.
+    return name.rsplit("}", 1)[-1].rsplit(":", 1)[-1]
+
+
+ROOT_START_TAG = re.compile(rb"<model\b[^>]*>")
+DEFAULT_NAMESPACE_DECLARATION = re.compile(rb"""\sxmlns\s*=\s*(?:"[^"]*"|'[^']*')""")
+ROOT_SEARCH_LIMIT = 1 << 16
+# Only these elements carry production-extension ``UUID`` attributes; walking
+# them instead of every vertex and triangle keeps attribute cleanup cheap.
+UUID_TAGS = ("{*}model", "{*}object", "{*}component", "{*}build", "{*}item")
+_PAINTED_ELEMENTS = ET.XPath(".//*[@paint_color or @paint_seam]")
+
+
+def _rewrite_root_tag(start_tag: bytes) -> bytes:
+    """Move the root ``<model>`` start tag into the 3MF core namespace.
+
+    Rewriting the declaration lets libxml2 place every element in the right
+    namespace while it parses, instead of renaming each tag in Python.
+    """
+    body = DEFAULT_NAMESPACE_DECLARATION.sub(b"", start_tag[len(b"<model") : -1])
+    declarations = b' xmlns="' + MODEL_NAMESPACE.encode() + b'"'
+    if b"xmlns:slic3rpe" not in body:
+        declarations += b' xmlns:slic3rpe="' + SLIC3R_NAMESPACE.encode() + b'"'
+    return b"<model" + declarations + body + b">"
+
+
+def _with_prusa_root(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Pass *chunks* through with the root start tag rewritten."""
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        match = ROOT_START_TAG.search(head)
+        if match is None and len(head) < ROOT_SEARCH_LIMIT:
+            continue
+        if match is not None:
+            head = head[: match.start()] + _rewrite_root_tag(match.group()) + head[match.end() :]
+        yield head
+        yield from chunks
+        return
+    if head:
+        match = ROOT_START_TAG.search(head)
+        if match is not None:
+            head = head[: match.start()] + _rewrite_root_tag(match.group()) + head[match.end() :]
+        yield head
+
+
+def _clean_attributes(element: ET._Element, transcoder: PaintTranscoder | None = None) -> None:
+    """Drop Bambu-only attributes and transcode paint data below *element*."""
+    transcoder = transcoder or DEFAULT_TRANSCODER
+    for node in element.iter(*UUID_TAGS):
+        for name in [name for name in node.attrib if _local_name(name) == "UUID"]:
+            del node.attrib[name]
+    for node in _PAINTED_ELEMENTS(element):
+        attrib = node.attrib
+        for name in STRIPPED_ATTRIBUTES.intersection(attrib):
+            del attrib[name]
+        code = attrib.pop(PAINT_ATTRIBUTE, None)
+        if code is not None:
+            code = transcoder(code)
+            if code is not None:
+                attrib[SEGMENTATION_ATTRIBUTE] = code
+
+
+# Parser flavours lent out by ``_model_parser``.
+OBJECT_PARSER = "objects"
+DOCUMENT_PARSER = "document"
+ELEMENT_PARSER = "elements"
+
+
+def _new_model_parser(kind: str) -> ET._FeedParser:
+    # Bambu exports are UTF-8 regardless of what the declaration claims, and
+    # ``recover`` tolerates the undeclared ``p:`` prefix seen in some files.
+    if kind == DOCUMENT_PARSER:
+        return ET.XMLParser(encoding="utf-8", recover=True, huge_tree=True)
+    if kind == ELEMENT_PARSER:
+        return ET.XMLPullParser(events=("start", "end"), encoding="utf-8", recover=True, huge_tree=True)
+    return ET.XMLPullParser(
+        events=("end",), tag=("{*}object", "{*}item"), encoding="utf-8", recover=True, huge_tree=True
+    )
+
+
+_parser_cache = threading.local()
+
+
+@contextmanager
+def _model_parser(kind: str = OBJECT_PARSER) -> Iterator[ET._FeedParser]:
+    """Lend out a parser owned by the current thread.
+
+    Parsers are returned to a per-thread free list after use, so repeated
+    model conversions skip parser construction. Nested use on one thread (for
+    example two interleaved :func:`iter_model_objects` generators) simply
+    takes another parser from the list.
+    """
+    pools = getattr(_parser_cache, "pools", None)
+    if pools is None:
+        pools = _parser_cache.pools = {}
+    free: List[ET._FeedParser] = pools.setdefault(kind, [])
+    parser = free.pop() if free else _new_model_parser(kind)
+    try:
+        yield parser
+    except BaseException:
+        # Closing discards the half-parsed document, and its events are
+        # drained so the next conversion on this thread cannot receive them;
+        # a parser that fails to reset is dropped rather than reused.
+        try:
+            parser.close()
+        except ET.XMLSyntaxError:
+            pass
+        try:
+            if isinstance(parser, ET.XMLPullParser):
+                for _ in parser.read_events():
+                    pass
+        except Exception:
+            pass
+        else:
+            free.append(parser)
+        raise
+    else:
+        free.append(parser)
+
+
+def _iter_chunks(source: ModelSource) -> Iterator[bytes]:
+    if isinstance(source, str):
+        for start in range(0, len(source), READ_CHUNK_SIZE):
+            yield source[start : start + READ_CHUNK_SIZE].encode("utf-8")
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for start in range(0, len(view), READ_CHUNK_SIZE):
+            yield bytes(view[start : start + READ_CHUNK_SIZE])
+    else:
+        while True:
+            chunk = source.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+BuildItems = Dict[str, List[Optional[str]]]
+
+
+def _record_build_item(element: ET._Element, parent: ET._Element | None, build_items: BuildItems | None) -> None:
+    if build_items is not None and parent is not None and _local_name(parent.tag) == "build":
+        object_id = element.get("objectid")
+        if object_id is not None:
+            build_items.setdefault(object_id, []).append(element.get("transform"))
+
+
+def _pop_model_objects(
+    parser: ET.XMLPullParser, build_items: BuildItems | None = None, transcoder: PaintTranscoder | None = None
+) -> Iterator[tuple[str, ET._Element]]:
+    for _, element in parser.read_events():
+        parent = element.getparent()
+        if _local_name(element.tag) == "item":
+            _record_build_item(element, parent, build_items)
+        elif parent is not None and _local_name(parent.tag) == "resources" and element.get("type") == "model":
+            _clean_attributes(element, transcoder)
+            # The copy is detached from the document and only keeps the
+            # namespace declarations it uses.
+            detached = copy.deepcopy(element)
+            detached.tail = None
+            yield element.attrib["id"], detached
+        # Drop the parsed subtree so memory stays bounded by one object.
+        element.clear()
+        if parent is not None:
+            parent.remove(element)
+
+
+def iter_model_objects(
+    source: ModelSource, build_items: BuildItems | None = None, transcoder: PaintTranscoder | None = None
+) -> Iterator[tuple[str, ET._Element]]:
+    """Stream ``(object_id, element)`` pairs for the model objects in *source*.
+
+    *source* may be model bytes, a binary file object or model text. Bytes are
+    handed to the parser as-is and each object is cleaned and released as soon
+    as it closes, so no full copy of the document is ever held in memory.
+
+    When *build_items* is given, the document's ``<build>`` items are recorded
+    in it as ``{objectid: [transform, ...]}`` (``None`` for an item without a
+    transform); it is complete once the iterator is exhausted. Paint codes
+    go through *transcoder*, a :class:`~bambu_to_prusa.paint.PaintTranscoder`.
+    """
+    with _model_parser() as parser:
+        for chunk in _with_prusa_root(_iter_chunks(source)):
+            parser.feed(chunk)
+            yield from _pop_model_objects(parser, build_items, transcoder)
+        parser.close()
+        yield from _pop_model_objects(parser, build_items, transcoder)
+
+
+CORE_PREFIX = f"{{{MODEL_NAMESPACE}}}"
+SLIC3R_PREFIX = f"{{{SLIC3R_NAMESPACE}}}"
+XML_PREFIX = f"{{{XML_NAMESPACE}}}"
+OBJECT_TAG = f"{CORE_PREFIX}object"
+TRIANGLE_TAG = f"{CORE_PREFIX}triangle"
+VERTEX_TAG = f"{CORE_PREFIX}vertex"
+ITEM_TAG = f"{CORE_PREFIX}item"
+COMPONENT_TAG = f"{CORE_PREFIX}component"
+# Streamed objects declare their namespaces themselves, like the detached
+# copies from ``iter_model_objects``, so they are valid under any template.
+STREAMED_OBJECT_NAMESPACES = f' xmlns="{MODEL_NAMESPACE}" xmlns:slic3rpe="{SLIC3R_NAMESPACE}"'
+STREAM_WRITE_SIZE = 1 << 16
+TRIANGLE_REPORT_INTERVAL = 10_000
+_ESCAPES = {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "\t": "&#9;", "\n": "&#10;", "\r": "&#13;"}
+_ATTRIBUTE_SPECIALS = re.compile(r'[&<>"\t\n\r]')
+_TEXT_SPECIALS = re.compile(r"[&<>]")
+
+
+def _escape(value: str, specials: re.Pattern) -> str:
+    return specials.sub(lambda match: _ESCAPES[match.group()], value)
+
+
+def _qualified_name(name: str, declarations: Dict[str, str]) -> str:
+    """Return the serialised form of *name*, registering foreign namespaces."""
+    if not name.startswith("{"):
+        return name
+    if name.startswith(CORE_PREFIX):
+        return name[len(CORE_PREFIX) :]
+    if name.startswith(SLIC3R_PREFIX):
+        return f"slic3rpe:{name[len(SLIC3R_PREFIX):]}"
+    if name.startswith(XML_PREFIX):
+        return f"xml:{name[len(XML_PREFIX):]}"
+    namespace, local = name[1:].split("}", 1)
+    prefix = declarations.setdefault(namespace, f"ns{len(declarations)}")
+    return f"{prefix}:{local}"
+
+
+def _start_tag(element: ET._Element, transcoder: PaintTranscoder) -> tuple[str, str]:
+    """Return the cleaned name and unterminated start tag of *element*."""
+    declarations: Dict[str, str] = {}
+    name = _qualified_name(element.tag, declarations)
+    parts = [f"<{name}"]
+    for key, value in element.attrib.items():
+        if _local_name(key) in STRIPPED_ATTRIBUTES:
+            continue
+        if key == PAINT_ATTRIBUTE:
+            value = transcoder(value)
+            if value is None:
+                continue
+            key = SEGMENTATION_ATTRIBUTE
+        parts.append(f' {_qualified_name(key, declarations)}="{_escape(value, _ATTRIBUTE_SPECIALS)}"')
+    if declarations:
+        parts.insert(1, "".join(f' xmlns:{prefix}="{namespace}"' for namespace, prefix in declarations.items()))
+    return name, "".join(parts)
+
+
+def _release(element: ET._Element) -> None:
+    """Free a finished element and the siblings parsed before it."""
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+class StreamedObject:
+    """A model ``<object>`` that is cleaned and written while it is parsed.
+
+    Produced by :func:`iter_streamed_objects`. Its subtree is never built:
+    :meth:`write_to` pulls parser events, writes each element as soon as it
+    ends and frees it, so memory does not depend on the size of the mesh.
+    Whitespace between elements is not preserved.
+    """
+
+    def __init__(
+        self,
+        object_id: str,
+        element: ET._Element,
+        events: Iterator[tuple[str, ET._Element]],
+        transcoder: PaintTranscoder | None = None,
+    ) -> None:
+        self.object_id = object_id
+        self.element = element
+        self.done = False
+        self.triangles = 0
+        # Called with the number of triangles written since the last call.
+        self.on_triangles: Callable[[int], None] | None = None
+        # Set before writing to have the vertex bounds recorded in ``bounds``.
+        self.collect_bounds = False
+        self.bounds: tuple[tuple[float, ...], tuple[float, ...]] | None = None
+        # Ids of the objects referenced by the object's components, once written.
+        self.components: List[str] = []
+        self._events = events
+        self._transcoder = transcoder or DEFAULT_TRANSCODER
+
+    def write_to(self, write: Callable[[bytes], object]) -> None:
+        """Write the cleaned object as UTF-8 to *write*, consuming its events."""
+        if self.done:
+            raise RuntimeError(f"Object {self.object_id} was already written.")
+        name, start = _start_tag(self.element, self._transcoder)
+        out: List[str] = [start, STREAMED_OBJECT_NAMESPACES, ">"]
+        buffered = 0
+        open_names: List[str] = []
+        # Start tags are held back until the element either gets a child (a
+        # container) or ends (a leaf, which can then be self-closing).
+        pending: tuple[ET._Element, str, str] | None = None
+        reported = 0
+        lower = [float("inf")] * 3
+        upper = [float("-inf")] * 3
+        for event, element in self._events:
+            if event == "start":
+                if pending is not None:
+                    out.append(pending[2] + ">")
+                    open_names.append(pending[1])
+                pending = (element, *_start_tag(element, self._transcoder))
+                continue
+            if element is self.element:
+                out.append(f"</{name}>")
+                break
+            if pending is not None and pending[0] is element:
+                text = element.text
+                if text:
+                    out.append(f"{pending[2]}>{_escape(text, _TEXT_SPECIALS)}</{pending[1]}>")
+                else:
+                    out.append(pending[2] + "/>")
+                pending = None
+                if element.tag == TRIANGLE_TAG:
+                    self.triangles += 1
+                elif self.collect_bounds and element.tag == VERTEX_TAG:
+                    for axis, attribute in enumerate("xyz"):
+                        value = float(element.get(attribute, 0.0))
+                        if value < lower[axis]:
+                            lower[axis] = value
+                        if value > upper[axis]:
+                            upper[axis] = value
+                elif element.tag == COMPONENT_TAG:
+                    self.components.append(element.get("objectid"))
+            else:
+                out.append(f"</{open_names.pop()}>")
+            _release(element)
+            buffered += 1
+            if buffered >= 1024:
+                chunk = "".join(out).encode("utf-8")
+                if len(chunk) >= STREAM_WRITE_SIZE:
+                    write(chunk)
+                    out.clear()
+                else:
+                    out = [chunk.decode("utf-8")]
+                buffered = 0
+                if self.on_triangles is not None and self.triangles - reported >= TRIANGLE_REPORT_INTERVAL:
+                    self.on_triangles(self.triangles - reported)
+                    reported = self.triangles
+        self.done = True
+        if lower[0] <= upper[0]:
+            self.bounds = tuple(lower), tuple(upper)
+        write("".join(out).encode("utf-8"))
+        if self.on_triangles is not None and self.triangles > reported:
+            self.on_triangles(self.triangles - reported)
+
+    def skip(self) -> None:
+        """Consume the object's events without writing it."""
+        for event, element in self._events:
+            if event == "end":
+                if element is self.element:
+                    break
+                _release(element)
+        self.done = True
+
+
+def _iter_events(parser: ET.XMLPullParser, source: ModelSource) -> Iterator[tuple[str, ET._Element]]:
+    for chunk in _with_prusa_root(_iter_chunks(source)):
+        parser.feed(chunk)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def iter_streamed_objects(
+    source: ModelSource, build_items: BuildItems | None = None, transcoder: PaintTranscoder | None = None
+) -> Iterator[tuple[str, StreamedObject]]:
+    """Stream ``(object_id, StreamedObject)`` pairs for the model objects in *source*.
+
+    The low-memory counterpart of :func:`iter_model_objects`: each object
+    must be written (or is skipped) before the next one is produced, and no
+    object subtree is ever held in memory. *build_items* and *transcoder*
+    work as in :func:`iter_model_objects`.
+    """
+    with _model_parser(ELEMENT_PARSER) as parser:
+        events = _iter_events(parser, source)
+        path: List[str] = []
+        for event, element in events:
+            if event == "end":
+                path.pop()
+                if element.tag == ITEM_TAG:
+                    _record_build_item(element, element.getparent(), build_items)
+                _release(element)
+                continue
+            if element.tag == OBJECT_TAG and len(path) == 2 and _local_name(path[-1]) == "resources":
+                if element.get("type") == "model":
+                    streamed = StreamedObject(element.attrib["id"], element, events, transcoder)
+                    yield streamed.object_id, streamed
+                    if not streamed.done:
+                        streamed.skip()
+                else:
+                    StreamedObject("", element, events).skip()
+                _release(element)
+                continue
+            path.append(element.tag)
+
+
 def clean_model_content(content: str) -> str:
     """Remove Bambu specific attributes and normalise namespaces."""
-    rem_xmlns = re.sub(r"xmlns=[^\s>]+", "", content)
-    rem_puuid = re.sub(r"p:UUID[^\"]+\"[^\"]+\"", "", rem_xmlns)
-    rem_encoding = re.sub(r"encoding=[\'\"][\w\d-]+[\'\"]", "", rem_puuid)
-    rem_paint_color = rem_encoding.replace("paint_color", "slic3rpe:mmu_segmentation")
-    rem_paint_seam = re.sub(r"paint_seam=\"[0-9A-Z]*\"", "", rem_paint_color)
-    return re.sub(
-        r"<model[ ].*?>",
-        f'<model unit="millimeter" xml:lang="en-US" xmlns="{MODEL_NAMESPACE}" xmlns:slic3rpe="{SLIC3R_NAMESPACE}">',
-        rem_paint_seam,
-    )
+    with _model_parser(DOCUMENT_PARSER) as parser:
+        for chunk in _with_prusa_root(_iter_chunks(content)):
+            parser.feed(chunk)
+        root = parser.close()
+    _clean_attributes(root)
+    root.attrib.clear()
+    root.attrib.update(PRUSA_ROOT_ATTRIBUTES)
+    ET.cleanup_namespaces(root)
+    return ET.tostring(root, encoding="unicode")
 
 
 def extract_model_objects(clean_xml: str) -> Dict[str, ET._Element]:
     """Return a dictionary of object id to XML element for model objects."""
-    bambu_tree = ET.fromstring(clean_xml)
-    objects = bambu_tree.findall(".//{*}resources/{*}object")
+    return dict(iter_model_objects(clean_xml))
+
 
-    relevant_objects: Dict[str, ET._Element] = {}
-    for obj in objects:
-        if obj.attrib.get("type") == "model":
-            relevant_objects[obj.attrib["id"]] = obj
-    return relevant_objects
+def convert_model_content(content: ModelSource) -> Dict[str, ET._Element]:
+    return dict(iter_model_objects(content))
 
 
 def convert_model_file(path: str) -> tuple[str, Dict[str, ET._Element]]:
-    content = read_model_file(path)
-    cleaned = clean_model_content(content)
-    objects = extract_model_objects(cleaned)
-    return os.path.basename(path), objects
+    with open_model_file(path) as model_stream:
+        return os.path.basename(path), convert_model_content(model_stream)
+
+
+def convert_model_member(zip_ref: zipfile.ZipFile, member: str) -> tuple[str, Dict[str, ET._Element]]:
+    """Convert the model stored as *member* of *zip_ref* without extracting it."""
+    with zip_ref.open(member) as model_stream:
+        return os.path.basename(member), convert_model_content(model_stream)
@@ -2,11 +2,20 @@ from __future__ import annotations
 
 import os
 import shutil
-from typing import Iterable
+import zipfile
+from typing import IO, Iterable, List
 
 import lxml.etree as ET
 
-from .file_ops import compress_zip
+from .dedup import MeshDeduplicator
+from .file_ops import PARALLEL_BLOCK_SIZE, CompressionPolicy, compress_zip, open_zip_member, write_zip_member
+from .model_injection import build_item_attributes
+from .model_processing import XML_NAMESPACE, StreamedObject
+from .placement import BuildLayout
+from .template_registry import get_template_registry
+
+MODELS_ARCDIR = "3D/Objects"
+RELATIONSHIP_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/3dmodel"
 
 
 def write_model_file(model_tree: ET._ElementTree, filename: str, target_root: str) -> str:
@@ -17,6 +26,143 @@ def write_model_file(model_tree: ET._ElementTree, filename: str, target_root: st
     return model_path
 
 
+def serialise_model(model_tree: ET._ElementTree, pretty_print: bool = False) -> bytes:
+    return ET.tostring(model_tree, encoding="utf-8", xml_declaration=True, pretty_print=pretty_print)
+
+
+def _writer_attrib(element: ET._Element) -> dict[str, str]:
+    # ``xmlfile`` binds the reserved XML namespace to a generated prefix, so
+    # attributes such as xml:lang are passed with their literal name instead.
+    xml_prefix = f"{{{XML_NAMESPACE}}}"
+    return {
+        (f"xml:{name[len(xml_prefix):]}" if name.startswith(xml_prefix) else name): value
+        for name, value in element.attrib.items()
+    }
+
+
+def _write_template_element(xf, element: ET._Element) -> None:
+    with xf.element(element.tag, _writer_attrib(element)):
+        if element.text:
+            xf.write(element.text)
+        for child in element:
+            if isinstance(child.tag, str):
+                _write_template_element(xf, child)
+            if child.tail:
+                xf.write(child.tail)
+
+
+def write_prusa_model(
+    stream: IO[bytes],
+    objects: Iterable[tuple[str, ET._Element]],
+    template: ET._ElementTree,
+    pretty_print: bool = False,
+    layout: BuildLayout | None = None,
+    dedup: MeshDeduplicator | None = None,
+) -> List[str]:
+    """Incrementally serialise a Prusa model into the binary *stream*.
+
+    The template header is written first, then each object subtree as it
+    arrives from *objects* (typically :func:`~bambu_to_prusa.model_processing.iter_model_objects`),
+    and finally ``<build>``, whose items *layout* (a
+    :class:`~bambu_to_prusa.placement.BuildLayout`) chooses once every object
+    has been seen; without one each object gets a single default item.
+    With *dedup*, objects repeating an earlier object's mesh are not written
+    and their items reference that object instead.
+    Objects are never gathered into a single tree, so memory is bounded by
+    the largest object; :class:`~bambu_to_prusa.model_processing.StreamedObject`
+    items are copied element by element and not even that is held. Returns
+    the object ids that were written.
+    """
+    layout = layout or BuildLayout()
+    model = template.getroot()
+    object_ids: List[str] = []
+    written: List[str] = []
+    with ET.xmlfile(stream, encoding="utf-8") as xf:
+        xf.write_declaration()
+        with xf.element(model.tag, _writer_attrib(model), nsmap=model.nsmap):
+            if model.text:
+                xf.write(model.text)
+            for child in model:
+                local_name = ET.QName(child).localname if isinstance(child.tag, str) else None
+                if local_name == "resources":
+                    with xf.element(child.tag, _writer_attrib(child)):
+                        for object_id, element in objects:
+                            layout.observe(object_id, element)
+                            object_ids.append(object_id)
+                            if dedup is not None and dedup.check(object_id, element) is not None:
+                                continue
+                            if isinstance(element, StreamedObject):
+                                xf.flush()
+                                element.write_to(stream.write)
+                            else:
+                                xf.write(element, pretty_print=pretty_print)
+                            xf.write("\n")
+                            written.append(object_id)
+                            xf.flush()
+                elif local_name == "build":
+                    item_tag = ET.QName(ET.QName(child).namespace, "item").text
+                    with xf.element(child.tag, _writer_attrib(child)):
+                        for object_id, transform in layout.instances(object_ids):
+                            if dedup is not None:
+                                object_id = dedup.target(object_id)
+                            with xf.element(item_tag, build_item_attributes(object_id, transform)):
+                                pass
+                            xf.write("\n")
+                elif local_name is not None:
+                    _write_template_element(xf, child)
+                if child.tail:
+                    xf.write(child.tail)
+    return written
+
+
+def stream_model_member(
+    objects: Iterable[tuple[str, ET._Element]],
+    filename: str,
+    template: ET._ElementTree,
+    zip_out: zipfile.ZipFile,
+    pretty_print: bool = False,
+    size_hint: int = 0,
+    compression: CompressionPolicy | None = None,
+    layout: BuildLayout | None = None,
+    dedup: MeshDeduplicator | None = None,
+) -> str:
+    """Serialise *objects* with :func:`write_prusa_model` straight into a member of *zip_out*."""
+    arcname = f"{MODELS_ARCDIR}/{filename}"
+    with open_zip_member(zip_out, arcname, size_hint, compression) as stream:
+        write_prusa_model(stream, objects, template, pretty_print, layout, dedup)
+    return arcname
+
+
+def write_model_member(
+    model_tree: ET._ElementTree | bytes,
+    filename: str,
+    zip_out: zipfile.ZipFile,
+    compression: CompressionPolicy | None = None,
+) -> str:
+    """Write *model_tree* straight into *zip_out* under ``3D/Objects``.
+
+    *model_tree* may also be a model that was already serialised, for example
+    by a worker process.
+    """
+    arcname = f"{MODELS_ARCDIR}/{filename}"
+    data = model_tree if isinstance(model_tree, bytes) else serialise_model(model_tree)
+    write_zip_member(zip_out, arcname, data, compression)
+    return arcname
+
+
+def copy_model_member(
+    path: str,
+    filename: str,
+    zip_out: zipfile.ZipFile,
+    compression: CompressionPolicy | None = None,
+) -> str:
+    """Copy a model serialised to *path* into *zip_out* under ``3D/Objects``."""
+    arcname = f"{MODELS_ARCDIR}/{filename}"
+    with open(path, "rb") as source, open_zip_member(zip_out, arcname, os.path.getsize(path), compression) as stream:
+        shutil.copyfileobj(source, stream, PARALLEL_BLOCK_SIZE)
+    return arcname
+
+
 def copy_content_types(template_path: str, target_root: str) -> str:
     os.makedirs(target_root, exist_ok=True)
     destination = os.path.join(target_root, "[Content_Types].xml")
@@ -32,28 +178,64 @@ def copy_metadata_dir(template_dir: str, target_root: str) -> None:
             shutil.copy(os.path.join(template_dir, file), os.path.join(metadata_target, file))
 
 
-def generate_relationships(models: Iterable[str], rels_template_path: str, target_root: str) -> str:
-    rels_dir = os.path.join(target_root, "_rels")
-    os.makedirs(rels_dir, exist_ok=True)
+def relationship_element(model: str, relationship_number: int) -> ET._Element:
+    return ET.Element(
+        "Relationship",
+        Target=f"/{MODELS_ARCDIR}/{model}",
+        Id=f"rel-{relationship_number}",
+        Type=RELATIONSHIP_TYPE,
+    )
 
+
+def build_relationships(models: Iterable[str], rels_template_path: str) -> ET._ElementTree:
     rels_et = ET.parse(rels_template_path)
     rels_tree = rels_et.getroot()
-    relationship_number = 1
-    for model in models:
-        rel = ET.fromstring(
-            f'<Relationship Target="/3D/Objects/{model}" Id="rel-{relationship_number}" '
-            f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/3dmodel"/>'
-        )
-        relationship_number += 1
-        rels_tree.append(rel)
+    for relationship_number, model in enumerate(models, start=1):
+        rels_tree.append(relationship_element(model, relationship_number))
+    return rels_et
+
 
+def generate_relationships(models: Iterable[str], rels_template_path: str, target_root: str) -> str:
+    rels_dir = os.path.join(target_root, "_rels")
+    os.makedirs(rels_dir, exist_ok=True)
+
+    rels_et = build_relationships(models, rels_template_path)
     rels_path = os.path.join(rels_dir, ".rels")
     rels_et.write(rels_path, encoding="utf-8", xml_declaration=True, pretty_print=True)
     return rels_path
 
 
-def build_package(model_filenames: Iterable[str], template_paths: dict[str, str], target_root: str, output_file: str) -> None:
+def build_package(
+    model_filenames: Iterable[str],
+    template_paths: dict[str, str],
+    target_root: str,
+    output_file: str,
+    compression: CompressionPolicy | None = None,
+) -> None:
     copy_content_types(template_paths["content_types_template"], target_root)
     generate_relationships(model_filenames, template_paths["rels_template"], target_root)
     copy_metadata_dir(template_paths["metadata_dir"], target_root)
-    compress_zip(target_root, output_file)
+    compress_zip(target_root, output_file, compression)
+
+
+def write_package_members(model_filenames: Iterable[str], template_paths: dict[str, str], zip_out: zipfile.ZipFile) -> None:
+    """Write the template-derived package members into *zip_out*.
+
+    This is the in-archive counterpart of :func:`build_package`: the model
+    members are expected to have been written already with
+    :func:`write_model_member`. Templates come from the shared
+    :class:`~bambu_to_prusa.template_registry.TemplateRegistry`, so nothing is
+    re-read or re-parsed per archive.
+    """
+    templates = get_template_registry(template_paths)
+    write_zip_member(zip_out, "[Content_Types].xml", templates.content_types_bytes())
+
+    rels_prefix, rels_suffix = templates.relationships_parts()
+    relationships = [
+        ET.tostring(relationship_element(model, number), encoding="utf-8") + b"\n"
+        for number, model in enumerate(model_filenames, start=1)
+    ]
+    write_zip_member(zip_out, "_rels/.rels", rels_prefix + b"".join(relationships) + rels_suffix)
+
+    for name, data in templates.metadata_files():
+        write_zip_member(zip_out, f"Metadata/{name}", data)
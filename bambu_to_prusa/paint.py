@@ -0,0 +1,184 @@
+"""Transcoding of per-triangle paint segmentation.
+
+Bambu Studio's ``paint_color`` and PrusaSlicer's ``slic3rpe:mmu_segmentation``
+both hold a triangle's painting as a serialised subdivision tree. The hex
+digits are read from last to first, each contributing four bits least
+significant first, which makes the whole bitstream simply the integer value
+of the hex string. Every node starts with two bits giving its number of
+split sides. A split node continues with two bits for its special side and
+then its ``split_sides + 1`` children, last child first. A leaf continues
+with its state: two bits for states 0-2, or ``0b11`` followed by 4-bit
+groups adding up to ``state - 3``, where a group of 15 means another follows.
+
+:class:`PaintTranscoder` decodes and validates each code, remaps extruder
+states and re-encodes it canonically. Painted models repeat a handful of
+codes across millions of triangles, so results are memoised and only the
+first occurrence of a code is decoded.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+# A leaf is its state; a split node is (split_sides, special_side, children)
+# with the children in index order.
+Node = Union[int, Tuple[int, int, Tuple["Node", ...]]]
+
+DEFAULT_CACHE_SIZE = 1 << 16
+_HEX_CODE = re.compile(r"[0-9A-Fa-f]+")
+_EXTENDED_STATE = 3
+_STATE_GROUP_MAX = 15
+
+
+class PaintError(ValueError):
+    """Raised for a paint code that is not a valid segmentation bitstream."""
+
+
+def _decode_node(bits: int, position: int, end: int) -> Tuple[Node, int]:
+    if position + 2 > end:
+        raise PaintError("truncated segmentation data")
+    split_sides = (bits >> position) & 3
+    position += 2
+    if split_sides:
+        if position + 2 > end:
+            raise PaintError("truncated segmentation data")
+        special_side = (bits >> position) & 3
+        position += 2
+        children: List[Node] = [0] * (split_sides + 1)
+        for index in range(split_sides, -1, -1):
+            children[index], position = _decode_node(bits, position, end)
+        return (split_sides, special_side, tuple(children)), position
+    if position + 2 > end:
+        raise PaintError("truncated segmentation data")
+    state = (bits >> position) & 3
+    position += 2
+    if state == _EXTENDED_STATE:
+        while True:
+            if position + 4 > end:
+                raise PaintError("truncated segmentation state")
+            group = (bits >> position) & 15
+            position += 4
+            state += group
+            if group != _STATE_GROUP_MAX:
+                break
+    return state, position
+
+
+def decode_segmentation(code: str) -> Node:
+    """Decode a segmentation hex string into its subdivision tree."""
+    if not _HEX_CODE.fullmatch(code):
+        raise PaintError(f"not a hexadecimal segmentation code: {code!r}")
+    bits = int(code, 16)
+    end = 4 * len(code)
+    try:
+        node, position = _decode_node(bits, 0, end)
+    except RecursionError:
+        raise PaintError("segmentation tree is nested too deeply") from None
+    # Only the zero padding of the last digit may follow the tree.
+    if end - position >= 4 or bits >> position:
+        raise PaintError(f"unexpected data after the segmentation tree: {code!r}")
+    return node
+
+
+def _encode_node(node: Node, fields: List[Tuple[int, int]]) -> None:
+    if isinstance(node, int):
+        fields.append((0, 2))
+        if node < _EXTENDED_STATE:
+            fields.append((node, 2))
+            return
+        fields.append((_EXTENDED_STATE, 2))
+        remainder = node - _EXTENDED_STATE
+        while remainder >= _STATE_GROUP_MAX:
+            fields.append((_STATE_GROUP_MAX, 4))
+            remainder -= _STATE_GROUP_MAX
+        fields.append((remainder, 4))
+        return
+    split_sides, special_side, children = node
+    fields.append((split_sides, 2))
+    fields.append((special_side, 2))
+    for child in reversed(children):
+        _encode_node(child, fields)
+
+
+def encode_segmentation(node: Node) -> str:
+    """Encode a subdivision tree as an upper-case segmentation hex string."""
+    fields: List[Tuple[int, int]] = []
+    _encode_node(node, fields)
+    bits = position = 0
+    for value, width in fields:
+        bits |= value << position
+        position += width
+    return format(bits, f"0{(position + 3) // 4}X")
+
+
+def remap_states(node: Node, mapping: Mapping[int, int]) -> Node:
+    """Return *node* with every leaf state replaced through *mapping*."""
+    if isinstance(node, int):
+        return mapping.get(node, node)
+    split_sides, special_side, children = node
+    return split_sides, special_side, tuple(remap_states(child, mapping) for child in children)
+
+
+# Codes of unsplit triangles, by far the most common, for the first states.
+LEAF_CODES: Tuple[str, ...] = tuple(encode_segmentation(state) for state in range(32))
+
+
+class PaintTranscoder:
+    """Turn Bambu paint codes into PrusaSlicer ones.
+
+    *extruder_map* renumbers leaf states (state ``n`` paints with extruder
+    ``n``; ``0`` is the object's own extruder). Invalid codes raise
+    :class:`PaintError` when *strict*, and are otherwise dropped, so the
+    triangle loses its paint, with one warning per distinct code (counted
+    in :attr:`invalid_codes`). Results are memoised for up to *cache_size*
+    distinct codes.
+    """
+
+    def __init__(
+        self,
+        extruder_map: Optional[Mapping[int, int]] = None,
+        strict: bool = False,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        self.extruder_map: Dict[int, int] = dict(extruder_map or {})
+        if any(state < 0 or target < 0 for state, target in self.extruder_map.items()):
+            raise ValueError("Extruder states must not be negative.")
+        self.strict = strict
+        self.cache_size = cache_size
+        self.invalid_codes = 0
+        self._cache: Dict[str, Optional[str]] = {}
+
+    def transcode(self, code: str) -> Optional[str]:
+        """Return the PrusaSlicer code for *code*, or ``None`` to drop invalid paint."""
+        try:
+            return self._cache[code]
+        except KeyError:
+            pass
+        try:
+            node = decode_segmentation(code)
+        except PaintError:
+            if self.strict:
+                raise
+            logging.warning("Dropping invalid paint segmentation %r.", code)
+            result = None
+        else:
+            if self.extruder_map:
+                node = remap_states(node, self.extruder_map)
+            if isinstance(node, int) and node < len(LEAF_CODES):
+                result = LEAF_CODES[node]
+            else:
+                result = encode_segmentation(node)
+        if result is None:
+            self.invalid_codes += 1
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[code] = result
+        return result
+
+    __call__ = transcode
+
+    def options(self) -> Dict[str, object]:
+        """Return the settings that change transcoded output, for cache keys."""
+        return {"extruder_map": sorted(self.extruder_map.items())}
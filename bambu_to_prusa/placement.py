@@ -0,0 +1,239 @@
+"""Build-item transforms and automatic bed placement.
+
+A 3MF ``transform`` is a 3x4 affine matrix written row by row as
+``m00 m01 m02 m10 m11 m12 m20 m21 m22 m30 m31 m32``; points are row vectors,
+so ``p' = p * M`` with the last row holding the translation. The world
+transforms of the source project's instances come from
+:class:`~bambu_to_prusa.archive_index.ArchiveIndex`; :class:`BuildLayout`
+then decides the ``<build>`` items of an output model file, either carrying
+those transforms over or arranging every instance on the bed with vectorised
+bounding-box math.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .mesh import Bounds, vertex_bounds
+from .model_processing import DEFAULT_TRANSFORM, BuildItems, StreamedObject
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when NumPy is absent
+    np = None
+
+Matrix = Tuple[float, ...]
+
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0)
+IDENTITY_TRANSFORM = "1 0 0 0 1 0 0 0 1 0 0 0"
+# ``source`` keeps the placement of the Bambu project; ``arrange`` lays
+# every instance out on the bed.
+SOURCE_PLACEMENT = "source"
+ARRANGE_PLACEMENT = "arrange"
+PLACEMENT_MODES = (SOURCE_PLACEMENT, ARRANGE_PLACEMENT)
+# Printable area of a Prusa MK4 in millimetres.
+DEFAULT_BED_SIZE = (250.0, 210.0)
+DEFAULT_SPACING = 5.0
+
+
+def parse_transform(text: Optional[str]) -> Matrix:
+    """Parse a 3MF ``transform`` attribute; a missing one is the identity."""
+    if not text or not text.strip():
+        return IDENTITY
+    values = tuple(float(value) for value in text.split())
+    if len(values) != 12:
+        raise ValueError(f"A 3MF transform needs 12 values, got {len(values)}: {text!r}")
+    return values
+
+
+def format_transform(matrix: Sequence[float]) -> str:
+    return " ".join(f"{value:.9g}" for value in matrix)
+
+
+def compose(inner: Matrix, outer: Matrix) -> Matrix:
+    """Return the transform applying *inner* first and then *outer*."""
+    rows = [inner[0:3], inner[3:6], inner[6:9], inner[9:12]]
+    composed: List[float] = []
+    for index, row in enumerate(rows):
+        for column in range(3):
+            value = sum(row[k] * outer[3 * k + column] for k in range(3))
+            composed.append(value + (outer[9 + column] if index == 3 else 0.0))
+    return tuple(composed)
+
+
+def _corner_points(bounds: Sequence[Bounds]) -> List[List[Tuple[float, ...]]]:
+    # Bit k of the corner index picks the upper bound on axis k.
+    return [
+        [tuple((hi if corner >> axis & 1 else lo)[axis] for axis in range(3)) for corner in range(8)]
+        for lo, hi in bounds
+    ]
+
+
+def world_bounds(bounds: Sequence[Bounds], matrices: Sequence[Matrix]):
+    """Return the axis-aligned ``(lower, upper)`` boxes of *bounds* placed by *matrices*.
+
+    Boxes come from transforming each object box's eight corners, which is
+    exact for translations and axis-aligned scaling and a tight cover for
+    rotations. With NumPy the result is two ``(n, 3)`` arrays computed in
+    one batched product; otherwise two lists of tuples.
+    """
+    if np is not None:
+        boxes = np.asarray(bounds, dtype=np.float64)
+        # Bit k of the corner index picks the upper bound on axis k.
+        picks = (np.arange(8)[:, None] >> np.arange(3)) & 1
+        points = boxes[:, picks, np.arange(3)]
+        transforms = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 3)
+        placed = points @ transforms[:, :3, :] + transforms[:, 3:, :]
+        return placed.min(axis=1), placed.max(axis=1)
+    lower, upper = [], []
+    for points, m in zip(_corner_points(bounds), matrices):
+        placed = [
+            tuple(x * m[column] + y * m[3 + column] + z * m[6 + column] + m[9 + column] for column in range(3))
+            for x, y, z in points
+        ]
+        lower.append(tuple(min(axis) for axis in zip(*placed)))
+        upper.append(tuple(max(axis) for axis in zip(*placed)))
+    return lower, upper
+
+
+def arrange(
+    bounds: Sequence[Bounds],
+    matrices: Sequence[Matrix],
+    bed_size: Tuple[float, float] = DEFAULT_BED_SIZE,
+    spacing: float = DEFAULT_SPACING,
+) -> List[Matrix]:
+    """Translate every instance so the set sits in rows centred on the bed.
+
+    Instances keep their rotation and scale. They are sorted by depth and
+    laid out in a grid whose column count fits the widest footprint, packed
+    tightly within each row, and dropped onto the bed (lowest point at
+    ``z = 0``). A layout larger than the bed is still centred on it, with a
+    warning.
+    """
+    count = len(matrices)
+    if not count:
+        return []
+    lower, upper = world_bounds(bounds, matrices)
+    if np is not None:
+        lower = np.asarray(lower)
+        size = np.asarray(upper) - lower
+        order = np.argsort(-size[:, 1], kind="stable")
+        columns = max(1, int((bed_size[0] + spacing) // (size[:, 0].max() + spacing)))
+        rows = math.ceil(count / columns)
+        padded = np.zeros((rows * columns, 2))
+        padded[:count] = size[order, :2] + spacing
+        grid = padded.reshape(rows, columns, 2)
+        x_offsets = np.cumsum(grid[:, :, 0], axis=1) - grid[:, :, 0]
+        row_depths = grid[:, :, 1].max(axis=1)
+        y_offsets = np.cumsum(row_depths) - row_depths
+        extent_x = (x_offsets[:, -1] + grid[:, -1, 0]).max() - spacing
+        extent_y = row_depths.sum() - spacing
+        targets = np.zeros((count, 3))
+        targets[order, 0] = x_offsets.reshape(-1)[:count] + (bed_size[0] - extent_x) / 2
+        targets[order, 1] = np.repeat(y_offsets, columns)[:count] + (bed_size[1] - extent_y) / 2
+        shifted = np.asarray(matrices, dtype=np.float64).copy()
+        shifted[:, 9:12] += targets - lower
+        placed = [tuple(row) for row in shifted.tolist()]
+    else:
+        size = [tuple(hi - lo for lo, hi in zip(low, high)) for low, high in zip(lower, upper)]
+        order = sorted(range(count), key=lambda index: -size[index][1])
+        columns = max(1, int((bed_size[0] + spacing) // (max(box[0] for box in size) + spacing)))
+        targets: Dict[int, Tuple[float, float]] = {}
+        y_offset = extent_x = 0.0
+        for start in range(0, count, columns):
+            x_offset = 0.0
+            row = order[start : start + columns]
+            for index in row:
+                targets[index] = (x_offset, y_offset)
+                x_offset += size[index][0] + spacing
+            extent_x = max(extent_x, x_offset - spacing)
+            y_offset += max(size[index][1] for index in row) + spacing
+        extent_y = y_offset - spacing
+        margin = ((bed_size[0] - extent_x) / 2, (bed_size[1] - extent_y) / 2)
+        placed = []
+        for index, matrix in enumerate(matrices):
+            delta = (
+                targets[index][0] + margin[0] - lower[index][0],
+                targets[index][1] + margin[1] - lower[index][1],
+                -lower[index][2],
+            )
+            placed.append(tuple(matrix[:9]) + tuple(value + shift for value, shift in zip(matrix[9:], delta)))
+    if extent_x > bed_size[0] or extent_y > bed_size[1]:
+        logging.warning(
+            "Arranged objects span %.0f x %.0f mm, more than the %.0f x %.0f mm bed.",
+            extent_x,
+            extent_y,
+            *bed_size,
+        )
+    return placed
+
+
+class BuildLayout:
+    """Decide the ``<build>`` items of one output model file.
+
+    *transforms* are the world transforms from the root model for the
+    objects of this file (see
+    :meth:`~bambu_to_prusa.archive_index.ArchiveIndex.placements`).
+    Transforms found in the file's own ``<build>`` are collected into
+    :attr:`local_transforms` while its objects are parsed and used for
+    objects the root model does not place; objects placed by neither get
+    ``DEFAULT_TRANSFORM``, unless they are components of another object of
+    the file, which then instances them. With *placement* ``"arrange"`` every
+    instance is then laid out on a *bed_size* bed instead.
+    """
+
+    def __init__(
+        self,
+        transforms: Optional[BuildItems] = None,
+        placement: str = SOURCE_PLACEMENT,
+        bed_size: Tuple[float, float] = DEFAULT_BED_SIZE,
+        spacing: float = DEFAULT_SPACING,
+    ) -> None:
+        if placement not in PLACEMENT_MODES:
+            raise ValueError(f"Unknown placement {placement!r}; expected one of {', '.join(PLACEMENT_MODES)}.")
+        self.transforms = transforms or {}
+        self.local_transforms: BuildItems = {}
+        self.placement = placement
+        self.bed_size = bed_size
+        self.spacing = spacing
+        self.bounds: Dict[str, Optional[Bounds]] = {}
+        self.component_ids: Set[str] = set()
+        self._streamed: Dict[str, StreamedObject] = {}
+
+    def observe(self, object_id: str, element) -> None:
+        """Note an object as it is written: its component references and, when arranging, its bounds."""
+        if isinstance(element, StreamedObject):
+            # Streamed objects only know their components and bounds once written.
+            element.collect_bounds = self.placement == ARRANGE_PLACEMENT
+            self._streamed[object_id] = element
+            return
+        for component in element.iterfind("{*}components/{*}component"):
+            self.component_ids.add(component.get("objectid"))
+        if self.placement == ARRANGE_PLACEMENT:
+            self.bounds[object_id] = vertex_bounds(element)
+
+    def _object_bounds(self, object_id: str) -> Bounds:
+        streamed = self._streamed.get(object_id)
+        bounds = streamed.bounds if streamed is not None else self.bounds.get(object_id)
+        return bounds or ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+
+    def instances(self, object_ids: Iterable[str]) -> List[Tuple[str, str]]:
+        """Return ``(object_id, transform)`` for every build item to write."""
+        # ``None`` marks an object no source item places; a source item
+        # without a transform places its object at the origin.
+        instances: List[Tuple[str, Optional[str]]] = []
+        components = self.component_ids.union(*(streamed.components for streamed in self._streamed.values()))
+        for object_id in object_ids:
+            sources = self.transforms.get(object_id) or self.local_transforms.get(object_id)
+            if sources:
+                instances.extend((object_id, transform or IDENTITY_TRANSFORM) for transform in sources)
+            elif object_id not in components:
+                instances.append((object_id, None))
+        if self.placement != ARRANGE_PLACEMENT:
+            return [(object_id, transform or DEFAULT_TRANSFORM) for object_id, transform in instances]
+        matrices = [parse_transform(transform) for _, transform in instances]
+        bounds = [self._object_bounds(object_id) for object_id, _ in instances]
+        placed = arrange(bounds, matrices, self.bed_size, self.spacing)
+        return [(object_id, format_transform(matrix)) for (object_id, _), matrix in zip(instances, placed)]
@@ -0,0 +1,182 @@
+"""Progress reporting for long conversions.
+
+:class:`ProgressTracker` turns the converter's byte, model and triangle
+counters into throttled :class:`ProgressUpdate` snapshots for a callback.
+Progress is measured in compressed bytes of the input's model members,
+which is known up front from the archive's central directory and tracks
+the actual work better than the model count alone.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import IO, Callable, Iterable, Iterator, Optional, Tuple
+
+from .model_processing import StreamedObject
+
+DEFAULT_PROGRESS_INTERVAL = 0.1
+# Below this fraction an extrapolated ETA is mostly noise.
+MIN_ETA_FRACTION = 0.02
+
+
+@dataclass(frozen=True)
+class ProgressUpdate:
+    """Snapshot of a running conversion."""
+
+    fraction: float
+    bytes_done: int
+    bytes_total: int
+    models_done: int
+    models_total: int
+    triangles: int
+    elapsed_s: float
+    eta_s: Optional[float] = None
+    current: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.fraction >= 1.0
+
+
+ProgressCallback = Callable[[ProgressUpdate], None]
+
+
+class ProgressTracker:
+    """Accumulate conversion counters and report them at most every *interval* seconds.
+
+    The first and final updates are always delivered; the fraction stays
+    below ``1.0`` until :meth:`finish` so a completed byte count never reads
+    as done while the package members are still being written.
+    """
+
+    def __init__(
+        self,
+        callback: ProgressCallback,
+        bytes_total: int,
+        models_total: int,
+        interval: float = DEFAULT_PROGRESS_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.callback = callback
+        self.bytes_total = bytes_total
+        self.models_total = models_total
+        self.interval = interval
+        self.clock = clock
+        self.bytes_done = 0
+        self.models_done = 0
+        self.triangles = 0
+        self.current: Optional[str] = None
+        self._started = clock()
+        self._last_report: Optional[float] = None
+
+    def _fraction(self) -> float:
+        if self.bytes_total > 0:
+            fraction = self.bytes_done / self.bytes_total
+        elif self.models_total > 0:
+            fraction = self.models_done / self.models_total
+        else:
+            fraction = 0.0
+        return min(fraction, 0.99)
+
+    def snapshot(self, fraction: Optional[float] = None) -> ProgressUpdate:
+        elapsed = self.clock() - self._started
+        fraction = self._fraction() if fraction is None else fraction
+        eta = None
+        if fraction >= 1.0:
+            eta = 0.0
+        elif fraction >= MIN_ETA_FRACTION:
+            eta = elapsed * (1.0 - fraction) / fraction
+        return ProgressUpdate(
+            fraction=fraction,
+            bytes_done=self.bytes_done,
+            bytes_total=self.bytes_total,
+            models_done=self.models_done,
+            models_total=self.models_total,
+            triangles=self.triangles,
+            elapsed_s=elapsed,
+            eta_s=eta,
+            current=self.current,
+        )
+
+    def report(self, force: bool = False) -> None:
+        """Deliver an update unless one was sent less than *interval* ago."""
+        now = self.clock()
+        if not force and self._last_report is not None and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        self.callback(self.snapshot())
+
+    def start_model(self, name: str) -> None:
+        self.current = name
+        self.report()
+
+    def advance_bytes(self, count: int) -> None:
+        self.bytes_done += count
+        self.report()
+
+    def add_triangles(self, count: int) -> None:
+        self.triangles += count
+        self.report()
+
+    def model_done(self) -> None:
+        self.models_done += 1
+        self.report()
+
+    def finish(self) -> None:
+        """Deliver the final, complete update."""
+        self.bytes_done = self.bytes_total
+        self.models_done = self.models_total
+        self.current = None
+        self._last_report = self.clock()
+        self.callback(self.snapshot(1.0))
+
+
+class ProgressReader:
+    """Binary reader that reports progress as a zip member is consumed.
+
+    Reads return decompressed bytes, so they are scaled by the member's
+    compression ratio to advance the tracker in compressed bytes.
+    """
+
+    def __init__(self, stream: IO[bytes], tracker: ProgressTracker, compress_size: int, file_size: int) -> None:
+        self.stream = stream
+        self.tracker = tracker
+        self._ratio = compress_size / file_size if file_size else 0.0
+        self._remaining = compress_size
+        self._carry = 0.0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        if data:
+            self._carry += len(data) * self._ratio
+            advance = min(int(self._carry), self._remaining)
+            self._carry -= advance
+            self._remaining -= advance
+            self.tracker.advance_bytes(advance)
+        return data
+
+    def close_out(self) -> None:
+        """Account for any bytes the reads did not cover (rounding, early stop)."""
+        if self._remaining:
+            self.tracker.advance_bytes(self._remaining)
+            self._remaining = 0
+
+
+def count_triangles(element) -> int:
+    """Return the number of triangles in a model ``<object>`` element."""
+    triangles = element.find("{*}mesh/{*}triangles")
+    return len(triangles) if triangles is not None else 0
+
+
+def track_triangles(objects: Iterable[Tuple[str, object]], tracker: ProgressTracker) -> Iterator[Tuple[str, object]]:
+    """Pass ``(object_id, element)`` pairs through, counting their triangles.
+
+    Streamed objects report their triangles as they are written instead.
+    """
+    for object_id, element in objects:
+        if isinstance(element, StreamedObject):
+            element.on_triangles = tracker.add_triangles
+        else:
+            tracker.add_triangles(count_triangles(element))
+        yield object_id, element
@@ -0,0 +1,223 @@
+"""Content-addressed cache of finished conversions.
+
+Re-uploaded projects are often byte-identical to ones already converted.
+:class:`ResultCache` stores finished Prusa archives under a key derived from
+the input archive contents, the template set, the converter version and any
+output-affecting options, and hands back a copy (or hard link) on a hit.
+The cache is bounded by total size; the least recently used entries are
+evicted first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Mapping
+
+from .template_registry import get_template_registry
+
+APP_NAME = "bambu2prusa"
+CACHE_SCHEMA = 1
+CACHE_SUFFIX = ".3mf"
+DEFAULT_MAX_BYTES = 2 * 1024**3
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def _default_cache_dir() -> Path:
+    """Return the default cache directory for the current platform."""
+
+    if os.name == "nt":
+        base_dir = os.environ.get("LOCALAPPDATA")
+        if base_dir:
+            return Path(base_dir) / APP_NAME / "cache"
+        return Path.home() / "AppData" / "Local" / APP_NAME / "cache"
+
+    base_dir = os.environ.get("XDG_CACHE_HOME")
+    if base_dir:
+        return Path(base_dir) / APP_NAME
+
+    return Path.home() / ".cache" / APP_NAME
+
+
+def converter_version() -> str:
+    try:
+        return metadata.version(APP_NAME)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def hash_file(path: str | os.PathLike[str]) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file_handle:
+        for chunk in iter(lambda: file_handle.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def template_fingerprint(template_paths: Dict[str, str]) -> str:
+    """Return a digest of every template file that ends up in the output."""
+
+    templates = get_template_registry(template_paths)
+    digest = hashlib.sha256()
+    for key in ("models_template", "rels_template", "content_types_template"):
+        digest.update(key.encode("utf-8"))
+        digest.update(templates.file_bytes(template_paths[key]))
+    for name, data in templates.metadata_files():
+        digest.update(name.encode("utf-8"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how a :class:`ResultCache` has been used."""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    evicted_bytes: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class ResultCache:
+    """Size-bounded LRU cache of converted archives keyed by content hash."""
+
+    def __init__(
+        self,
+        cache_dir: str | os.PathLike[str] | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        hardlink: bool = False,
+    ) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hardlink = hardlink
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be pickled; batch workers get a fresh one.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def key_for(self, input_file: str, template_paths: Dict[str, str], options: Mapping[str, Any] | None = None) -> str:
+        """Return the cache key for converting *input_file* with the given settings."""
+
+        material = {
+            "schema": CACHE_SCHEMA,
+            "version": converter_version(),
+            "input": hash_file(input_file),
+            "templates": template_fingerprint(template_paths),
+            "options": dict(options or {}),
+        }
+        encoded = json.dumps(material, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{CACHE_SUFFIX}"
+
+    def fetch(self, key: str, output_file: str) -> bool:
+        """Materialise the entry for *key* at *output_file*; return ``False`` on a miss."""
+
+        entry = self._entry_path(key)
+        if not entry.is_file():
+            self.stats.misses += 1
+            return False
+
+        output_path = Path(output_file)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_path.exists():
+            output_path.unlink()
+        try:
+            if self.hardlink:
+                try:
+                    os.link(entry, output_path)
+                except OSError:
+                    shutil.copyfile(entry, output_path)
+            else:
+                shutil.copyfile(entry, output_path)
+            # The entry's mtime doubles as its last-used time for eviction.
+            os.utime(entry)
+        except FileNotFoundError:
+            # Evicted by another process between the check and the copy.
+            self.stats.misses += 1
+            return False
+
+        self.stats.hits += 1
+        logging.debug("Result cache hit for %s", key)
+        return True
+
+    def store(self, key: str, output_file: str) -> None:
+        """Add the finished *output_file* to the cache under *key*."""
+
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        # Copy next to the final name and rename so readers never see a partial entry.
+        handle, temp_path = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        os.close(handle)
+        try:
+            shutil.copyfile(output_file, temp_path)
+            os.replace(temp_path, entry)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.stats.stores += 1
+        self.evict()
+
+    def entries(self) -> list[tuple[Path, os.stat_result]]:
+        """Return every cache entry with its stat result, least recently used first."""
+
+        found = []
+        if self.cache_dir.is_dir():
+            for entry in self.cache_dir.glob(f"*/*{CACHE_SUFFIX}"):
+                try:
+                    found.append((entry, entry.stat()))
+                except FileNotFoundError:
+                    continue
+        found.sort(key=lambda item: item[1].st_mtime_ns)
+        return found
+
+    def size(self) -> int:
+        return sum(stat.st_size for _, stat in self.entries())
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache fits in ``max_bytes``."""
+
+        with self._lock:
+            entries = self.entries()
+            total = sum(stat.st_size for _, stat in entries)
+            for entry, stat in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    entry.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= stat.st_size
+                self.stats.evictions += 1
+                self.stats.evicted_bytes += stat.st_size
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+
+        for entry, _ in self.entries():
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
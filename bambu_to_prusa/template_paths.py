@@ -31,6 +31,7 @@ def get_template_paths(base_dir: str | os.PathLike[str] | None = None) -> Dict[s
 
     resolved_base = str(Path(base_dir) if base_dir else Path(_default_template_root()))
     return {
+        "base_dir": resolved_base,
         "models_template": os.path.join(resolved_base, "3D", "3dmodel_template.xml"),
         "models_dir": os.path.join(resolved_base, "3D"),
         "rels_template": os.path.join(resolved_base, "_rels", ".rels_template.xml"),
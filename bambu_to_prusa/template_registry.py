@@ -0,0 +1,127 @@
+"""Parse-once cache for the 3MF package templates.
+
+Conversions used to re-read and re-parse every template for each model file
+and archive. :class:`TemplateRegistry` keeps the parsed or serialised form of
+each template in memory, refreshes an entry when the file's modification time
+or size changes, and hands out copies so callers can mutate them freely.
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import threading
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+import lxml.etree as ET
+
+from .template_paths import get_template_paths
+
+T = TypeVar("T")
+
+_SPLIT_MARKER = "bambu_to_prusa:split"
+
+
+def _signature(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as file_handle:
+        return file_handle.read()
+
+
+def _list_files(directory: str) -> List[str]:
+    return sorted(name for name in os.listdir(directory) if os.path.isfile(os.path.join(directory, name)))
+
+
+def split_serialised(tree: ET._ElementTree, container_paths: List[str]) -> List[bytes]:
+    """Serialise *tree* and split it just before the end of each container.
+
+    Returns ``len(container_paths) + 1`` byte chunks; content written between
+    chunk ``n`` and ``n + 1`` ends up as the last children of the element found
+    at ``container_paths[n]``.
+    """
+
+    tree = copy.deepcopy(tree)
+    root = tree.getroot()
+    for path in container_paths:
+        container = root if path == "." else root.find(path)
+        if container is None:
+            raise ValueError(f"Template is missing required element: {path}")
+        container.append(ET.Comment(_SPLIT_MARKER))
+    data = ET.tostring(tree, encoding="utf-8", xml_declaration=True)
+    return data.split(f"<!--{_SPLIT_MARKER}-->".encode("utf-8"))
+
+
+class TemplateRegistry:
+    """Cached access to the templates of one template directory."""
+
+    def __init__(self, template_paths: Dict[str, str]) -> None:
+        self.template_paths = template_paths
+        self._entries: Dict[Tuple[str, str], Tuple[Tuple[int, int], object]] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, kind: str, path: str, loader: Callable[[str], T]) -> T:
+        signature = _signature(path)
+        key = (kind, path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                return entry[1]  # type: ignore[return-value]
+        value = loader(path)
+        with self._lock:
+            self._entries[key] = (signature, value)
+        return value
+
+    def tree(self, path: str) -> ET._ElementTree:
+        """Return a private copy of the parsed XML template at *path*."""
+        return copy.deepcopy(self._cached("tree", path, ET.parse))
+
+    def file_bytes(self, path: str) -> bytes:
+        """Return the raw contents of the template file at *path*."""
+        return self._cached("bytes", path, _read_bytes)
+
+    def serialised_parts(self, path: str, container_paths: Tuple[str, ...]) -> List[bytes]:
+        """Return the pre-serialised chunks of *path*, see :func:`split_serialised`."""
+        return self._cached(
+            f"parts:{'|'.join(container_paths)}",
+            path,
+            lambda template: split_serialised(ET.parse(template), list(container_paths)),
+        )
+
+    def model_tree(self) -> ET._ElementTree:
+        return self.tree(self.template_paths["models_template"])
+
+    def content_types_bytes(self) -> bytes:
+        return self.file_bytes(self.template_paths["content_types_template"])
+
+    def relationships_parts(self) -> List[bytes]:
+        """Return the relationships template split around its children."""
+        return self.serialised_parts(self.template_paths["rels_template"], (".",))
+
+    def metadata_files(self) -> List[Tuple[str, bytes]]:
+        """Return ``(filename, data)`` for every file of the metadata template directory."""
+        metadata_dir = self.template_paths["metadata_dir"]
+        if not os.path.isdir(metadata_dir):
+            return []
+        names = self._cached("listing", metadata_dir, _list_files)
+        return [(name, self.file_bytes(os.path.join(metadata_dir, name))) for name in names]
+
+
+_registries: Dict[str, TemplateRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_template_registry(template_paths: Dict[str, str] | None = None) -> TemplateRegistry:
+    """Return the shared registry for the base directory of *template_paths*."""
+
+    template_paths = template_paths or get_template_paths()
+    base_dir = template_paths.get("base_dir") or os.path.dirname(template_paths["content_types_template"])
+    key = os.path.abspath(base_dir)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None or registry.template_paths != template_paths:
+            registry = _registries[key] = TemplateRegistry(template_paths)
+        return registry
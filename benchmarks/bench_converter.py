@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Stage-level benchmarks for the Bambu to Prusa converter.
+
+Each case generates a synthetic archive (see ``synthetic.py``), then times the
+conversion stages in isolation and the whole ``convert_archive`` call.
+Results are written as JSON so runs from different revisions can be
+compared with ``--compare``.
+
+    python benchmarks/bench_converter.py --output bench.json
+    python benchmarks/bench_converter.py --compare bench.json --output new.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from bambu_to_prusa.converter import BambuToPrusaConverter  # noqa: E402
+from bambu_to_prusa.file_ops import CompressionPolicy, list_zip_members, write_zip_member  # noqa: E402
+from bambu_to_prusa.model_injection import build_prusa_model  # noqa: E402
+from bambu_to_prusa.model_processing import clean_model_content, iter_model_objects  # noqa: E402
+from bambu_to_prusa.instrumentation import peak_rss_bytes  # noqa: E402
+from bambu_to_prusa.package_builder import MODELS_ARCDIR, serialise_model  # noqa: E402
+from bambu_to_prusa.template_registry import get_template_registry  # noqa: E402
+
+from synthetic import SyntheticSpec, write_synthetic_archive  # noqa: E402
+
+CASES: Dict[str, SyntheticSpec] = {
+    "small": SyntheticSpec(vertices_per_object=500),
+    "painted": SyntheticSpec(vertices_per_object=20_000, paint_density=0.5),
+    "multi_object": SyntheticSpec(vertices_per_object=2_000, objects_per_model=4, model_files=8, thumbnails=4),
+    "large_mesh": SyntheticSpec(vertices_per_object=250_000, paint_density=0.2, thumbnails=2),
+}
+STAGES = ("decompress", "clean", "extract", "inject", "write", "compress")
+
+
+@contextmanager
+def timed(results: Dict[str, Dict[str, float]], stage: str) -> Iterator[None]:
+    wall, cpu = time.perf_counter(), time.process_time()
+    yield
+    entry = results.setdefault(stage, {"wall_s": 0.0, "cpu_s": 0.0})
+    entry["wall_s"] += time.perf_counter() - wall
+    entry["cpu_s"] += time.process_time() - cpu
+
+
+def run_stages(archive: Path) -> Dict[str, Dict[str, float]]:
+    """Time every pipeline stage once, feeding each stage the previous stage's output."""
+    stages: Dict[str, Dict[str, float]] = {}
+    templates = get_template_registry()
+    policy = CompressionPolicy()
+
+    with zipfile.ZipFile(archive) as zip_in:
+        members = list_zip_members(zip_in, prefix=f"{MODELS_ARCDIR}/", suffix=".model")
+        with timed(stages, "decompress"):
+            raw_models = [zip_in.read(member) for member in members]
+
+    serialised: List[bytes] = []
+    for raw in raw_models:
+        with timed(stages, "clean"):
+            clean_model_content(raw.decode("utf-8"))
+        with timed(stages, "extract"):
+            objects = dict(iter_model_objects(raw))
+        with timed(stages, "inject"):
+            tree = build_prusa_model(objects, templates.model_tree())
+        with timed(stages, "write"):
+            serialised.append(serialise_model(tree))
+        del objects, tree
+
+    with timed(stages, "compress"):
+        with policy.open_archive(io.BytesIO()) as zip_out:
+            for index, data in enumerate(serialised):
+                write_zip_member(zip_out, f"{MODELS_ARCDIR}/{index}.model", data, policy)
+    return stages
+
+
+def run_case(name: str, spec: SyntheticSpec, workdir: Path, repeat: int) -> Dict[str, object]:
+    archive = write_synthetic_archive(workdir / f"{name}.3mf", spec)
+    best_stages: Dict[str, Dict[str, float]] = {}
+    best_total = float("inf")
+
+    for _ in range(repeat):
+        for stage, timing in run_stages(archive).items():
+            best = best_stages.get(stage)
+            if best is None or timing["wall_s"] < best["wall_s"]:
+                best_stages[stage] = timing
+
+        started = time.perf_counter()
+        BambuToPrusaConverter().convert_archive(str(archive), str(workdir / f"{name}.prusa.3mf"))
+        best_total = min(best_total, time.perf_counter() - started)
+
+    return {
+        "name": name,
+        "params": spec.as_dict(),
+        "triangles_per_object": spec.triangles_per_object,
+        "input_bytes": archive.stat().st_size,
+        "output_bytes": (workdir / f"{name}.prusa.3mf").stat().st_size,
+        "stages": {stage: best_stages[stage] for stage in STAGES},
+        "convert_archive_wall_s": best_total,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous: Dict[str, object], current: Dict[str, object]) -> None:
+    """Print per-stage wall time ratios of *current* against *previous*."""
+    old_cases = {case["name"]: case for case in previous["cases"]}
+    print(f"\nComparison against {previous.get('revision') or 'previous run'} (new/old wall time):")
+    for case in current["cases"]:
+        old = old_cases.get(case["name"])
+        if old is None:
+            continue
+        ratios = []
+        for stage in (*STAGES, "convert_archive"):
+            new_s = case["convert_archive_wall_s"] if stage == "convert_archive" else case["stages"][stage]["wall_s"]
+            old_s = old["convert_archive_wall_s"] if stage == "convert_archive" else old["stages"].get(stage, {}).get("wall_s")
+            if old_s:
+                ratios.append(f"{stage}={new_s / old_s:.2f}x")
+        print(f"  {case['name']}: " + ", ".join(ratios))
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Bambu to Prusa conversion stages.")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=sorted(CASES), help="Cases to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest is kept (default: 3)")
+    parser.add_argument("--output", help="Write the JSON report to this path instead of stdout")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="bambu_bench_") as workdir:
+        # Run the cases smallest first so peak RSS roughly tracks each case.
+        report = {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cases": [run_case(name, CASES[name], Path(workdir), args.repeat) for name in args.cases],
+        }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        print(f"Wrote {args.output}")
+    else:
+        print(text)
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
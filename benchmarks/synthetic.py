@@ -0,0 +1,144 @@
+"""Generate synthetic Bambu Studio 3MF archives for benchmarking.
+
+The archives mimic what Bambu Studio writes: one or more
+``3D/Objects/*.model`` files holding grid meshes, optional per-triangle
+``paint_color`` data, a relationships file, content types and ``Metadata``
+members such as plate thumbnails and settings blobs.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import zipfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator
+
+from bambu_to_prusa.paint import encode_segmentation
+
+BAMBU_NAMESPACE = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+PRODUCTION_NAMESPACE = "http://schemas.microsoft.com/3dmanufacturing/production/2015/06"
+BAMBU_STUDIO_NAMESPACE = "http://schemas.bambulab.com/package/2021"
+# Typical values seen in painted Bambu triangles: plain extruder states and
+# a few subdivided triangles, each child a state or a further split.
+PAINT_VALUES = tuple(
+    encode_segmentation(tree)
+    for tree in (
+        1,
+        2,
+        3,
+        4,
+        (1, 0, (1, 2)),
+        (1, 1, (0, 3)),
+        (2, 2, (1, 2, 1)),
+        (3, 0, (1, (1, 0, (2, 4)), 0, 3)),
+    )
+)
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+ <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+ <Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>
+ <Default Extension="png" ContentType="image/png"/>
+</Types>
+"""
+
+
+@dataclass
+class SyntheticSpec:
+    """Shape of a generated archive."""
+
+    vertices_per_object: int = 1_000
+    objects_per_model: int = 1
+    model_files: int = 1
+    paint_density: float = 0.0
+    thumbnails: int = 1
+    thumbnail_bytes: int = 64 * 1024
+    metadata_bytes: int = 16 * 1024
+    seed: int = 0
+
+    def as_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+    @property
+    def grid_size(self) -> int:
+        return max(2, math.isqrt(max(self.vertices_per_object, 4) - 1) + 1)
+
+    @property
+    def triangles_per_object(self) -> int:
+        return 2 * (self.grid_size - 1) ** 2
+
+
+def _mesh_lines(spec: SyntheticSpec, rng: random.Random) -> Iterator[str]:
+    size = spec.grid_size
+    yield "    <mesh>\n     <vertices>\n"
+    for row in range(size):
+        for column in range(size):
+            z = rng.random()
+            yield f'      <vertex x="{column * 0.5:.4f}" y="{row * 0.5:.4f}" z="{z:.6f}"/>\n'
+    yield "     </vertices>\n     <triangles>\n"
+    for row in range(size - 1):
+        for column in range(size - 1):
+            a = row * size + column
+            b, c, d = a + 1, a + size, a + size + 1
+            for v1, v2, v3 in ((a, b, d), (a, d, c)):
+                paint = ""
+                if spec.paint_density and rng.random() < spec.paint_density:
+                    paint = f' paint_color="{rng.choice(PAINT_VALUES)}"'
+                yield f'      <triangle v1="{v1}" v2="{v2}" v3="{v3}"{paint}/>\n'
+    yield "     </triangles>\n    </mesh>\n"
+
+
+def model_document(spec: SyntheticSpec, file_index: int, rng: random.Random) -> Iterator[str]:
+    """Yield the text of one Bambu ``.model`` file in pieces."""
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield (
+        f'<model unit="millimeter" xml:lang="en-US" xmlns="{BAMBU_NAMESPACE}" '
+        f'xmlns:BambuStudio="{BAMBU_STUDIO_NAMESPACE}" xmlns:p="{PRODUCTION_NAMESPACE}" requiredextensions="p">\n'
+    )
+    yield ' <metadata name="BambuStudio:3mfVersion">1</metadata>\n <resources>\n'
+    first_id = file_index * spec.objects_per_model + 1
+    for object_id in range(first_id, first_id + spec.objects_per_model):
+        yield f'  <object id="{object_id}" p:UUID="{rng.getrandbits(128):032x}" type="model">\n'
+        yield from _mesh_lines(spec, rng)
+        yield "  </object>\n"
+    yield " </resources>\n <build>\n"
+    for object_id in range(first_id, first_id + spec.objects_per_model):
+        yield f'  <item objectid="{object_id}" p:UUID="{rng.getrandbits(128):032x}" transform="1 0 0 0 1 0 0 0 1 {object_id * 10} 0 0" printable="1"/>\n'
+    yield " </build>\n</model>\n"
+
+
+def write_synthetic_archive(path: str | Path, spec: SyntheticSpec) -> Path:
+    """Write a synthetic Bambu archive described by *spec* to *path*."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(spec.seed)
+    model_names = [f"3D/Objects/object_{index + 1}.model" for index in range(spec.model_files)]
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        relationships = "".join(
+            f' <Relationship Target="/{name}" Id="rel-{index}" '
+            'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>\n'
+            for index, name in enumerate(model_names, start=1)
+        )
+        archive.writestr(
+            "_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
+            f"{relationships}</Relationships>\n",
+        )
+        for index, name in enumerate(model_names):
+            with archive.open(name, "w", force_zip64=True) as member:
+                for piece in model_document(spec, index, rng):
+                    member.write(piece.encode("utf-8"))
+        for index in range(spec.thumbnails):
+            # Random bytes stand in for PNG data: like real images they do not compress.
+            archive.writestr(f"Metadata/plate_{index + 1}.png", rng.randbytes(spec.thumbnail_bytes))
+        if spec.metadata_bytes:
+            settings = ("; generated setting\n" * (spec.metadata_bytes // 20 + 1))[: spec.metadata_bytes]
+            archive.writestr("Metadata/project_settings.config", settings)
+    return path
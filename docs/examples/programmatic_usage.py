@@ -36,22 +36,18 @@ def conversion_with_error_handling():
 
 
 def batch_conversion():
-    """Convert multiple files in a directory."""
+    """Convert every file under a directory, mirroring its layout."""
+    from bambu_to_prusa.batch import collect_batch_jobs
+
     converter = BambuToPrusaConverter()
-    
-    input_dir = Path("input_files")
-    output_dir = Path("output_files")
-    output_dir.mkdir(exist_ok=True)
-    
-    for input_file in input_dir.glob("*.3mf"):
-        output_file = output_dir / input_file.name
-        print(f"Converting {input_file.name}...")
-        
-        try:
-            converter.convert_archive(str(input_file), str(output_file))
-            print(f"  ✓ Created {output_file.name}")
-        except Exception as e:
-            print(f"  ✗ Failed: {e}")
+    jobs = collect_batch_jobs(["input_files"], "output_files")
+
+    # Spread the archives over 4 worker processes; results keep the input order.
+    for result in converter.convert_many(jobs, max_jobs=4):
+        if result.ok:
+            print(f"  ✓ {result.output_file} ({result.duration:.2f}s)")
+        else:
+            print(f"  ✗ {result.input_file}: {result.error}")
 
 
 if __name__ == "__main__":
@@ -1,17 +1,247 @@
 """Command-line interface implementation for Bambu2Prusa converter."""
 
 import argparse
+import json
 import logging
+import os
 import sys
+import time
+import zipfile
 from pathlib import Path
 
+from bambu_to_prusa.archive_index import MEMBER_KINDS, ROOT_MEMBER, ArchiveIndex
+from bambu_to_prusa.batch import ConversionResult, collect_batch_jobs
+from bambu_to_prusa.cancellation import CancellationToken
 from bambu_to_prusa.converter import BambuToPrusaConverter
+from bambu_to_prusa.file_ops import decompress_zip
+from bambu_to_prusa.instrumentation import StageRecorder
+from frontends.common.options import (
+    add_cache_arguments,
+    add_carry_over_argument,
+    add_compression_arguments,
+    add_dedup_argument,
+    add_memory_argument,
+    add_paint_argument,
+    add_placement_arguments,
+    add_timeout_argument,
+    cache_from_args,
+    compression_from_args,
+)
+from frontends.common.progress import format_bytes, progress_bar
+
+
+def _cancel_token_from_args(args):
+    """Return a CancellationToken carrying the requested deadline, or None."""
+    if args.timeout is None:
+        return None
+    if args.timeout <= 0:
+        print("Error: --timeout must be positive", file=sys.stderr)
+        sys.exit(1)
+    return CancellationToken(timeout=args.timeout)
+
+
+def _print_cache_stats(cache, file=None):
+    if cache is not None:
+        stats = cache.stats
+        print(f"Cache: {stats.hits} hit(s), {stats.misses} miss(es), {stats.evictions} eviction(s)", file=file)
+
+
+def _print_dedup_stats(stats, file=None):
+    if stats.duplicates:
+        print(
+            f"Deduplicated {stats.duplicates} of {stats.objects} object(s), saving {stats.bytes_saved} bytes",
+            file=file,
+        )
+
+
+def _progress_printer(stream=None):
+    """Return a progress callback that redraws a bar on one terminal line."""
+    stream = stream or sys.stderr
+
+    def show(update):
+        end = "\n" if update.finished else ""
+        print(f"\r{progress_bar(update)}\033[K", end=end, file=stream, flush=True)
+
+    return show
+
+
+def _print_result(result: ConversionResult) -> None:
+    """Print a one-line summary for a finished batch item."""
+    if result.ok:
+        status = "HIT " if result.cached else "OK  "
+        print(f"  {status}  {result.duration:8.2f}s  {result.input_file} -> {result.output_file}")
+    else:
+        print(f"  FAIL  {result.duration:8.2f}s  {result.input_file}: {result.error}")
+
+
+def batch_main(argv):
+    """Entrypoint for the ``batch`` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="bambu2prusa-cli batch",
+        description="Convert many Bambu Studio 3mf files, mirroring the input tree into an output directory.",
+    )
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        help="Input .3mf files, directories (searched recursively) or glob patterns",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        required=True,
+        help="Directory that receives the converted files",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of archives converted in parallel (default: 1)",
+    )
+    add_timeout_argument(parser)
+    add_memory_argument(parser)
+    add_placement_arguments(parser)
+    add_paint_argument(parser)
+    add_dedup_argument(parser)
+    add_carry_over_argument(parser)
+    add_compression_arguments(parser)
+    add_cache_arguments(parser)
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Enable verbose logging",
+    )
+
+    args = parser.parse_args(argv)
+
+    log_level = logging.DEBUG if args.verbose else logging.WARNING
+    logging.basicConfig(
+        level=log_level,
+        format="%(levelname)s: %(message)s"
+    )
+
+    if args.jobs < 1:
+        print("Error: --jobs must be at least 1", file=sys.stderr)
+        sys.exit(1)
+
+    jobs = collect_batch_jobs(args.sources, args.output_dir)
+    if not jobs:
+        print("Error: No .3mf files matched the given sources", file=sys.stderr)
+        sys.exit(1)
+
+    cancel = _cancel_token_from_args(args)
+    print(f"Converting {len(jobs)} file(s) with {args.jobs} job(s) into {args.output_dir}")
+    started = time.perf_counter()
+    converter = BambuToPrusaConverter(
+        cache=cache_from_args(args),
+        compression=compression_from_args(args),
+        max_memory=args.max_memory,
+        placement=args.placement,
+        bed_size=args.bed_size,
+        extruder_map=args.extruder_map,
+        deduplicate=args.deduplicate,
+        carry_over=args.carry_over,
+    )
+    try:
+        results = converter.convert_many(jobs, max_jobs=args.jobs, on_result=_print_result, cancel=cancel)
+    except KeyboardInterrupt:
+        print("Interrupted; partial outputs were removed.", file=sys.stderr)
+        sys.exit(130)
+    elapsed = time.perf_counter() - started
+
+    failures = [result for result in results if not result.ok]
+    print(f"Converted {len(results) - len(failures)}/{len(results)} file(s) in {elapsed:.2f}s")
+    if converter.cache is not None:
+        hits = sum(1 for result in results if result.cached)
+        print(f"Cache: {hits} hit(s), {len(results) - hits} miss(es)")
+    sys.exit(1 if failures else 0)
+
+
+def _print_preflight(preflight, max_memory=None):
+    for kind, total in preflight.kinds.items():
+        print(
+            f"  {kind:<12} {total['count']:>5} member(s) "
+            f"{format_bytes(total['compress_size']):>11} -> {format_bytes(total['file_size']):>11}"
+        )
+    print(
+        f"Conversion reads {format_bytes(preflight.read_bytes)} from {preflight.models} model file(s) "
+        f"({preflight.streamed_models} streamed) and skips {format_bytes(preflight.skipped_bytes)}"
+    )
+    print(
+        f"Estimated peak memory {format_bytes(preflight.peak_memory_bytes)}, "
+        f"temporary space {format_bytes(preflight.temp_bytes)}, output {format_bytes(preflight.output_bytes)}"
+    )
+    for problem in preflight.warnings(max_memory):
+        print(f"Warning: {problem}")
+
+
+def inspect_main(argv):
+    """Entrypoint for the ``inspect`` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="bambu2prusa-cli inspect",
+        description="Classify the members of a 3mf file and estimate the cost of converting it, "
+        "reading only the archive's directory.",
+    )
+    parser.add_argument("input", help="Path to a Bambu Studio 3mf file")
+    parser.add_argument("-o", "--output", help="Planned output path, to check its free disk space")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker count the conversion would use (default: 1)",
+    )
+    add_memory_argument(parser)
+    parser.add_argument("--json", action="store_true", help="Print the estimate as JSON")
+    parser.add_argument("--extract", metavar="DIR", help="Extract the selected members into DIR")
+    parser.add_argument(
+        "--kind",
+        action="append",
+        choices=MEMBER_KINDS,
+        help="Member kind to extract; repeat for several (default: the members a conversion reads)",
+    )
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        print(f"Error: Input file not found: {args.input}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        converter = BambuToPrusaConverter(workers=args.workers, max_memory=args.max_memory)
+        preflight = converter.preflight(args.input, args.output)
+        if args.extract:
+            with zipfile.ZipFile(args.input) as zip_in:
+                index = ArchiveIndex(zip_in)
+                if args.kind:
+                    members = index.names(*args.kind)
+                else:
+                    members = index.members_to_convert() + index.names(ROOT_MEMBER)
+            decompress_zip(args.input, args.extract, members)
+    except Exception as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(preflight.as_dict(), indent=2))
+    else:
+        print(f"{args.input}: {preflight.members} member(s), {format_bytes(preflight.archive_bytes)}")
+        _print_preflight(preflight, args.max_memory)
+    if args.extract:
+        print(f"Extracted {len(members)} member(s) into {args.extract}", file=sys.stderr if args.json else sys.stdout)
+    sys.exit(0)
 
 
 def main():
     """Main CLI entrypoint for Bambu2Prusa converter."""
+    if sys.argv[1:2] == ["batch"]:
+        return batch_main(sys.argv[2:])
+    if sys.argv[1:2] == ["inspect"]:
+        return inspect_main(sys.argv[2:])
+
     parser = argparse.ArgumentParser(
-        description="Convert Bambu Studio 3mf files to PrusaSlicer-compatible 3mf files."
+        description="Convert Bambu Studio 3mf files to PrusaSlicer-compatible 3mf files.",
+        epilog="Run 'bambu2prusa-cli batch --help' to convert many files at once, or "
+        "'bambu2prusa-cli inspect --help' to examine a file before converting it.",
     )
     parser.add_argument(
         "input",
@@ -23,6 +253,45 @@ def main():
         type=str,
         help="Path to output PrusaSlicer 3mf file",
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes used to convert model files within the archive (default: 1)",
+    )
+    parser.add_argument(
+        "--pretty-print",
+        action="store_true",
+        help="Re-indent the output model files (larger and slower to write)",
+    )
+    add_timeout_argument(parser)
+    add_memory_argument(parser)
+    add_placement_arguments(parser)
+    add_paint_argument(parser)
+    add_dedup_argument(parser)
+    add_carry_over_argument(parser)
+    add_compression_arguments(parser)
+    add_cache_arguments(parser)
+    progress_group = parser.add_mutually_exclusive_group()
+    progress_group.add_argument(
+        "--progress",
+        dest="progress",
+        action="store_true",
+        default=None,
+        help="Show a progress bar on stderr (default: when stderr is a terminal)",
+    )
+    progress_group.add_argument(
+        "--no-progress",
+        dest="progress",
+        action="store_false",
+        help="Never show the progress bar",
+    )
+    parser.add_argument(
+        "--stats",
+        choices=["json"],
+        help="Print a per-stage timing and memory report to stdout; status messages move to stderr",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -58,12 +327,42 @@ def main():
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
+    # Keep stdout clean for the report when one was requested
+    recorder = StageRecorder() if args.stats else None
+    status = sys.stderr if recorder else sys.stdout
+    show_progress = args.progress if args.progress is not None else sys.stderr.isatty()
+    cancel = _cancel_token_from_args(args)
+
     try:
-        print(f"Converting: {input_path} -> {output_path}")
-        converter = BambuToPrusaConverter()
-        converter.convert_archive(str(input_path), str(output_path))
-        print(f"Success! Output file created: {output_path}")
+        print(f"Converting: {input_path} -> {output_path}", file=status)
+        converter = BambuToPrusaConverter(
+            workers=args.workers,
+            cache=cache_from_args(args),
+            pretty_print=args.pretty_print,
+            compression=compression_from_args(args),
+            observer=recorder,
+            max_memory=args.max_memory,
+            placement=args.placement,
+            bed_size=args.bed_size,
+            extruder_map=args.extruder_map,
+            deduplicate=args.deduplicate,
+            carry_over=args.carry_over,
+        )
+        converter.convert_archive(
+            str(input_path),
+            str(output_path),
+            progress=_progress_printer() if show_progress else None,
+            cancel=cancel,
+        )
+        print(f"Success! Output file created: {output_path}", file=status)
+        _print_cache_stats(converter.cache, file=status)
+        _print_dedup_stats(converter.dedup_stats, file=status)
+        if recorder:
+            print(recorder.to_json())
         sys.exit(0)
+    except KeyboardInterrupt:
+        print("\nInterrupted; partial output was removed.", file=sys.stderr)
+        sys.exit(130)
     except Exception as exc:
         logging.error("Conversion failed: %s", exc)
         print(f"Error: {exc}", file=sys.stderr)
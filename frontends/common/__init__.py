@@ -1,5 +1,7 @@
 """Common utilities shared across all frontend implementations."""
 
 from .helpers import first_existing_dir
+from .progress import describe_progress, format_duration, progress_bar
+from .worker import BackgroundConversion
 
-__all__ = ["first_existing_dir"]
+__all__ = ["BackgroundConversion", "describe_progress", "first_existing_dir", "format_duration", "progress_bar"]
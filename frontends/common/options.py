@@ -0,0 +1,206 @@
+"""Command-line options shared by the CLI and the HTTP service.
+
+Each ``add_*`` function registers one group of options on an argparse
+parser, the ``parse_*`` functions are their argument types, and the
+``*_from_args`` functions turn parsed options into converter settings.
+"""
+
+import argparse
+import os
+import sys
+
+from bambu_to_prusa.converter import CARRY_OVER_KINDS, DEFAULT_CARRY_OVER
+from bambu_to_prusa.file_ops import COMPRESSION_PRESETS, CompressionPolicy
+from bambu_to_prusa.placement import DEFAULT_BED_SIZE, PLACEMENT_MODES, SOURCE_PLACEMENT
+from bambu_to_prusa.result_cache import DEFAULT_MAX_BYTES, ResultCache
+
+CACHE_DIR_ENV = "BAMBU2PRUSA_CACHE_DIR"
+SIZE_SUFFIXES = {"K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def add_cache_arguments(parser):
+    """Register the result cache options shared by every command."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--cache",
+        dest="cache",
+        action="store_true",
+        default=None,
+        help=f"Reuse earlier results for unchanged inputs (enabled by default when ${CACHE_DIR_ENV} is set)",
+    )
+    group.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Disable the result cache",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=f"Result cache location; implies --cache (default: ${CACHE_DIR_ENV} or the user cache directory)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Evict least recently used cache entries beyond this many megabytes (default: %(default)s)",
+    )
+
+
+def add_compression_arguments(parser):
+    """Register the output compression options shared by every command."""
+    parser.add_argument(
+        "--compression",
+        choices=sorted(COMPRESSION_PRESETS),
+        default="balanced",
+        help="Output compression preset; 'store' skips compression entirely (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        help="Explicit zlib level 0-9, overriding the preset's level",
+    )
+    parser.add_argument(
+        "--compress-threads",
+        type=int,
+        default=1,
+        help="Threads used to deflate large members (default: %(default)s)",
+    )
+
+
+def add_timeout_argument(parser):
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Abort and remove partial output after this many seconds",
+    )
+
+
+def parse_size(value):
+    """Parse a byte size such as ``512M`` or ``2G``; bare numbers are megabytes."""
+    text = value.strip().upper()
+    if text.endswith("B"):
+        text = text[:-1]
+    unit = SIZE_SUFFIXES["M"]
+    if text[-1:] in SIZE_SUFFIXES:
+        text, unit = text[:-1], SIZE_SUFFIXES[text[-1]]
+    try:
+        size = int(float(text) * unit)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}") from None
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"size must be positive: {value!r}")
+    return size
+
+
+def add_memory_argument(parser):
+    parser.add_argument(
+        "--max-memory",
+        type=parse_size,
+        metavar="SIZE",
+        help="Memory budget per archive (e.g. 512M, 2G); large meshes are streamed element by element to stay within it",
+    )
+
+
+def parse_bed_size(value):
+    """Parse a bed size given as ``WIDTHxDEPTH`` in millimetres."""
+    try:
+        width, depth = (float(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid bed size: {value!r} (expected e.g. 250x210)") from None
+    if width <= 0 or depth <= 0:
+        raise argparse.ArgumentTypeError(f"bed size must be positive: {value!r}")
+    return width, depth
+
+
+def parse_extruder_map(value):
+    """Parse an extruder renumbering such as ``1=2,2=1``."""
+    mapping = {}
+    try:
+        for pair in value.split(","):
+            source, target = (int(part) for part in pair.split("="))
+            mapping[source] = target
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid extruder map: {value!r} (expected e.g. 1=2,2=1)") from None
+    if any(number < 0 for pair in mapping.items() for number in pair):
+        raise argparse.ArgumentTypeError(f"extruder numbers must not be negative: {value!r}")
+    return mapping
+
+
+def add_paint_argument(parser):
+    parser.add_argument(
+        "--extruder-map",
+        type=parse_extruder_map,
+        metavar="FROM=TO,...",
+        help="Renumber painted extruders, e.g. 1=2,2=1 swaps the first two",
+    )
+
+
+def add_dedup_argument(parser):
+    parser.add_argument(
+        "--no-dedup",
+        dest="deduplicate",
+        action="store_false",
+        help="Write every copy of a repeated mesh instead of instancing the first one",
+    )
+
+
+def parse_carry_over(value):
+    """Parse a comma-separated list of member kinds to carry over; ``none`` for none."""
+    if value.strip().lower() == "none":
+        return ()
+    kinds = tuple(kind.strip() for kind in value.split(",") if kind.strip())
+    unknown = [kind for kind in kinds if kind not in CARRY_OVER_KINDS]
+    if unknown or not kinds:
+        raise argparse.ArgumentTypeError(
+            f"invalid member kinds: {value!r} (expected 'none' or any of {','.join(CARRY_OVER_KINDS)})"
+        )
+    return kinds
+
+
+def add_carry_over_argument(parser):
+    parser.add_argument(
+        "--carry-over",
+        type=parse_carry_over,
+        default=DEFAULT_CARRY_OVER,
+        metavar="KINDS",
+        help="Input members copied into the output without recompression: 'none' or a comma-separated "
+        f"list of {','.join(CARRY_OVER_KINDS)} (default: {','.join(DEFAULT_CARRY_OVER)})",
+    )
+
+
+def add_placement_arguments(parser):
+    parser.add_argument(
+        "--placement",
+        choices=PLACEMENT_MODES,
+        default=SOURCE_PLACEMENT,
+        help="Keep the project's object placement, or arrange all objects on the bed (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--bed-size",
+        type=parse_bed_size,
+        default=DEFAULT_BED_SIZE,
+        metavar="WxD",
+        help="Bed size in millimetres used by --placement arrange (default: 250x210)",
+    )
+
+
+def compression_from_args(args):
+    """Return the CompressionPolicy selected on the command line."""
+    try:
+        return CompressionPolicy.from_preset(
+            args.compression, level=args.compress_level, threads=args.compress_threads
+        )
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+def cache_from_args(args):
+    """Return the ResultCache selected on the command line, or None."""
+    env_dir = os.environ.get(CACHE_DIR_ENV)
+    enabled = args.cache
+    if enabled is None:
+        enabled = bool(args.cache_dir or env_dir)
+    if not enabled:
+        return None
+    return ResultCache(args.cache_dir or env_dir or None, max_bytes=args.cache_max_mb * 1024 * 1024)
@@ -0,0 +1,50 @@
+"""Progress formatting shared by the frontends."""
+
+from bambu_to_prusa.progress import ProgressUpdate
+
+
+def format_duration(seconds: float | None) -> str:
+    """Format *seconds* as ``M:SS`` (or ``H:MM:SS``); ``--:--`` when unknown."""
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def format_count(value: int) -> str:
+    """Format *value* compactly, e.g. ``1.2M``."""
+    for threshold, suffix in ((1_000_000_000, "G"), (1_000_000, "M"), (1_000, "k")):
+        if value >= threshold:
+            return f"{value / threshold:.1f}{suffix}"
+    return str(value)
+
+
+def format_bytes(value: int) -> str:
+    """Format a byte count with binary units, e.g. ``12.5 MiB``."""
+    for threshold, suffix in ((1 << 30, "GiB"), (1 << 20, "MiB"), (1 << 10, "KiB")):
+        if value >= threshold:
+            return f"{value / threshold:.1f} {suffix}"
+    return f"{value} B"
+
+
+def describe_progress(update: ProgressUpdate) -> str:
+    """Return a one-line summary of *update* for status labels."""
+    if update.finished:
+        return f"Done in {format_duration(update.elapsed_s)}"
+    parts = [
+        f"{update.fraction:.0%}",
+        f"{update.models_done}/{update.models_total} models",
+        f"{format_count(update.triangles)} triangles",
+        f"ETA {format_duration(update.eta_s)}",
+    ]
+    return " | ".join(parts)
+
+
+def progress_bar(update: ProgressUpdate, width: int = 30) -> str:
+    """Return a text progress bar followed by the summary line."""
+    filled = int(width * update.fraction)
+    return f"[{'#' * filled}{'-' * (width - filled)}] {describe_progress(update)}"
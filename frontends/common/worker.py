@@ -0,0 +1,71 @@
+"""Run a conversion off the UI thread and hand its events back through a queue."""
+
+import queue
+import threading
+
+from bambu_to_prusa.cancellation import CancellationToken, ConversionCancelled
+
+PROGRESS = "progress"
+FINISHED = "finished"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class BackgroundConversion:
+    """Convert one archive on a daemon thread.
+
+    The worker never touches widgets: it posts ``(kind, payload)`` events to
+    :attr:`events`, which the UI drains on its own thread. ``kind`` is one of
+    ``progress`` (a ProgressUpdate), ``finished`` (the output path),
+    ``failed`` (the exception) or ``cancelled``; exactly one of the last
+    three ends every job.
+    """
+
+    def __init__(self, converter, input_file, output_file):
+        self.converter = converter
+        self.input_file = input_file
+        self.output_file = output_file
+        self.events = queue.Queue()
+        self.token = CancellationToken()
+        self._thread = threading.Thread(target=self._run, name="bambu2prusa-conversion", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Ask the job to stop; it aborts within one read chunk."""
+        self.token.cancel()
+
+    def join(self, timeout=None):
+        """Wait up to *timeout* seconds for the job to end; return whether it did."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        try:
+            output = self.converter.convert_archive(
+                self.input_file,
+                self.output_file,
+                progress=lambda update: self.events.put((PROGRESS, update)),
+                cancel=self.token,
+            )
+        except ConversionCancelled:
+            self.events.put((CANCELLED, None))
+        except Exception as exc:
+            self.events.put((FAILED, exc))
+        else:
+            self.events.put((FINISHED, output))
+
+    def drain(self):
+        """Return the events posted since the last call without blocking."""
+        pending = []
+        while True:
+            try:
+                pending.append(self.events.get_nowait())
+            except queue.Empty:
+                return pending
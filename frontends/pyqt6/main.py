@@ -19,11 +19,12 @@ try:
         QLineEdit,
         QMainWindow,
         QMessageBox,
+        QProgressBar,
         QPushButton,
         QVBoxLayout,
         QWidget,
     )
-    from PyQt6.QtCore import Qt
+    from PyQt6.QtCore import QObject, Qt, QThread, pyqtSignal
     from PyQt6.QtSvgWidgets import QSvgWidget
     PYQT6_AVAILABLE = True
 except ImportError:
@@ -31,12 +32,18 @@ except ImportError:
     # Define placeholder classes to avoid NameError during import
     QDialog = object
     QMainWindow = object
+    QObject = object
+
+    def pyqtSignal(*types):
+        return None
 
 
 from bambu_to_prusa.converter import BambuToPrusaConverter
+from bambu_to_prusa.cancellation import CancellationToken, ConversionCancelled
 from bambu_to_prusa.settings import SettingsManager
 from bambu_to_prusa.theme_engine import Theme, ThemeEngine
 from frontends.common.helpers import first_existing_dir
+from frontends.common.progress import describe_progress
 
 
 class SettingsDialog(QDialog):
@@ -125,6 +132,44 @@ class SettingsDialog(QDialog):
         self.accept()
 
 
+class ConversionWorker(QObject):
+    """Runs one conversion on a QThread and reports back through signals.
+
+    Signals are delivered to the window on the GUI thread, so slots may touch
+    widgets directly. Exactly one of ``finished``, ``error`` or ``cancelled``
+    ends every job.
+    """
+
+    progress = pyqtSignal(object)
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, converter, input_file, output_file):
+        super().__init__()
+        self.converter = converter
+        self.input_file = input_file
+        self.output_file = output_file
+        self.token = CancellationToken()
+
+    def cancel(self):
+        """Ask the job to stop; it aborts within one read chunk (thread-safe)."""
+        self.token.cancel()
+
+    def run(self):
+        try:
+            output = self.converter.convert_archive(
+                self.input_file, self.output_file, progress=self.progress.emit, cancel=self.token
+            )
+        except ConversionCancelled:
+            self.cancelled.emit()
+        except Exception as exc:
+            logging.error("Conversion failed: %s", exc)
+            self.error.emit(str(exc))
+        else:
+            self.finished.emit(output)
+
+
 class BambuToPrusaWindow(QMainWindow):
     """Main window for PyQt6 GUI."""
 
@@ -160,6 +205,8 @@ class BambuToPrusaWindow(QMainWindow):
         self.theme = self.theme_engine.palette_for(self.current_theme_name)
 
         self.settings_dialog = None
+        self.worker_thread = None
+        self.worker = None
         
         self.init_ui()
 
@@ -279,10 +326,23 @@ class BambuToPrusaWindow(QMainWindow):
         )
         layout.addWidget(self.convert_button)
         
+        # Cancel button
+        self.cancel_button = self._create_button("Cancel", self.cancel_conversion)
+        self.cancel_button.setEnabled(False)
+        layout.addWidget(self.cancel_button)
+        
         # Settings button
         self.settings_button = self._create_button("Settings", self.open_settings_dialog)
         layout.addWidget(self.settings_button)
         
+        # Progress bar
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setStyleSheet(self._progress_style())
+        layout.addWidget(self.progress_bar)
+        
         # Status label
         self.status_label = QLabel("")
         self.status_label.setStyleSheet(
@@ -294,6 +354,13 @@ class BambuToPrusaWindow(QMainWindow):
         
         layout.addStretch()
 
+    def _progress_style(self):
+        return (
+            f"QProgressBar {{ background-color: {self.theme['panel']}; "
+            f"border: 1px solid {self.theme['panel_outline']}; height: 8px; }} "
+            f"QProgressBar::chunk {{ background-color: {self.theme['accent']}; }}"
+        )
+
     def _create_button(self, text, callback, primary=False):
         """Create a styled button."""
         button = QPushButton(text)
@@ -362,9 +429,10 @@ class BambuToPrusaWindow(QMainWindow):
             f"color: {self.theme['muted']}; background-color: transparent; "
             f"margin: 10px; padding: 10px;"
         )
+        self.progress_bar.setStyleSheet(self._progress_style())
         
         # Buttons
-        for button in [self.input_button, self.output_button, self.convert_button, self.settings_button]:
+        for button in [self.input_button, self.output_button, self.convert_button, self.cancel_button, self.settings_button]:
             is_primary = button.property("primary")
             if is_primary:
                 button.setStyleSheet(
@@ -439,46 +507,92 @@ class BambuToPrusaWindow(QMainWindow):
             self.status_label.setText("Output selection canceled.")
             self.status_label.setStyleSheet(f"color: {self.theme['warning']}; background-color: transparent; margin: 10px; padding: 10px;")
 
+    def show_progress(self, update):
+        """Reflect a conversion progress update in the progress bar and status label."""
+        self.progress_bar.setValue(int(update.fraction * self.progress_bar.maximum()))
+        self.status_label.setText(describe_progress(update))
+
+    def _set_status(self, text, color):
+        self.status_label.setText(text)
+        self.status_label.setStyleSheet(f"color: {color}; background-color: transparent; margin: 10px; padding: 10px;")
+
     def convert(self):
-        """Perform the conversion."""
+        """Start the conversion on a worker thread."""
+        if self.worker_thread is not None:
+            return
+
         if not self.input_file:
             QMessageBox.warning(self, "No Input File", "Please select an input file.")
-            self.status_label.setText("Please provide both input and output files.")
-            self.status_label.setStyleSheet(f"color: {self.theme['warning']}; background-color: transparent; margin: 10px; padding: 10px;")
+            self._set_status("Please provide both input and output files.", self.theme['warning'])
             return
         
         if not self.output_file:
             QMessageBox.warning(self, "No Output File", "Please select an output file.")
-            self.status_label.setText("Please provide both input and output files.")
-            self.status_label.setStyleSheet(f"color: {self.theme['warning']}; background-color: transparent; margin: 10px; padding: 10px;")
+            self._set_status("Please provide both input and output files.", self.theme['warning'])
             return
         
-        try:
-            self.status_label.setText("Converting...")
-            self.status_label.setStyleSheet(f"color: {self.theme['text']}; background-color: transparent; margin: 10px; padding: 10px;")
-            self.convert_button.setEnabled(False)
-            QApplication.processEvents()  # Update UI
-            
-            self.converter.convert_archive(self.input_file, self.output_file)
-            
-            self.status_label.setText(f"Output file created: {Path(self.output_file).name}")
-            self.status_label.setStyleSheet(f"color: {self.theme['text']}; background-color: transparent; margin: 10px; padding: 10px;")
-            QMessageBox.information(
-                self,
-                "Success",
-                f"File converted successfully!\n\nOutput: {self.output_file}"
-            )
-        except Exception as exc:
-            logging.error("Conversion failed: %s", exc)
-            self.status_label.setText(f"Error: {exc}")
-            self.status_label.setStyleSheet(f"color: #ff6b6b; background-color: transparent; margin: 10px; padding: 10px;")
-            QMessageBox.critical(
-                self,
-                "Conversion Failed",
-                f"An error occurred during conversion:\n\n{exc}"
-            )
-        finally:
-            self.convert_button.setEnabled(True)
+        self._set_status("Converting...", self.theme['text'])
+        self.progress_bar.setValue(0)
+        self.convert_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+
+        self.worker_thread = QThread(self)
+        self.worker = ConversionWorker(self.converter, self.input_file, self.output_file)
+        self.worker.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.show_progress)
+        self.worker.finished.connect(self.on_conversion_finished)
+        self.worker.error.connect(self.on_conversion_error)
+        self.worker.cancelled.connect(self.on_conversion_cancelled)
+        for signal in (self.worker.finished, self.worker.error, self.worker.cancelled):
+            signal.connect(self.worker_thread.quit)
+        self.worker_thread.finished.connect(self._on_thread_finished)
+        self.worker_thread.start()
+
+    def cancel_conversion(self):
+        """Ask the running conversion to stop; its partial output is removed."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self._set_status("Cancelling...", self.theme['warning'])
+
+    def on_conversion_finished(self, output_file):
+        self.progress_bar.setValue(self.progress_bar.maximum())
+        self._set_status(f"Output file created: {Path(output_file).name}", self.theme['text'])
+        QMessageBox.information(
+            self,
+            "Success",
+            f"File converted successfully!\n\nOutput: {output_file}"
+        )
+
+    def on_conversion_error(self, message):
+        self.progress_bar.setValue(0)
+        self._set_status(f"Error: {message}", "#ff6b6b")
+        QMessageBox.critical(
+            self,
+            "Conversion Failed",
+            f"An error occurred during conversion:\n\n{message}"
+        )
+
+    def on_conversion_cancelled(self):
+        self.progress_bar.setValue(0)
+        self._set_status("Conversion canceled.", self.theme['warning'])
+
+    def _on_thread_finished(self):
+        self.worker.deleteLater()
+        self.worker_thread.deleteLater()
+        self.worker = None
+        self.worker_thread = None
+        self.convert_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+    def closeEvent(self, event):
+        """Cancel a running conversion and wait for it before closing."""
+        if self.worker_thread is not None:
+            self.worker.cancel()
+            self.worker_thread.quit()
+            self.worker_thread.wait()
+        super().closeEvent(event)
 
 
 def main():
@@ -0,0 +1,5 @@
+"""Local HTTP conversion service for Bambu2Prusa converter."""
+
+from .main import main
+
+__all__ = ["main"]
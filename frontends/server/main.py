@@ -0,0 +1,474 @@
+"""Local HTTP conversion service.
+
+``bambu2prusa-serve`` keeps one pool of warm converters
+(:class:`~bambu_to_prusa.async_converter.AsyncConverter`) behind a small
+HTTP/1.1 server, so machines of a slicing farm can post archives instead of
+spawning a CLI process per file:
+
+``POST /convert``
+    The request body is a Bambu Studio 3MF; the response body is the
+    converted Prusa 3MF. Uploads are streamed to a temporary file and the
+    result is streamed back from one, so neither is held in memory. An
+    optional ``filename`` query parameter names the download.
+``GET /healthz``
+    ``{"status": "ok"}`` while the server accepts work.
+``GET /metrics``
+    Request, conversion and queue counters as JSON.
+
+Uploads need a ``Content-Length`` no larger than ``--max-upload``. A request
+arriving while every worker is busy and ``--queue`` requests already wait is
+refused with ``503`` and ``Retry-After`` before its body is read. A lost
+connection (not a client merely half-closing after its upload) cancels the
+job. The server binds to the loopback interface unless ``--allow-remote``
+is given.
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import posixpath
+import sys
+import time
+import zipfile
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from bambu_to_prusa.async_converter import EXECUTORS, THREAD_EXECUTOR, AsyncConverter
+from bambu_to_prusa.converter import BambuToPrusaConverter
+from bambu_to_prusa.file_ops import cleanup_temp_dir, create_temp_dir
+from frontends.common.options import (
+    add_cache_arguments,
+    add_carry_over_argument,
+    add_compression_arguments,
+    add_dedup_argument,
+    add_memory_argument,
+    add_paint_argument,
+    add_placement_arguments,
+    cache_from_args,
+    compression_from_args,
+    parse_size,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_UPLOAD = 512 << 20
+DEFAULT_QUEUE = 16
+# Bytes read from or written to a socket at a time.
+CHUNK_SIZE = 1 << 20
+# Largest accepted request line plus headers.
+HEADER_LIMIT = 64 << 10
+# Seconds a client may stall while sending its request.
+READ_TIMEOUT = 60.0
+# Seconds a refused client is asked to wait before retrying.
+RETRY_AFTER = 5
+OUTPUT_CONTENT_TYPE = "model/3mf"
+JSON_CONTENT_TYPE = "application/json"
+
+
+class HTTPError(Exception):
+    """An error answered with *status* and a JSON ``{"error": message}`` body."""
+
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = HTTPStatus(status)
+        self.headers = list(headers)
+
+
+class Request:
+    """The request line and headers of one HTTP request."""
+
+    def __init__(self, method, target, headers):
+        self.method = method
+        url = urlsplit(target)
+        self.path = url.path
+        self.query = parse_qs(url.query)
+        self.headers = headers
+
+    @classmethod
+    def parse(cls, head):
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line.") from None
+        if not version.startswith("HTTP/1."):
+            raise HTTPError(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED, f"Unsupported protocol {version}.")
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, separator, value = line.partition(":")
+            if not separator:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed header line.")
+            headers[name.strip().lower()] = value.strip()
+        return cls(method, target, headers)
+
+    def content_length(self, limit):
+        """Return the body size, refusing chunked, unsized and oversized bodies."""
+        if "transfer-encoding" in self.headers:
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Chunked uploads are not supported; send Content-Length.")
+        try:
+            length = int(self.headers["content-length"])
+        except KeyError:
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required.") from None
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.") from None
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+        if length == 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "The request body must be a 3MF archive.")
+        if length > limit:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Uploads are limited to {limit} bytes.")
+        return length
+
+
+class ServerMetrics:
+    """Counters reported by ``GET /metrics``."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.converted = 0
+        self.failed = 0
+        self.rejected = 0
+        self.too_large = 0
+        self.cancelled = 0
+        self.timed_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.convert_seconds = 0.0
+
+    def as_dict(self):
+        report = dict(self.__dict__)
+        del report["started"]
+        report["uptime_s"] = time.monotonic() - self.started
+        return report
+
+
+def _output_filename(request):
+    names = request.query.get("filename")
+    name = posixpath.basename(names[0].replace("\\", "/")) if names else ""
+    stem = name[:-4] if name.lower().endswith(".3mf") else name
+    # Header-safe: drop quotes and control or non-ASCII characters.
+    stem = "".join(char for char in stem if 32 <= ord(char) < 127 and char not in '"')
+    return f"{stem or 'converted'}.3mf"
+
+
+class ConversionServer:
+    """Serve conversions of *converter* over HTTP; see the module docstring.
+
+    At most ``converter.max_jobs + max_queue`` uploads are admitted at once,
+    counting those still uploading. *timeout* bounds each conversion in
+    seconds, answering ``504`` when it runs out.
+    """
+
+    def __init__(self, converter, max_upload=DEFAULT_MAX_UPLOAD, max_queue=DEFAULT_QUEUE, timeout=None):
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative.")
+        self.converter = converter
+        self.max_upload = max_upload
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.metrics = ServerMetrics()
+        self.admitted = 0
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start listening and return the :class:`asyncio.Server`."""
+        return await asyncio.start_server(self.handle, host, port, limit=HEADER_LIMIT)
+
+    def snapshot(self):
+        report = self.metrics.as_dict()
+        report.update(
+            admitted=self.admitted,
+            running=self.converter.running,
+            queued=self.converter.waiting,
+            workers=self.converter.max_jobs,
+            max_queue=self.max_queue,
+        )
+        return report
+
+    async def handle(self, reader, writer):
+        """Answer one request on a connection, then close it."""
+        self.metrics.requests += 1
+        try:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), READ_TIMEOUT)
+                request = Request.parse(head[:-4])
+                await self.dispatch(request, reader, writer)
+            except asyncio.LimitOverrunError:
+                raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers are too large.")
+            except asyncio.TimeoutError:
+                raise HTTPError(HTTPStatus.REQUEST_TIMEOUT, "Timed out reading the request.")
+        except HTTPError as exc:
+            if exc.status == HTTPStatus.SERVICE_UNAVAILABLE:
+                self.metrics.rejected += 1
+            elif exc.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE:
+                self.metrics.too_large += 1
+            await self._send_error(writer, exc.status, str(exc), exc.headers)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            # The client went away; nobody is left to answer.
+            pass
+        except Exception as exc:
+            self.metrics.failed += 1
+            logging.exception("Request failed")
+            await self._send_error(writer, HTTPStatus.INTERNAL_SERVER_ERROR, f"Request failed: {exc}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def dispatch(self, request, reader, writer):
+        if request.path == "/convert":
+            self._check_method(request, "POST")
+            await self.convert(request, reader, writer)
+        elif request.path == "/healthz":
+            self._check_method(request, "GET")
+            await self._send_json(writer, HTTPStatus.OK, {"status": "ok"})
+        elif request.path == "/metrics":
+            self._check_method(request, "GET")
+            await self._send_json(writer, HTTPStatus.OK, self.snapshot())
+        else:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No such endpoint: {request.path}")
+
+    @staticmethod
+    def _check_method(request, method):
+        if request.method != method:
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"Use {method}.", [("Allow", method)])
+
+    async def convert(self, request, reader, writer):
+        length = request.content_length(self.max_upload)
+        if self.admitted >= self.converter.max_jobs + self.max_queue:
+            raise HTTPError(
+                HTTPStatus.SERVICE_UNAVAILABLE, "All workers are busy; retry later.", [("Retry-After", str(RETRY_AFTER))]
+            )
+        self.admitted += 1
+        temp_dir = create_temp_dir("bambu2prusa_serve_")
+        try:
+            input_file = os.path.join(temp_dir, "input.3mf")
+            output_file = os.path.join(temp_dir, "output.3mf")
+            try:
+                if request.headers.get("expect", "").lower() == "100-continue":
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                    await writer.drain()
+                await self._receive(reader, length, input_file)
+                self.metrics.bytes_in += length
+                started = time.perf_counter()
+                try:
+                    finished = await self._run(reader, writer, input_file, output_file)
+                finally:
+                    self.metrics.convert_seconds += time.perf_counter() - started
+            finally:
+                self.admitted -= 1
+            if not finished:
+                self.metrics.cancelled += 1
+                return
+            self.metrics.converted += 1
+            await self._send_file(writer, output_file, _output_filename(request))
+        finally:
+            cleanup_temp_dir(temp_dir)
+
+    async def _receive(self, reader, length, path):
+        with open(path, "wb") as target:
+            remaining = length
+            while remaining:
+                chunk = await asyncio.wait_for(reader.read(min(CHUNK_SIZE, remaining)), READ_TIMEOUT)
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                target.write(chunk)
+                remaining -= len(chunk)
+
+    @staticmethod
+    async def _connection_lost(reader, writer):
+        """Return once the connection fails; a client that only half-closes is still waiting."""
+        try:
+            while await reader.read(CHUNK_SIZE):
+                # Bytes pipelined after the body are not answered; drop them.
+                pass
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+    async def _run(self, reader, writer, input_file, output_file):
+        """Convert, returning ``False`` if the connection was lost and the job was cancelled."""
+        conversion = asyncio.ensure_future(
+            asyncio.wait_for(self.converter.convert_archive_async(input_file, output_file), self.timeout)
+        )
+        hangup = asyncio.ensure_future(self._connection_lost(reader, writer))
+        try:
+            await asyncio.wait({conversion, hangup}, return_when=asyncio.FIRST_COMPLETED)
+            if not conversion.done():
+                return False
+            await conversion
+            return True
+        except asyncio.TimeoutError:
+            self.metrics.timed_out += 1
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, "Conversion timed out.") from None
+        except (zipfile.BadZipFile, FileNotFoundError) as exc:
+            self.metrics.failed += 1
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, f"Not a convertible 3MF archive: {exc}") from None
+        except Exception as exc:
+            self.metrics.failed += 1
+            logging.exception("Conversion failed")
+            raise HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Conversion failed: {exc}") from None
+        finally:
+            hangup.cancel()
+            if not conversion.done():
+                # Wait for the worker to stop before the caller removes its files.
+                conversion.cancel()
+                await asyncio.wait({conversion})
+
+    async def _send_file(self, writer, path, filename):
+        size = os.path.getsize(path)
+        headers = [
+            ("Content-Type", OUTPUT_CONTENT_TYPE),
+            ("Content-Disposition", f'attachment; filename="{filename}"'),
+        ]
+        await self._send_head(writer, HTTPStatus.OK, size, headers)
+        with open(path, "rb") as source:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                writer.write(chunk)
+                await writer.drain()
+        self.metrics.bytes_out += size
+
+    async def _send_error(self, writer, status, message, headers=()):
+        try:
+            await self._send_json(writer, status, {"error": message}, headers)
+        except ConnectionError:
+            pass
+
+    async def _send_json(self, writer, status, payload, headers=()):
+        body = json.dumps(payload).encode("utf-8")
+        await self._send_head(writer, status, len(body), [("Content-Type", JSON_CONTENT_TYPE), *headers])
+        writer.write(body)
+        await writer.drain()
+
+    @staticmethod
+    async def _send_head(writer, status, length, headers):
+        status = HTTPStatus(status)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Length: {length}", "Connection: close"]
+        lines.extend(f"{name}: {value}" for name, value in headers)
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+
+def is_local_host(host):
+    """Return whether *host* names only loopback interfaces."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+async def serve(server, host, port):
+    """Run *server* until cancelled, then shut its converter pool down."""
+    listener = await server.start(host, port)
+    addresses = ", ".join(f"http://{name[0]}:{name[1]}" for name in (sock.getsockname() for sock in listener.sockets))
+    print(f"Serving conversions on {addresses}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.converter.aclose()
+
+
+def main(argv=None):
+    """Entrypoint for ``bambu2prusa-serve``."""
+    parser = argparse.ArgumentParser(
+        prog="bambu2prusa-serve",
+        description="Serve Bambu Studio to PrusaSlicer 3mf conversions over local HTTP.",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on (default: %(default)s)")
+    parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help="Allow --host to name a non-loopback interface, exposing the service to the network",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Conversions run at once (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=EXECUTORS,
+        default=THREAD_EXECUTOR,
+        help="Run conversions on a thread or a process pool (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--queue",
+        type=int,
+        default=DEFAULT_QUEUE,
+        help="Requests that may wait for a worker before new ones get 503 (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-upload",
+        type=parse_size,
+        default=DEFAULT_MAX_UPLOAD,
+        metavar="SIZE",
+        help="Largest accepted upload, e.g. 256M or 2G (default: 512M)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Abort a conversion after this many seconds, answering 504",
+    )
+    add_memory_argument(parser)
+    add_placement_arguments(parser)
+    add_paint_argument(parser)
+    add_dedup_argument(parser)
+    add_carry_over_argument(parser)
+    add_compression_arguments(parser)
+    add_cache_arguments(parser)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(levelname)s: %(message)s")
+
+    if not args.allow_remote and not is_local_host(args.host):
+        print(f"Error: {args.host} is not a loopback address; pass --allow-remote to listen on it", file=sys.stderr)
+        sys.exit(1)
+    if args.workers < 1 or args.queue < 0:
+        print("Error: --workers must be at least 1 and --queue must not be negative", file=sys.stderr)
+        sys.exit(1)
+    if args.timeout is not None and args.timeout <= 0:
+        print("Error: --timeout must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    converter = BambuToPrusaConverter(
+        cache=cache_from_args(args),
+        compression=compression_from_args(args),
+        max_memory=args.max_memory,
+        placement=args.placement,
+        bed_size=args.bed_size,
+        extruder_map=args.extruder_map,
+        deduplicate=args.deduplicate,
+        carry_over=args.carry_over,
+    )
+    server = ConversionServer(
+        AsyncConverter(converter, executor=args.executor, max_jobs=args.workers),
+        max_upload=args.max_upload,
+        max_queue=args.queue,
+        timeout=args.timeout,
+    )
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        print("Stopped.", file=sys.stderr)
+    except OSError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
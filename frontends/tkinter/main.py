@@ -3,7 +3,7 @@
 import logging
 import os
 from pathlib import Path
-from tkinter import Button, Canvas, Entry, Frame, Label, OptionMenu, PhotoImage, StringVar, Tk, Toplevel, filedialog
+from tkinter import Button, Canvas, DoubleVar, Entry, Frame, Label, OptionMenu, PhotoImage, StringVar, Tk, Toplevel, filedialog, ttk
 from xml.etree import ElementTree as ET
 
 from bambu_to_prusa.cloud_storage import detect_cloud_storage_root
@@ -11,6 +11,11 @@ from bambu_to_prusa.converter import BambuToPrusaConverter
 from bambu_to_prusa.settings import SettingsManager
 from bambu_to_prusa.theme_engine import Theme, ThemeEngine
 from frontends.common.helpers import first_existing_dir
+from frontends.common.progress import describe_progress
+from frontends.common.worker import CANCELLED, FAILED, FINISHED, PROGRESS, BackgroundConversion
+
+# How often the Tk main loop drains events posted by the conversion worker.
+POLL_INTERVAL_MS = 50
 
 # Base64-encoded PNG for the Tk window icon so we avoid shipping a binary asset file.
 ICON_IMAGE_BASE64 = (
@@ -126,8 +131,8 @@ class ZipProcessorGUI:
         self.theme = self.theme_engine.palette_for(self.theme_name.get())
 
         master.configure(bg=self.theme["bg"])
-        master.geometry("520x590")
-        master.minsize(500, 540)
+        master.geometry("520x660")
+        master.minsize(500, 600)
         master.option_add("*Font", "Segoe UI 11")
         self.icon_image = None
         self._apply_window_icon()
@@ -220,6 +225,14 @@ class ZipProcessorGUI:
         )
         self.process_button.pack(pady=(10, 4), fill="x")
 
+        self.cancel_button = self._styled_button(
+            self.buttons,
+            text="Cancel",
+            command=self.cancel_conversion,
+        )
+        self.cancel_button.configure(state="disabled")
+        self.cancel_button.pack(pady=(2, 4), fill="x")
+
         self.settings_button = self._styled_button(
             self.buttons,
             text="Settings",
@@ -227,6 +240,17 @@ class ZipProcessorGUI:
         )
         self.settings_button.pack(pady=(2, 8), fill="x")
 
+        self.progress_style = ttk.Style(master)
+        self.progress_var = DoubleVar(value=0.0)
+        self.progress_bar = ttk.Progressbar(
+            self.content,
+            style="Bambu.Horizontal.TProgressbar",
+            variable=self.progress_var,
+            maximum=1.0,
+            mode="determinate",
+        )
+        self.progress_bar.pack(fill="x", pady=(4, 0))
+
         self.status_label = Label(
             self.content,
             text="",
@@ -241,10 +265,13 @@ class ZipProcessorGUI:
         self.output_file = ""
         self.default_output_dir = detect_cloud_storage_root()
         self.converter = BambuToPrusaConverter()
+        self.job = None
+        self._poll_id = None
         self.settings_window = None
         self.input_dir_var = StringVar(value=self.settings.last_input_dir)
         self.output_dir_var = StringVar(value=self.settings.last_output_dir)
         self.apply_theme(self.theme)
+        master.protocol("WM_DELETE_WINDOW", self.close)
 
     def _apply_window_icon(self):
         try:
@@ -352,20 +379,67 @@ class ZipProcessorGUI:
         else:
             self.status_label.config(text="Output selection canceled.", fg=self.theme["warning"])
 
+    def _show_progress(self, update):
+        self.progress_var.set(update.fraction)
+        self.status_label.config(text=describe_progress(update), fg=self.theme["text"])
+
     def bambu3mf2prusa3mf(self):
         logging.debug("Converting Bambu 3mf to Prusa 3mf via GUI")
-        try:
-            if not self.input_file or not self.output_file:
-                self.status_label.config(text="Please provide both input and output files.", fg=self.theme["warning"])
+        if self.job is not None:
+            return
+        if not self.input_file or not self.output_file:
+            self.status_label.config(text="Please provide both input and output files.", fg=self.theme["warning"])
+            return
+        self.progress_var.set(0.0)
+        self.status_label.config(text="Converting...", fg=self.theme["text"])
+        self.process_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.job = BackgroundConversion(self.converter, self.input_file, self.output_file).start()
+        self._poll_id = self.master.after(POLL_INTERVAL_MS, self._poll_job)
+
+    def cancel_conversion(self):
+        if self.job is not None:
+            logging.debug("Cancelling conversion")
+            self.job.cancel()
+            self.cancel_button.configure(state="disabled")
+            self.status_label.config(text="Cancelling...", fg=self.theme["warning"])
+
+    def _poll_job(self):
+        """Apply the worker's events on the Tk thread; reschedule until the job ends."""
+        for kind, payload in self.job.drain():
+            if kind == PROGRESS:
+                self._show_progress(payload)
+            elif kind == FINISHED:
+                self.progress_var.set(1.0)
+                self.status_label.config(
+                    text=f"Output file created: {os.path.basename(self.output_file)}",
+                    fg=self.theme["text"],
+                )
+            elif kind == CANCELLED:
+                self.progress_var.set(0.0)
+                self.status_label.config(text="Conversion canceled.", fg=self.theme["warning"])
+            elif kind == FAILED:
+                logging.error("An error occurred during processing: %s", payload)
+                self.status_label.config(text=f"Error: {payload}", fg="#ff6b6b")
+            if kind != PROGRESS:
+                self._job_done()
                 return
-            self.converter.convert_archive(self.input_file, self.output_file)
-            self.status_label.config(
-                text=f"Output file created: {os.path.basename(self.output_file)}",
-                fg=self.theme["text"],
-            )
-        except Exception as exc:  # pragma: no cover - GUI messaging
-            logging.error("An error occurred during processing: %s", exc)
-            self.status_label.config(text=f"Error: {exc}", fg="#ff6b6b")
+        self._poll_id = self.master.after(POLL_INTERVAL_MS, self._poll_job)
+
+    def _job_done(self):
+        self.job = None
+        self._poll_id = None
+        self.process_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+
+    def close(self):
+        """Cancel a running conversion and wait for it before closing."""
+        if self.job is not None:
+            self.job.cancel()
+            self.job.join()
+        if self._poll_id is not None:
+            self.master.after_cancel(self._poll_id)
+        self.master.destroy()
 
     def _on_theme_selected(self):
         selected_palette = self.theme_engine.palette_for(self.theme_name.get())
@@ -385,11 +459,25 @@ class ZipProcessorGUI:
         self.subtitle.configure(fg=self.theme["muted"], bg=self.theme["panel"])
         self.label.configure(fg=self.theme["text"], bg=self.theme["bg"])
         self.status_label.configure(bg=self.theme["bg"])
+        self.progress_style.configure(
+            "Bambu.Horizontal.TProgressbar",
+            troughcolor=self.theme["panel"],
+            background=self.theme["accent"],
+            bordercolor=self.theme["panel_outline"],
+            lightcolor=self.theme["accent_alt"],
+            darkcolor=self.theme["accent"],
+        )
         self.theme_row.configure(bg=self.theme["bg"])
         self.theme_label.configure(fg=self.theme["text"], bg=self.theme["bg"])
         self._style_option_menu(self.theme_menu)
 
-        for button in (self.select_input_button, self.select_output_button, self.process_button, self.settings_button):
+        for button in (
+            self.select_input_button,
+            self.select_output_button,
+            self.process_button,
+            self.cancel_button,
+            self.settings_button,
+        ):
             primary = getattr(button, "primary", False)
             bg = self.theme["accent"] if primary else self.theme["panel"]
             active_bg = self.theme["accent_alt"] if primary else self.theme["panel_outline"]
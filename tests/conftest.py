@@ -1,7 +1,25 @@
 import sys
+import zipfile
 from pathlib import Path
 
+import pytest
+
 # Ensure repository root is importable when running tests directly
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def sliced_project(tmp_path):
+    """A sliced ``.gcode.3mf`` project: the nested test project plus G-code, a thumbnail and settings."""
+    from test_archive_index import create_nested_project
+
+    archive_path = create_nested_project(tmp_path)
+    with zipfile.ZipFile(archive_path, "a", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("Metadata/plate_1.gcode", "G1 X0 Y0\n" * 10_000)
+        archive.writestr("Metadata/plate_1.gcode.md5", "0" * 32)
+        archive.writestr("Metadata/plate_1.png", b"\x89PNG" + bytes(1000))
+        archive.writestr("Metadata/project_settings.config", "{}")
+        archive.writestr("Auxiliaries/readme.txt", "notes")
+    return archive_path
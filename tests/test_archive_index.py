@@ -0,0 +1,217 @@
+import io
+import zipfile
+
+import lxml.etree as ET
+import pytest
+
+from bambu_to_prusa.archive_index import ArchiveIndex
+from bambu_to_prusa.converter import BambuToPrusaConverter, model_objects
+from bambu_to_prusa.package_builder import write_prusa_model
+from bambu_to_prusa.placement import BuildLayout
+from bambu_to_prusa.template_registry import get_template_registry
+
+from test_converter import BAMBU_CONTENT_TYPES, BAMBU_RELS
+from test_placement import CUBE_MODEL
+
+# Object 3 is an assembly of two placements of object 2, which points into
+# object_1.model; object_2.model is never referenced.
+NESTED_ROOT = """<?xml version="1.0" encoding="UTF-8"?>
+<model unit="millimeter" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+       xmlns:p="http://schemas.microsoft.com/3dmanufacturing/production/2015/06" requiredextensions="p">
+ <resources>
+  <object id="2" type="model">
+   <components>
+    <component p:path="/3D/Objects/object_1.model" objectid="1" transform="1 0 0 0 1 0 0 0 1 0 0 1"/>
+   </components>
+  </object>
+  <object id="3" type="model">
+   <components>
+    <component objectid="2" transform="1 0 0 0 1 0 0 0 1 10 0 0"/>
+    <component objectid="2" transform="1 0 0 0 1 0 0 0 1 20 0 0"/>
+   </components>
+  </object>
+  <object id="4" type="model">
+   <components><component objectid="5"/></components>
+  </object>
+  <object id="5" type="model">
+   <components><component objectid="4"/></components>
+  </object>
+ </resources>
+ <build>
+  <item objectid="3" transform="1 0 0 0 1 0 0 0 1 100 0 0"/>
+  <item objectid="2"/>
+ </build>
+</model>
+"""
+
+
+def create_nested_project(tmp_path, root=NESTED_ROOT):
+    archive_path = tmp_path / "nested.3mf"
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", BAMBU_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", BAMBU_RELS)
+        archive.writestr("3D/3dmodel.model", root)
+        archive.writestr("3D/Objects/object_1.model", CUBE_MODEL)
+        archive.writestr("3D/Objects/object_2.model", CUBE_MODEL)
+    return archive_path
+
+
+def test_index_composes_nested_assemblies(tmp_path):
+    with zipfile.ZipFile(create_nested_project(tmp_path)) as archive:
+        index = ArchiveIndex(archive)
+
+        assert index.model_members == ["3D/Objects/object_1.model", "3D/Objects/object_2.model"]
+        assert index.placements() == {
+            "3D/Objects/object_1.model": {
+                "1": ["1 0 0 0 1 0 0 0 1 110 0 1", "1 0 0 0 1 0 0 0 1 120 0 1", "1 0 0 0 1 0 0 0 1 0 0 1"],
+            }
+        }
+        assert index.members_to_convert() == ["3D/Objects/object_1.model"]
+
+
+def test_index_resolves_each_root_object_once_and_breaks_cycles(tmp_path, monkeypatch, caplog):
+    with zipfile.ZipFile(create_nested_project(tmp_path)) as archive:
+        index = ArchiveIndex(archive)
+        opened = []
+        original = archive.open
+        monkeypatch.setattr(archive, "open", lambda name, *args: opened.append(name) or original(name, *args))
+
+        index.placements()
+        assert index.resolve("4") == []
+        index.placements()
+
+    assert len(opened) == 1
+    assert set(index._resolved) == {"2", "3", "4", "5"}
+    assert "cyclic" in caplog.text
+
+
+def test_root_models_carrying_meshes_are_read_incrementally(tmp_path, monkeypatch):
+    vertices = "".join(f'<vertex x="{index}" y="0" z="0"/>' for index in range(500))
+    mesh = f'<object id="9" type="model"><mesh><vertices>{vertices}</vertices><triangles/></mesh></object>'
+    root = NESTED_ROOT.replace("<resources>", f"<resources>{mesh}", 1)
+    root = root.replace("<build>", '<build><item objectid="9"/>', 1)
+    monkeypatch.setattr(ET, "parse", None)
+
+    with zipfile.ZipFile(create_nested_project(tmp_path, root=root)) as archive:
+        index = ArchiveIndex(archive)
+
+        assert index.resolve("9") == []
+        assert index.placements()["3D/Objects/object_1.model"]["1"] == [
+            "1 0 0 0 1 0 0 0 1 110 0 1",
+            "1 0 0 0 1 0 0 0 1 120 0 1",
+            "1 0 0 0 1 0 0 0 1 0 0 1",
+        ]
+
+
+def test_unreadable_root_model_places_nothing(tmp_path, caplog):
+    with zipfile.ZipFile(create_nested_project(tmp_path, root="")) as archive:
+        index = ArchiveIndex(archive)
+
+        assert index.placements() == {}
+        assert index.members_to_convert() == index.model_members
+    assert "Cannot read 3D/3dmodel.model" in caplog.text
+
+
+def test_archives_without_root_placements_keep_every_member(tmp_path):
+    with zipfile.ZipFile(create_nested_project(tmp_path, root="<model/>")) as archive:
+        index = ArchiveIndex(archive)
+
+        assert index.placements() == {}
+        assert index.members_to_convert() == index.model_members
+
+
+def test_converter_only_converts_reachable_members(tmp_path):
+    output_path = tmp_path / "prusa.3mf"
+
+    BambuToPrusaConverter().convert_archive(str(create_nested_project(tmp_path)), str(output_path))
+
+    with zipfile.ZipFile(output_path) as prusa_zip:
+        assert "3D/Objects/object_1.model" in prusa_zip.namelist()
+        assert "3D/Objects/object_2.model" not in prusa_zip.namelist()
+        model_root = ET.fromstring(prusa_zip.read("3D/Objects/object_1.model"))
+    transforms = [item.get("transform") for item in model_root.iterfind(".//{*}build/{*}item")]
+    assert transforms == ["1 0 0 0 1 0 0 0 1 110 0 1", "1 0 0 0 1 0 0 0 1 120 0 1", "1 0 0 0 1 0 0 0 1 0 0 1"]
+
+
+ASSEMBLY_MODEL = """<?xml version="1.0" encoding="UTF-8"?>
+<model xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">
+ <resources>
+  <object id="1" type="model"><mesh><vertices><vertex x="0" y="0" z="0"/></vertices><triangles/></mesh></object>
+  <object id="2" type="model"><components><component objectid="1" transform="1 0 0 0 1 0 0 0 1 5 0 0"/></components></object>
+ </resources>
+</model>
+"""
+
+
+@pytest.mark.parametrize("memory_budget", [None, 1])
+def test_component_children_get_no_build_item_of_their_own(memory_budget):
+    data = ASSEMBLY_MODEL.encode("utf-8")
+    layout = BuildLayout()
+    stream = io.BytesIO()
+    objects = model_objects(io.BytesIO(data), len(data), memory_budget, layout)
+
+    write_prusa_model(stream, objects, get_template_registry().model_tree(), layout=layout)
+
+    model_root = ET.fromstring(stream.getvalue())
+    assert [element.get("id") for element in model_root.iterfind(".//{*}resources/{*}object")] == ["1", "2"]
+    assert [item.get("objectid") for item in model_root.iterfind(".//{*}build/{*}item")] == ["2"]
+
+
+def test_index_classifies_members_from_the_central_directory(sliced_project, monkeypatch):
+    with zipfile.ZipFile(sliced_project) as archive:
+        monkeypatch.setattr(archive, "open", None)
+        index = ArchiveIndex(archive)
+
+        kinds = {entry.name: entry.kind for entry in index.entries}
+        summary = index.summary()
+
+    assert kinds == {
+        "[Content_Types].xml": "package",
+        "_rels/.rels": "package",
+        "3D/3dmodel.model": "root_model",
+        "3D/Objects/object_1.model": "model",
+        "3D/Objects/object_2.model": "model",
+        "Metadata/plate_1.gcode": "gcode",
+        "Metadata/plate_1.gcode.md5": "gcode",
+        "Metadata/plate_1.png": "thumbnail",
+        "Metadata/project_settings.config": "metadata",
+        "Auxiliaries/readme.txt": "other",
+    }
+    assert list(summary) == ["root_model", "model", "package", "metadata", "thumbnail", "gcode", "other"]
+    assert summary["gcode"]["count"] == 2 and summary["gcode"]["file_size"] == 90_032
+    assert index.names("thumbnail", "metadata") == ["Metadata/plate_1.png", "Metadata/project_settings.config"]
+
+
+def test_preflight_estimates_reads_memory_and_spill(tmp_path, sliced_project):
+    archive_path = sliced_project
+    with zipfile.ZipFile(archive_path) as archive:
+        sizes = {info.filename: info.file_size for info in archive.infolist()}
+    model_size = sizes["3D/Objects/object_1.model"]
+
+    preflight = BambuToPrusaConverter().preflight(str(archive_path), str(tmp_path / "out.3mf"))
+
+    assert preflight.models == 1 and preflight.members == len(sizes)
+    assert preflight.read_bytes == model_size + sizes["3D/3dmodel.model"]
+    assert preflight.read_bytes + preflight.skipped_bytes == sum(sizes.values())
+    assert preflight.peak_memory_bytes == model_size * 40
+    assert preflight.streamed_models == 0 and preflight.temp_bytes == 0
+    assert preflight.free_bytes > 0 and preflight.warnings() == []
+    assert preflight.as_dict()["disk_bytes"] == preflight.output_bytes
+
+    budgeted = BambuToPrusaConverter(max_memory=1024).preflight(str(archive_path))
+    assert budgeted.streamed_models == 1 and budgeted.free_bytes is None
+    assert budgeted.warnings(1024)
+
+
+def test_preflight_accounts_for_parallel_results(tmp_path):
+    archive_path = tmp_path / "multi.3mf"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for index in range(3):
+            archive.writestr(f"3D/Objects/object_{index}.model", CUBE_MODEL)
+    model_bytes = 3 * len(CUBE_MODEL)
+
+    held = BambuToPrusaConverter(workers=2).preflight(str(archive_path))
+    spilled = BambuToPrusaConverter(workers=2, max_memory=1024).preflight(str(archive_path))
+
+    assert held.peak_memory_bytes == 2 * len(CUBE_MODEL) * 40 + model_bytes and held.temp_bytes == 0
+    assert spilled.temp_bytes == model_bytes and spilled.disk_bytes == spilled.output_bytes + model_bytes
@@ -0,0 +1,153 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+import zipfile
+
+import pytest
+
+from bambu_to_prusa.async_converter import AsyncConverter, _SharedFlag
+from bambu_to_prusa.cancellation import CancellationToken, ConversionCancelled
+from bambu_to_prusa.converter import BambuToPrusaConverter
+from test_converter import create_multi_model_archive
+
+
+def _read_all(path):
+    with zipfile.ZipFile(path) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_async_conversion_matches_blocking_output(tmp_path, executor):
+    archive_path = create_multi_model_archive(tmp_path)
+    expected = tmp_path / "expected.3mf"
+    BambuToPrusaConverter().convert_archive(str(archive_path), str(expected))
+    outputs = [tmp_path / f"out{index}.3mf" for index in range(4)]
+
+    async def main():
+        async with AsyncConverter(executor=executor, max_jobs=2) as converter:
+            first = await converter.convert_archive_async(str(archive_path), str(outputs[0]))
+            seen = []
+            jobs = [(str(archive_path), str(output)) for output in outputs[1:]]
+            jobs.append((str(tmp_path / "missing.3mf"), str(tmp_path / "missing_out.3mf")))
+            results = await converter.convert_many_async(jobs, on_result=seen.append)
+            return first, results, seen
+
+    first, results, seen = asyncio.run(main())
+
+    assert first == str(outputs[0])
+    assert [result.ok for result in results] == [True, True, True, False]
+    assert [result.output_file for result in results[:3]] == [str(output) for output in outputs[1:]]
+    assert sorted(result.output_file for result in seen) == sorted(result.output_file for result in results)
+    for output in outputs:
+        assert _read_all(output) == _read_all(expected)
+
+
+def test_semaphore_caps_jobs_in_flight(tmp_path, monkeypatch):
+    archive_path = create_multi_model_archive(tmp_path, count=1)
+    active, peak = 0, 0
+    lock = threading.Lock()
+    convert_archive = BambuToPrusaConverter.convert_archive
+
+    def tracked(self, *args, **kwargs):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        try:
+            return convert_archive(self, *args, **kwargs)
+        finally:
+            with lock:
+                active -= 1
+
+    monkeypatch.setattr(BambuToPrusaConverter, "convert_archive", tracked)
+    jobs = [(str(archive_path), str(tmp_path / f"out{index}.3mf")) for index in range(8)]
+
+    async def main():
+        converter = AsyncConverter(max_jobs=2)
+        task = asyncio.ensure_future(converter.convert_many_async(jobs))
+        await asyncio.sleep(0.01)
+        assert converter.running == 2 and converter.waiting == 6
+        results = await task
+        await converter.aclose()
+        return results
+
+    assert all(result.ok for result in asyncio.run(main()))
+    assert peak == 2
+
+
+def test_task_cancellation_stops_the_worker_and_removes_output(tmp_path, monkeypatch):
+    archive_path = create_multi_model_archive(tmp_path)
+    output = tmp_path / "out.3mf"
+    started, stopped = threading.Event(), threading.Event()
+
+    def stalled(self, input_file, zip_in, members, zip_out, tracker=None, cancel=None, transforms=None):
+        started.set()
+        try:
+            while True:
+                cancel.check()
+                time.sleep(0.01)
+        finally:
+            stopped.set()
+
+    monkeypatch.setattr(BambuToPrusaConverter, "_write_models", stalled)
+
+    async def main():
+        converter = AsyncConverter(max_jobs=1)
+        task = asyncio.ensure_future(converter.convert_archive_async(str(archive_path), str(output)))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The worker stopped before the cancellation propagated, freeing its slot.
+        assert stopped.is_set() and converter.running == 0
+        await converter.aclose()
+
+    asyncio.run(main())
+    assert not output.exists()
+
+
+def test_progress_is_delivered_on_the_event_loop(tmp_path):
+    archive_path = create_multi_model_archive(tmp_path)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        threads = set()
+
+        def progress(update):
+            threads.add(threading.get_ident())
+
+        async with AsyncConverter(BambuToPrusaConverter(progress_interval=0.0)) as converter:
+            await converter.convert_archive_async(str(archive_path), str(tmp_path / "out.3mf"), progress)
+        await asyncio.sleep(0)
+        return threads, loop_thread
+
+    threads, loop_thread = asyncio.run(main())
+    assert threads == {loop_thread}
+
+
+def test_shared_flag_cancels_a_token():
+    flags = multiprocessing.RawArray("b", 2)
+    token = CancellationToken(event=_SharedFlag(flags, 1))
+    token.check()
+    assert not token.wait(0.01)
+
+    _SharedFlag(flags, 1).set()
+    assert token.wait(0.01) and not _SharedFlag(flags, 0).is_set()
+    with pytest.raises(ConversionCancelled):
+        token.check()
+
+
+def test_async_converter_rejects_bad_settings():
+    with pytest.raises(ValueError):
+        AsyncConverter(executor="fiber")
+    with pytest.raises(ValueError):
+        AsyncConverter(max_jobs=0)
+
+    async def main():
+        await AsyncConverter(executor="process").convert_archive_async("in.3mf", "out.3mf", progress=print)
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
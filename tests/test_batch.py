@@ -0,0 +1,92 @@
+import zipfile
+from pathlib import Path
+
+from bambu_to_prusa.batch import collect_batch_jobs
+from bambu_to_prusa.converter import BambuToPrusaConverter
+
+from test_converter import BAMBU_MODEL_XML
+
+
+def write_archive(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("3D/Objects/object_1.model", BAMBU_MODEL_XML)
+    return path
+
+
+def test_collect_batch_jobs_mirrors_directory_tree(tmp_path):
+    source = tmp_path / "in"
+    write_archive(source / "a.3mf")
+    write_archive(source / "nested" / "b.3mf")
+    write_archive(source / "nested" / "C.3MF")
+    (source / "notes.txt").write_text("ignored", encoding="utf-8")
+
+    jobs = collect_batch_jobs([source], tmp_path / "out")
+
+    assert jobs == [
+        (str(source / "a.3mf"), str(tmp_path / "out" / "a.3mf")),
+        (str(source / "nested" / "C.3MF"), str(tmp_path / "out" / "nested" / "C.3MF")),
+        (str(source / "nested" / "b.3mf"), str(tmp_path / "out" / "nested" / "b.3mf")),
+    ]
+
+
+def test_collect_batch_jobs_expands_globs_and_skips_duplicates(tmp_path):
+    source = tmp_path / "in"
+    first = write_archive(source / "x" / "first.3mf")
+
+    jobs = collect_batch_jobs([f"{source}/**/*.3mf", first], tmp_path / "out")
+
+    assert jobs == [(str(first), str(tmp_path / "out" / "x" / "first.3mf"))]
+
+
+def test_collect_batch_jobs_never_shares_an_output(tmp_path):
+    first = write_archive(tmp_path / "a" / "plate.3mf")
+    second = write_archive(tmp_path / "b" / "plate.3mf")
+    third = write_archive(tmp_path / "c" / "plate.3mf")
+
+    jobs = collect_batch_jobs([first, second, third], tmp_path / "out")
+
+    assert jobs == [
+        (str(first), str(tmp_path / "out" / "plate.3mf")),
+        (str(second), str(tmp_path / "out" / "plate-2.3mf")),
+        (str(third), str(tmp_path / "out" / "plate-3.3mf")),
+    ]
+
+
+def test_convert_many_reports_each_file(tmp_path):
+    good = write_archive(tmp_path / "in" / "good.3mf")
+    bad = tmp_path / "in" / "bad.3mf"
+    with zipfile.ZipFile(bad, "w") as archive:
+        archive.writestr("readme.txt", "no models")
+
+    jobs = collect_batch_jobs([tmp_path / "in"], tmp_path / "out")
+    seen = []
+    results = BambuToPrusaConverter().convert_many(jobs, max_jobs=2, on_result=seen.append)
+
+    assert [Path(result.input_file).name for result in results] == ["bad.3mf", "good.3mf"]
+    assert len(seen) == 2
+    assert not results[0].ok and "No .model files" in results[0].error
+    assert results[1].ok and results[1].duration >= 0
+    assert (tmp_path / "out" / "good.3mf").exists()
+    assert not (tmp_path / "out" / "bad.3mf").exists()
+    assert good.exists()
+
+
+def test_parallel_batches_count_deduplicated_objects(tmp_path):
+    start = BAMBU_MODEL_XML.index('<object id="1"')
+    first = BAMBU_MODEL_XML[start : BAMBU_MODEL_XML.index("</object>", start) + len("</object>")]
+    copies = BAMBU_MODEL_XML.replace('<object id="2" type="support" />', first.replace('id="1"', 'id="2"'))
+    for name in ("a", "b", "c"):
+        path = tmp_path / "in" / f"{name}.3mf"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("3D/Objects/object_1.model", copies)
+
+    totals = []
+    for max_jobs in (1, 2):
+        converter = BambuToPrusaConverter()
+        results = converter.convert_many(collect_batch_jobs([tmp_path / "in"], tmp_path / f"out{max_jobs}"), max_jobs)
+        assert [result.dedup.duplicates for result in results] == [1, 1, 1]
+        totals.append(converter.dedup_stats.as_dict())
+
+    assert totals[0] == totals[1] and totals[1]["duplicates"] == 3 and totals[1]["bytes_saved"] > 0
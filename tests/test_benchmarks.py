@@ -0,0 +1,62 @@
+"""Smoke tests for the synthetic archive generator and benchmark runner."""
+
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+import lxml.etree as ET
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent.parent / "benchmarks"
+if str(BENCHMARKS_DIR) not in sys.path:
+    sys.path.insert(0, str(BENCHMARKS_DIR))
+
+from synthetic import PAINT_VALUES, SyntheticSpec, write_synthetic_archive  # noqa: E402
+
+from bambu_to_prusa.converter import BambuToPrusaConverter  # noqa: E402
+from bambu_to_prusa.paint import PaintTranscoder  # noqa: E402
+
+
+def test_synthetic_paint_values_decode_without_warnings(caplog):
+    transcoder = PaintTranscoder(strict=True)
+
+    assert [transcoder.transcode(value) for value in PAINT_VALUES] == list(PAINT_VALUES)
+    assert transcoder.invalid_codes == 0 and not caplog.records
+
+
+def test_synthetic_archive_matches_spec(tmp_path):
+    spec = SyntheticSpec(vertices_per_object=100, objects_per_model=2, model_files=3, paint_density=1.0, thumbnails=2)
+    archive = write_synthetic_archive(tmp_path / "synthetic.3mf", spec)
+
+    with zipfile.ZipFile(archive) as zip_in:
+        names = zip_in.namelist()
+        models = [name for name in names if name.startswith("3D/Objects/")]
+        assert len(models) == 3
+        assert sum(name.endswith(".png") for name in names) == 2
+
+        root = ET.fromstring(zip_in.read(models[0]))
+        objects = root.findall("{*}resources/{*}object")
+        assert len(objects) == 2
+        triangles = objects[0].findall(".//{*}triangle")
+        assert len(triangles) == spec.triangles_per_object
+        assert all("paint_color" in triangle.attrib for triangle in triangles)
+
+    output = tmp_path / "converted.3mf"
+    BambuToPrusaConverter().convert_archive(str(archive), str(output))
+    with zipfile.ZipFile(output) as zip_out:
+        assert sum(name.startswith("3D/Objects/") for name in zip_out.namelist()) == 3
+
+
+def test_benchmark_runner_writes_json_report(tmp_path, monkeypatch):
+    import bench_converter
+
+    monkeypatch.setitem(bench_converter.CASES, "tiny", SyntheticSpec(vertices_per_object=16, thumbnails=0))
+    report_path = tmp_path / "report.json"
+
+    assert bench_converter.main(["--cases", "tiny", "--repeat", "1", "--output", str(report_path)]) == 0
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    (case,) = report["cases"]
+    assert case["name"] == "tiny"
+    assert set(case["stages"]) == set(bench_converter.STAGES)
+    assert case["convert_archive_wall_s"] > 0
@@ -0,0 +1,110 @@
+import time
+import zipfile
+
+import lxml.etree as ET
+import pytest
+
+from bambu_to_prusa.cancellation import CancellationToken, ConversionCancelled, ConversionTimeout
+from bambu_to_prusa.converter import BambuToPrusaConverter
+from test_converter import BAMBU_MODEL_XML, create_multi_model_archive
+
+
+def test_token_cancel_and_deadline():
+    token = CancellationToken()
+    token.check()
+    assert token.remaining() is None
+
+    token.cancel()
+    with pytest.raises(ConversionCancelled):
+        token.check()
+
+    expired = CancellationToken(timeout=0)
+    assert expired.expired
+    with pytest.raises(ConversionTimeout):
+        expired.check()
+    assert CancellationToken(deadline=time.monotonic() + 60).remaining() > 0
+
+
+def test_cancel_before_start_leaves_no_output(tmp_path):
+    token = CancellationToken()
+    token.cancel()
+    output = tmp_path / "out.3mf"
+
+    with pytest.raises(ConversionCancelled):
+        BambuToPrusaConverter().convert_archive(str(create_multi_model_archive(tmp_path)), str(output), cancel=token)
+
+    assert not output.exists()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cancel_mid_conversion_removes_partial_output(tmp_path, workers):
+    archive_path = create_multi_model_archive(tmp_path)
+    output = tmp_path / "out.3mf"
+    token = CancellationToken()
+
+    def cancel_after_first_model(update):
+        if update.models_done == 1:
+            token.cancel()
+
+    converter = BambuToPrusaConverter(workers=workers, progress_interval=0.0)
+    with pytest.raises(ConversionCancelled):
+        converter.convert_archive(str(archive_path), str(output), progress=cancel_after_first_model, cancel=token)
+
+    assert not output.exists()
+
+
+def test_deadline_aborts_conversion(tmp_path):
+    output = tmp_path / "out.3mf"
+
+    with pytest.raises(ConversionTimeout):
+        BambuToPrusaConverter().convert_archive(
+            str(create_multi_model_archive(tmp_path)), str(output), cancel=CancellationToken(timeout=0)
+        )
+
+    assert not output.exists()
+
+
+@pytest.mark.parametrize("max_jobs", [1, 2])
+def test_cancelled_batch_reports_every_job(tmp_path, max_jobs):
+    archive_path = create_multi_model_archive(tmp_path)
+    jobs = [(str(archive_path), str(tmp_path / f"out{index}.3mf")) for index in range(3)]
+    token = CancellationToken()
+    token.cancel()
+
+    results = BambuToPrusaConverter().convert_many(jobs, max_jobs=max_jobs, cancel=token)
+
+    assert [result.ok for result in results] == [False, False, False]
+    assert all("cancelled" in result.error for result in results)
+    assert not any((tmp_path / f"out{index}.3mf").exists() for index in range(3))
+
+
+def _archive_with_objects(path, prefix, count):
+    start = BAMBU_MODEL_XML.index('<object id="1"')
+    template = BAMBU_MODEL_XML[start : BAMBU_MODEL_XML.index("</object>", start) + len("</object>")]
+    objects = "".join(
+        template.replace('id="1"', f'id="{prefix}{index}"').replace('x="1"', f'x="{index + 1}"')
+        for index in range(count)
+    )
+    model = BAMBU_MODEL_XML.replace(template, objects).replace('<object id="2" type="support" />', "")
+    model = model[: model.index("<build>")] + "<build /></model>"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("3D/Objects/object_1.model", model)
+    return path
+
+
+def test_cancelled_conversion_does_not_leak_objects_into_the_next(tmp_path):
+    first = _archive_with_objects(tmp_path / "a.3mf", "A", 5)
+    second = _archive_with_objects(tmp_path / "b.3mf", "B", 2)
+    converter = BambuToPrusaConverter(progress_interval=0.0)
+
+    def cancel_after_first_triangle(update):
+        if update.triangles:
+            raise ConversionCancelled("stop")
+
+    with pytest.raises(ConversionCancelled):
+        converter.convert_archive(str(first), str(tmp_path / "a_out.3mf"), progress=cancel_after_first_triangle)
+    converter.convert_archive(str(second), str(tmp_path / "b_out.3mf"))
+
+    with zipfile.ZipFile(tmp_path / "b_out.3mf") as prusa_zip:
+        model = ET.fromstring(prusa_zip.read("3D/Objects/object_1.model"))
+    assert [element.get("id") for element in model.iterfind(".//{*}resources/{*}object")] == ["B0", "B1"]
@@ -95,7 +95,157 @@ def test_cli_successful_conversion(tmp_path, capsys):
                 main()
             assert exc_info.value.code == 0
         
-        mock_instance.convert_archive.assert_called_once_with(str(input_file), str(output_file))
+        mock_instance.convert_archive.assert_called_once_with(
+            str(input_file), str(output_file), progress=None, cancel=None
+        )
     
     captured = capsys.readouterr()
     assert 'Success' in captured.out
+
+
+def test_cli_batch_converts_directory(tmp_path, capsys):
+    """Test the batch subcommand mirrors a directory into the output tree."""
+    from frontends.cli.main import main
+    from test_batch import write_archive
+
+    write_archive(tmp_path / "in" / "nested" / "part.3mf")
+    output_dir = tmp_path / "out"
+
+    with patch.object(sys, 'argv', ['bambu2prusa-cli', 'batch', str(tmp_path / "in"), '-o', str(output_dir)]):
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 0
+
+    assert (output_dir / "nested" / "part.3mf").exists()
+    captured = capsys.readouterr()
+    assert 'OK' in captured.out
+    assert 'Converted 1/1' in captured.out
+
+
+def test_cli_batch_without_matches(tmp_path, capsys):
+    """Test the batch subcommand fails when nothing matches."""
+    from frontends.cli.main import main
+
+    with patch.object(sys, 'argv', ['bambu2prusa-cli', 'batch', str(tmp_path / "*.3mf"), '-o', str(tmp_path)]):
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 1
+
+    captured = capsys.readouterr()
+    assert 'No .3mf files matched' in captured.err
+
+
+def test_cli_stats_json_report(tmp_path, capsys):
+    """Test --stats json prints a stage report on stdout."""
+    import json
+
+    from frontends.cli.main import main
+    from test_converter import create_valid_bambu_archive
+
+    input_file = create_valid_bambu_archive(tmp_path)
+    output_file = tmp_path / "output.3mf"
+
+    with patch.object(sys, 'argv', ['bambu2prusa-cli', str(input_file), str(output_file), '--stats', 'json']):
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 0
+
+    captured = capsys.readouterr()
+    report = json.loads(captured.out)
+    assert "convert_archive" in report["totals"]
+    assert 'Success' in captured.err
+
+
+def test_cli_progress_bar(tmp_path, capsys):
+    """Test --progress draws a bar on stderr that ends complete."""
+    from frontends.cli.main import main
+    from test_converter import create_valid_bambu_archive
+
+    input_file = create_valid_bambu_archive(tmp_path)
+    output_file = tmp_path / "output.3mf"
+
+    with patch.object(sys, 'argv', ['bambu2prusa-cli', str(input_file), str(output_file), '--progress']):
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 0
+
+    captured = capsys.readouterr()
+    assert '[' + '#' * 30 + '] Done in' in captured.err
+
+
+def test_cli_parse_size():
+    """Test --max-memory sizes accept unit suffixes and default to megabytes."""
+    import argparse
+
+    from frontends.common.options import parse_size
+
+    assert parse_size("512M") == 512 * 1024**2
+    assert parse_size("2g") == 2 * 1024**3
+    assert parse_size("1.5GB") == int(1.5 * 1024**3)
+    assert parse_size("64") == 64 * 1024**2
+    for invalid in ("lots", "0", "-1M"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_size(invalid)
+
+
+def test_cli_parse_bed_size():
+    """Test --bed-size parses WIDTHxDEPTH in millimetres."""
+    import argparse
+
+    from frontends.common.options import parse_bed_size
+
+    assert parse_bed_size("250x210") == (250.0, 210.0)
+    assert parse_bed_size("180.5X180") == (180.5, 180.0)
+    for invalid in ("250", "0x210", "axb"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_bed_size(invalid)
+
+
+def test_cli_parse_extruder_map():
+    """Test --extruder-map parses FROM=TO pairs."""
+    import argparse
+
+    from frontends.common.options import parse_extruder_map
+
+    assert parse_extruder_map("1=2,2=1") == {1: 2, 2: 1}
+    assert parse_extruder_map("3=1") == {3: 1}
+    for invalid in ("1", "a=b", "1=-2"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_extruder_map(invalid)
+
+
+def test_cli_parse_carry_over():
+    """Test --carry-over parses member kinds and 'none'."""
+    import argparse
+
+    from frontends.common.options import parse_carry_over
+
+    assert parse_carry_over("thumbnail, metadata") == ("thumbnail", "metadata")
+    assert parse_carry_over("None") == ()
+    for invalid in ("", "model", "thumbnail,bogus"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_carry_over(invalid)
+
+
+def test_cli_inspect_reports_and_extracts(tmp_path, capsys, sliced_project):
+    """Test the inspect subcommand prints the preflight estimate and extracts selected kinds."""
+    import json
+
+    from frontends.cli.main import main
+
+    archive_path = sliced_project
+    with patch.object(sys, 'argv', ['bambu2prusa-cli', 'inspect', str(archive_path), '--json']):
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["models"] == 1 and report["kinds"]["gcode"]["count"] == 2
+
+    extract_dir = tmp_path / "extracted"
+    argv = ['bambu2prusa-cli', 'inspect', str(archive_path), '--extract', str(extract_dir), '--kind', 'thumbnail']
+    with patch.object(sys, 'argv', argv):
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 0
+    assert [path.name for path in extract_dir.rglob("*") if path.is_file()] == ["plate_1.png"]
+    assert "Conversion reads" in capsys.readouterr().out
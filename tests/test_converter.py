@@ -1,10 +1,12 @@
 import os
+import time
 import zipfile
 
 import lxml.etree as ET
+import pytest
 
 from bambu_to_prusa.converter import BambuToPrusaConverter
-from bambu_to_prusa.model_processing import DEFAULT_TRANSFORM, MODEL_NAMESPACE, SLIC3R_NAMESPACE
+from bambu_to_prusa.model_processing import MODEL_NAMESPACE, SLIC3R_NAMESPACE
 
 SAMPLE_XML = """<?xml version='1.0' encoding='UTF-16'?>
 <model xmlns="http://example.com" p:UUID="123" paint_color="abc" paint_seam="EDGE">
@@ -146,8 +148,235 @@ def test_end_to_end_bambu_to_prusa_conversion(tmp_path):
 
         build_items = model_root.findall(".//{*}build/{*}item")
         assert len(build_items) == 1
-        assert build_items[0].attrib["transform"] == DEFAULT_TRANSFORM
+        # The source build item's transform is carried over.
+        assert build_items[0].attrib["transform"] == "1 0 0 0 1 0 0 0 1 0 0 0"
 
         content = prusa_zip.read("3D/Objects/bambu.model").decode("utf-8")
         assert "paint_color" not in content
         assert "paint_seam" not in content
+
+
+def test_convert_archive_does_not_stage_on_disk(tmp_path, monkeypatch):
+    bambu_archive = create_valid_bambu_archive(tmp_path)
+    output_path = tmp_path / "prusa.3mf"
+
+    def fail_mkdtemp(*args, **kwargs):
+        raise AssertionError("conversion must not create temporary directories")
+
+    monkeypatch.setattr("tempfile.mkdtemp", fail_mkdtemp)
+
+    BambuToPrusaConverter().convert_archive(str(bambu_archive), str(output_path))
+
+    with zipfile.ZipFile(output_path, "r") as prusa_zip:
+        assert "3D/Objects/bambu.model" in prusa_zip.namelist()
+
+
+def test_convert_archive_removes_partial_output_on_failure(tmp_path, monkeypatch):
+    bambu_archive = create_valid_bambu_archive(tmp_path)
+    output_path = tmp_path / "prusa.3mf"
+
+    def broken_build(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("bambu_to_prusa.converter.iter_model_objects", broken_build)
+
+    with pytest.raises(RuntimeError):
+        BambuToPrusaConverter().convert_archive(str(bambu_archive), str(output_path))
+
+    assert not output_path.exists()
+
+
+def create_multi_model_archive(tmp_path, count=3):
+    archive_path = tmp_path / "multi.3mf"
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for index in range(count):
+            archive.writestr(f"3D/Objects/object_{index}.model", BAMBU_MODEL_XML)
+    return archive_path
+
+
+def test_parallel_conversion_matches_serial_output(tmp_path):
+    archive_path = create_multi_model_archive(tmp_path)
+    serial_path = tmp_path / "serial.3mf"
+    parallel_path = tmp_path / "parallel.3mf"
+
+    BambuToPrusaConverter().convert_archive(str(archive_path), str(serial_path))
+    BambuToPrusaConverter(workers=2).convert_archive(str(archive_path), str(parallel_path))
+
+    with zipfile.ZipFile(serial_path) as serial_zip, zipfile.ZipFile(parallel_path) as parallel_zip:
+        assert serial_zip.namelist() == parallel_zip.namelist()
+        for name in serial_zip.namelist():
+            assert serial_zip.read(name) == parallel_zip.read(name)
+
+
+def test_converter_rejects_invalid_worker_count():
+    with pytest.raises(ValueError):
+        BambuToPrusaConverter(workers=0)
+
+
+def test_store_compression_leaves_members_uncompressed(tmp_path):
+    bambu_archive = create_valid_bambu_archive(tmp_path)
+    output_path = tmp_path / "stored.3mf"
+
+    BambuToPrusaConverter(compression="store").convert_archive(str(bambu_archive), str(output_path))
+
+    with zipfile.ZipFile(output_path, "r") as prusa_zip:
+        assert {info.compress_type for info in prusa_zip.infolist()} == {zipfile.ZIP_STORED}
+        assert prusa_zip.testzip() is None
+
+
+def _model_members(archive_path):
+    blank = ET.XMLParser(remove_blank_text=True)
+    with zipfile.ZipFile(archive_path) as archive:
+        return {
+            name: ET.tostring(ET.fromstring(archive.read(name), blank), method="c14n")
+            for name in archive.namelist()
+            if name.endswith(".model")
+        }
+
+
+def test_memory_budget_streams_elements_with_equivalent_output(tmp_path, monkeypatch):
+    from bambu_to_prusa import converter as converter_module
+
+    archive_path = create_valid_bambu_archive(tmp_path)
+    default_path = tmp_path / "default.3mf"
+    budget_path = tmp_path / "budget.3mf"
+    streamed = []
+    original = converter_module.iter_streamed_objects
+    monkeypatch.setattr(converter_module, "iter_streamed_objects", lambda *args: streamed.append(1) or original(*args))
+
+    BambuToPrusaConverter().convert_archive(str(archive_path), str(default_path))
+    assert not streamed
+    BambuToPrusaConverter(max_memory=1024).convert_archive(str(archive_path), str(budget_path))
+    assert streamed
+
+    assert _model_members(budget_path) == _model_members(default_path)
+
+
+def test_memory_budget_spills_parallel_results_to_disk(tmp_path, monkeypatch):
+    from bambu_to_prusa import converter as converter_module
+
+    archive_path = create_multi_model_archive(tmp_path)
+    serial_path = tmp_path / "serial.3mf"
+    parallel_path = tmp_path / "parallel.3mf"
+    spill_dirs = []
+    original = converter_module.create_temp_dir
+    monkeypatch.setattr(converter_module, "create_temp_dir", lambda: spill_dirs.append(original()) or spill_dirs[-1])
+
+    BambuToPrusaConverter(max_memory=1024).convert_archive(str(archive_path), str(serial_path))
+    BambuToPrusaConverter(workers=2, max_memory=1024).convert_archive(str(archive_path), str(parallel_path))
+
+    assert len(spill_dirs) == 1 and not os.path.exists(spill_dirs[0])
+    assert _model_members(parallel_path) == _model_members(serial_path)
+
+
+def test_aborted_parallel_spill_keeps_the_original_error(tmp_path, monkeypatch):
+    import shutil
+
+    from bambu_to_prusa import converter as converter_module
+
+    archive_path = create_multi_model_archive(tmp_path)
+    spill_dirs = []
+    original = converter_module.create_temp_dir
+    monkeypatch.setattr(converter_module, "create_temp_dir", lambda: spill_dirs.append(original()) or spill_dirs[-1])
+    rmtree = shutil.rmtree
+
+    def busy_rmtree(path, ignore_errors=False, **kwargs):
+        # Running workers may add files while the directory is removed.
+        if not ignore_errors:
+            raise OSError(39, "Directory not empty", path)
+        return rmtree(path, ignore_errors=ignore_errors, **kwargs)
+
+    def failing_copy(*args):
+        raise ValueError("output disk full")
+
+    monkeypatch.setattr(shutil, "rmtree", busy_rmtree)
+    monkeypatch.setattr(converter_module, "copy_model_member", failing_copy)
+
+    with pytest.raises(ValueError, match="output disk full"):
+        BambuToPrusaConverter(workers=2, max_memory=1024).convert_archive(
+            str(archive_path), str(tmp_path / "out.3mf")
+        )
+    deadline = time.monotonic() + 10
+    while os.path.exists(spill_dirs[0]) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not os.path.exists(spill_dirs[0])
+
+
+def test_memory_budget_is_part_of_the_cache_options():
+    assert "memory_budget" not in BambuToPrusaConverter().output_options()
+    assert BambuToPrusaConverter(workers=2, max_memory=1024).output_options()["memory_budget"] == 512
+    with pytest.raises(ValueError):
+        BambuToPrusaConverter(max_memory=0)
+
+
+def test_identical_meshes_are_instanced_in_serial_and_parallel(tmp_path):
+    start = BAMBU_MODEL_XML.index('<object id="1"')
+    first = BAMBU_MODEL_XML[start : BAMBU_MODEL_XML.index("</object>", start) + len("</object>")]
+    copies = BAMBU_MODEL_XML.replace('<object id="2" type="support" />', first.replace('id="1"', 'id="2"'))
+    archive_path = tmp_path / "copies.3mf"
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for index in range(2):
+            archive.writestr(f"3D/Objects/object_{index}.model", copies)
+
+    for workers in (1, 2):
+        output_path = tmp_path / f"out_{workers}.3mf"
+        converter = BambuToPrusaConverter(workers=workers)
+        converter.convert_archive(str(archive_path), str(output_path))
+
+        assert converter.dedup_stats.objects == 4 and converter.dedup_stats.duplicates == 2
+        assert converter.dedup_stats.bytes_saved > 0
+        with zipfile.ZipFile(output_path) as prusa_zip:
+            model_root = ET.fromstring(prusa_zip.read("3D/Objects/object_0.model"))
+        assert [element.get("id") for element in model_root.iterfind(".//{*}resources/{*}object")] == ["1"]
+        assert [item.get("objectid") for item in model_root.iterfind(".//{*}build/{*}item")] == ["1", "1"]
+
+    output_path = tmp_path / "plain.3mf"
+    BambuToPrusaConverter(deduplicate=False).convert_archive(str(archive_path), str(output_path))
+    with zipfile.ZipFile(output_path) as prusa_zip:
+        model_root = ET.fromstring(prusa_zip.read("3D/Objects/object_0.model"))
+    assert len(model_root.findall(".//{*}resources/{*}object")) == 2
+
+
+def create_archive_with_thumbnails(tmp_path):
+    archive_path = tmp_path / "thumbnails.3mf"
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("3D/Objects/bambu.model", BAMBU_MODEL_XML)
+        archive.writestr("Metadata/plate_1.png", os.urandom(512) + bytes(8192))
+        archive.writestr("Metadata/model_settings.config", "<config />")
+        archive.writestr("Metadata/plate_1.gcode", "G28\n" * 1000)
+    return archive_path
+
+
+def test_thumbnails_are_carried_over_without_recompression(tmp_path):
+    archive_path = create_archive_with_thumbnails(tmp_path)
+    output_path = tmp_path / "out.3mf"
+
+    BambuToPrusaConverter(compression="small").convert_archive(str(archive_path), str(output_path))
+
+    with zipfile.ZipFile(archive_path) as bambu_zip, zipfile.ZipFile(output_path) as prusa_zip:
+        assert prusa_zip.testzip() is None
+        names = set(prusa_zip.namelist())
+        assert "Metadata/plate_1.png" in names
+        assert not {"Metadata/model_settings.config", "Metadata/plate_1.gcode"} & names
+        original, copy = bambu_zip.getinfo("Metadata/plate_1.png"), prusa_zip.getinfo("Metadata/plate_1.png")
+        assert (copy.CRC, copy.compress_size) == (original.CRC, original.compress_size)
+
+
+def test_carry_over_kinds_are_configurable(tmp_path):
+    archive_path = create_archive_with_thumbnails(tmp_path)
+
+    output_path = tmp_path / "none.3mf"
+    BambuToPrusaConverter(carry_over=()).convert_archive(str(archive_path), str(output_path))
+    with zipfile.ZipFile(output_path) as prusa_zip:
+        assert not any(name.startswith("Metadata/") for name in prusa_zip.namelist())
+
+    output_path = tmp_path / "stored.3mf"
+    BambuToPrusaConverter(compression="store", carry_over=("thumbnail", "gcode")).convert_archive(
+        str(archive_path), str(output_path)
+    )
+    with zipfile.ZipFile(output_path) as prusa_zip:
+        assert {info.compress_type for info in prusa_zip.infolist()} == {zipfile.ZIP_STORED}
+        assert prusa_zip.read("Metadata/plate_1.gcode") == b"G28\n" * 1000
+
+    with pytest.raises(ValueError):
+        BambuToPrusaConverter(carry_over=("model",))
@@ -0,0 +1,93 @@
+import io
+
+import lxml.etree as ET
+
+from bambu_to_prusa.dedup import DedupStats, MeshDeduplicator, payload_key
+from bambu_to_prusa.model_processing import DEFAULT_TRANSFORM, iter_model_objects
+from bambu_to_prusa.package_builder import write_prusa_model
+from bambu_to_prusa.placement import BuildLayout
+from bambu_to_prusa.template_registry import get_template_registry
+
+MESH = """<mesh>
+        <vertices><vertex x="0" y="0" z="0" /><vertex x="1" y="0" z="0" /><vertex x="0" y="1" z="0" /></vertices>
+        <triangles><triangle v1="0" v2="1" v3="2" paint_color="{paint}" /></triangles>
+      </mesh>"""
+
+COPIES_XML = f"""<?xml version="1.0" encoding="UTF-8"?>
+<model xmlns="http://www.bambulab.com/schemas/3mf/2023">
+  <resources>
+    <object id="1" name="part" type="model">{MESH.format(paint="4")}</object>
+    <object id="2" name="part copy" type="model">{MESH.format(paint="4")}</object>
+    <object id="3" type="model">{MESH.format(paint="8")}</object>
+    <object id="4" type="model" pid="2" pindex="0">{MESH.format(paint="4")}</object>
+    <object id="5" type="model">{MESH.format(paint="4")}</object>
+    <object id="6" type="model"><components><component objectid="2" /></components></object>
+  </resources>
+  <build>
+    <item objectid="1" transform="1 0 0 0 1 0 0 0 1 10 0 0" />
+    <item objectid="2" transform="1 0 0 0 1 0 0 0 1 20 0 0" />
+    <item objectid="3" />
+    <item objectid="4" />
+    <item objectid="5" transform="1 0 0 0 1 0 0 0 1 30 0 0" />
+    <item objectid="5" transform="1 0 0 0 1 0 0 0 1 40 0 0" />
+  </build>
+</model>
+"""
+
+
+def _objects():
+    return dict(iter_model_objects(COPIES_XML.encode("utf-8")))
+
+
+def test_payload_key_ignores_identity_but_not_paint_or_material():
+    objects = _objects()
+    keys = {object_id: payload_key(element) for object_id, element in objects.items()}
+
+    assert keys["1"] == keys["2"] == keys["5"]
+    assert keys["3"] != keys["1"]
+    assert keys["4"] != keys["1"]
+    assert keys["6"] is None
+
+
+def test_deduplicator_keeps_the_first_copy_and_counts_savings():
+    dedup = MeshDeduplicator()
+    objects = _objects()
+
+    originals = {object_id: dedup.check(object_id, element) for object_id, element in objects.items()}
+
+    assert originals == {"1": None, "2": "1", "3": None, "4": None, "5": "1", "6": None}
+    assert objects["6"].find("{*}components/{*}component").get("objectid") == "1"
+    assert dedup.target("5") == "1" and dedup.target("3") == "3"
+    assert dedup.stats.objects == 6 and dedup.stats.duplicates == 2
+    assert dedup.stats.bytes_saved == sum(len(ET.tostring(objects[i], with_tail=False)) for i in ("2", "5"))
+
+
+def test_write_prusa_model_instances_duplicates_with_their_transforms():
+    layout = BuildLayout()
+    dedup = MeshDeduplicator()
+    stream = io.BytesIO()
+
+    written = write_prusa_model(
+        stream,
+        iter_model_objects(COPIES_XML.encode("utf-8"), layout.local_transforms),
+        get_template_registry().model_tree(),
+        layout=layout,
+        dedup=dedup,
+    )
+
+    assert written == ["1", "3", "4", "6"]
+    root = ET.fromstring(stream.getvalue())
+    assert [element.get("id") for element in root.iterfind("{*}resources/{*}object")] == written
+    items = [(item.get("objectid"), item.get("transform")) for item in root.iterfind("{*}build/{*}item")]
+    assert [(object_id, transform.split()[9]) for object_id, transform in items[:6]] == [
+        ("1", "10"), ("1", "20"), ("3", "0"), ("4", "0"), ("1", "30"), ("1", "40"),
+    ]
+    assert items[6] == ("6", DEFAULT_TRANSFORM)
+
+
+def test_dedup_stats_add():
+    total = DedupStats()
+    total.add(DedupStats(objects=3, duplicates=2, bytes_saved=100))
+    total.add(DedupStats(objects=1))
+
+    assert total.as_dict() == {"objects": 4, "duplicates": 2, "bytes_saved": 100}
@@ -0,0 +1,135 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from bambu_to_prusa import file_ops
+from bambu_to_prusa.file_ops import CompressionPolicy, ParallelDeflater, open_zip_member, write_zip_member
+
+
+def test_presets_map_to_methods_and_levels():
+    assert CompressionPolicy.from_preset("store") == CompressionPolicy(zipfile.ZIP_STORED, None)
+    assert CompressionPolicy.from_preset("fast").level == 1
+    assert CompressionPolicy.from_preset("small", level=7, threads=4) == CompressionPolicy(zipfile.ZIP_DEFLATED, 7, 4)
+    with pytest.raises(ValueError):
+        CompressionPolicy.from_preset("tiny")
+    with pytest.raises(ValueError):
+        CompressionPolicy(level=12)
+
+
+def test_parallel_deflater_output_is_one_deflate_stream():
+    payload = os.urandom(50_000) + b"vertex " * 200_000
+    deflater = ParallelDeflater(level=6, threads=3, block_size=64 * 1024)
+
+    compressed = b"".join(deflater.compress(payload[i : i + 70_000]) for i in range(0, len(payload), 70_000))
+    compressed += deflater.flush()
+
+    assert file_ops.zlib.decompress(compressed, -15) == payload
+
+
+def test_parallel_members_round_trip_through_zipfile(monkeypatch):
+    monkeypatch.setattr(file_ops, "PARALLEL_BLOCK_SIZE", 32 * 1024)
+    policy = CompressionPolicy(level=1, threads=2)
+    payload = b"<triangle v1='0' v2='1' v3='2'/>\n" * 20_000
+    buffer = io.BytesIO()
+
+    with policy.open_archive(buffer) as zip_out:
+        with open_zip_member(zip_out, "3D/Objects/big.model", compression=policy) as stream:
+            stream.write(payload)
+        write_zip_member(zip_out, "Metadata/blob.bin", payload, policy)
+        write_zip_member(zip_out, "small.txt", "tiny", policy)
+
+    with zipfile.ZipFile(buffer) as zip_in:
+        assert zip_in.testzip() is None
+        assert zip_in.read("3D/Objects/big.model") == payload
+        assert zip_in.read("Metadata/blob.bin") == payload
+        assert zip_in.getinfo("3D/Objects/big.model").compress_size < len(payload) // 10
+
+
+def test_decompress_zip_extracts_only_selected_members(tmp_path):
+    archive_path = tmp_path / "archive.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("3D/Objects/object_1.model", "<model/>")
+        archive.writestr("Metadata/plate_1.gcode", "G1")
+
+    target = file_ops.decompress_zip(str(archive_path), str(tmp_path / "out"), ["3D/Objects/object_1.model"])
+
+    assert (tmp_path / "out" / "3D" / "Objects" / "object_1.model").exists()
+    assert not (tmp_path / "out" / "Metadata").exists()
+    assert target == str(tmp_path / "out")
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, chunk):
+        self.data += chunk
+        return len(chunk)
+
+
+def _raw_bytes(archive, name):
+    info = archive.getinfo(name)
+    with archive.open(info) as member:
+        return member._fileobj.read(info.compress_size)
+
+
+def _source_archive():
+    # Written to an unseekable stream, so members carry data descriptors.
+    target = _Unseekable()
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("Metadata/plate_1.png", os.urandom(2000) + bytes(50_000))
+        archive.writestr("Metadata/notes.txt", "stored", compress_type=zipfile.ZIP_STORED)
+    return zipfile.ZipFile(io.BytesIO(bytes(target.data)))
+
+
+@pytest.mark.parametrize("seekable", [True, False])
+def test_raw_copy_transfers_compressed_bytes_unchanged(seekable):
+    source = _source_archive()
+    assert source.getinfo("Metadata/plate_1.png").flag_bits & 0x08
+    target = io.BytesIO() if seekable else _Unseekable()
+
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("first.txt", "x")
+        for info in source.infolist():
+            file_ops.copy_zip_member_raw(source, info, archive)
+        file_ops.copy_zip_member_raw(source, "Metadata/plate_1.png", archive, "Metadata/thumbnail.png")
+
+    data = target.getvalue() if seekable else bytes(target.data)
+    with zipfile.ZipFile(io.BytesIO(data)) as copied:
+        assert copied.testzip() is None
+        for name in ("Metadata/plate_1.png", "Metadata/notes.txt"):
+            original, copy = source.getinfo(name), copied.getinfo(name)
+            assert (copy.CRC, copy.compress_type, copy.compress_size) == (
+                original.CRC,
+                original.compress_type,
+                original.compress_size,
+            )
+            assert _raw_bytes(copied, name) == _raw_bytes(source, name)
+            assert copied.read(name) == source.read(name)
+        assert copied.read("Metadata/thumbnail.png") == source.read("Metadata/plate_1.png")
+
+
+def test_raw_copy_refuses_while_a_member_is_open():
+    source = _source_archive()
+    with zipfile.ZipFile(io.BytesIO(), "w") as archive, archive.open("open.txt", "w"):
+        with pytest.raises(ValueError):
+            file_ops.copy_zip_member_raw(source, "Metadata/plate_1.png", archive)
+
+
+def test_copy_zip_member_inflates_for_stored_archives():
+    source = _source_archive()
+    policy = CompressionPolicy.from_preset("store")
+    target = io.BytesIO()
+
+    with policy.open_archive(target) as archive:
+        inflated = file_ops.copy_zip_member(source, "Metadata/plate_1.png", archive, policy)
+        kept = file_ops.copy_zip_member(source, "Metadata/notes.txt", archive, policy)
+
+    assert inflated.compress_type == kept.compress_type == zipfile.ZIP_STORED
+    with zipfile.ZipFile(target) as copied:
+        assert copied.read("Metadata/plate_1.png") == source.read("Metadata/plate_1.png")
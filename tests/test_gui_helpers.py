@@ -1,6 +1,12 @@
 """Tests for frontend helpers that don't require a display."""
 
-from frontends.common import first_existing_dir
+import threading
+import time
+
+import pytest
+
+from bambu_to_prusa.progress import ProgressUpdate
+from frontends.common import describe_progress, first_existing_dir, format_duration
 
 
 def test_first_existing_dir_returns_first_existing(tmp_path):
@@ -13,3 +19,128 @@ def test_first_existing_dir_returns_first_existing(tmp_path):
 
 def test_first_existing_dir_skips_missing(tmp_path):
     assert first_existing_dir(str(tmp_path / "missing")) is None
+
+
+def test_format_duration():
+    assert format_duration(None) == "--:--"
+    assert format_duration(65.4) == "1:05"
+    assert format_duration(3725) == "1:02:05"
+
+
+def test_describe_progress_includes_eta():
+    update = ProgressUpdate(0.25, 25, 100, 1, 4, 1_500_000, elapsed_s=10.0, eta_s=30.0)
+
+    assert describe_progress(update) == "25% | 1/4 models | 1.5M triangles | ETA 0:30"
+
+
+def _run_to_end(job):
+    assert job.join(timeout=30)
+    return job.drain()
+
+
+def test_background_conversion_posts_progress_then_finished(tmp_path):
+    from bambu_to_prusa.converter import BambuToPrusaConverter
+    from frontends.common.worker import FINISHED, PROGRESS, BackgroundConversion
+    from test_converter import create_valid_bambu_archive
+
+    output = tmp_path / "out.3mf"
+    job = BackgroundConversion(BambuToPrusaConverter(), str(create_valid_bambu_archive(tmp_path)), str(output))
+
+    events = _run_to_end(job.start())
+
+    assert events[0][0] == PROGRESS
+    assert events[-1] == (FINISHED, str(output))
+    assert output.exists()
+
+
+def test_background_conversion_cancel_removes_output(tmp_path):
+    from bambu_to_prusa.converter import BambuToPrusaConverter
+    from frontends.common.worker import CANCELLED, BackgroundConversion
+    from test_converter import create_multi_model_archive
+
+    output = tmp_path / "out.3mf"
+    job = BackgroundConversion(BambuToPrusaConverter(), str(create_multi_model_archive(tmp_path)), str(output))
+    job.cancel()
+
+    events = _run_to_end(job.start())
+
+    assert events == [(CANCELLED, None)]
+    assert not output.exists()
+
+
+def test_background_conversion_reports_failures(tmp_path):
+    from bambu_to_prusa.converter import BambuToPrusaConverter
+    from frontends.common.worker import FAILED, BackgroundConversion
+
+    job = BackgroundConversion(BambuToPrusaConverter(), str(tmp_path / "missing.3mf"), str(tmp_path / "out.3mf"))
+
+    (kind, error), = _run_to_end(job.start())
+
+    assert kind == FAILED
+    assert isinstance(error, FileNotFoundError)
+
+
+def test_tkinter_close_cancels_and_waits_for_the_conversion(tmp_path, monkeypatch):
+    tkinter_main = pytest.importorskip("frontends.tkinter.main")
+    from types import SimpleNamespace
+
+    from bambu_to_prusa.converter import BambuToPrusaConverter
+    from frontends.common.worker import BackgroundConversion
+    from test_converter import create_multi_model_archive
+
+    started = threading.Event()
+
+    def stalled(self, input_file, zip_in, members, zip_out, tracker=None, cancel=None, transforms=None):
+        started.set()
+        while True:
+            cancel.check()
+            time.sleep(0.01)
+
+    monkeypatch.setattr(BambuToPrusaConverter, "_write_models", stalled)
+    output = tmp_path / "out.3mf"
+    job = BackgroundConversion(BambuToPrusaConverter(), str(create_multi_model_archive(tmp_path)), str(output))
+    calls = []
+    master = SimpleNamespace(after_cancel=calls.append, destroy=lambda: calls.append(job.running))
+    gui = SimpleNamespace(job=job.start(), _poll_id="after#1", master=master)
+    assert started.wait(30)
+
+    tkinter_main.ZipProcessorGUI.close(gui)
+
+    assert calls == ["after#1", False]
+    assert not output.exists()
+
+
+def test_pyqt6_conversion_worker_signals(tmp_path):
+    pytest.importorskip("PyQt6.QtCore")
+    from bambu_to_prusa.converter import BambuToPrusaConverter
+    from frontends.pyqt6.main import ConversionWorker
+    from test_converter import create_valid_bambu_archive
+
+    output = tmp_path / "out.3mf"
+    worker = ConversionWorker(BambuToPrusaConverter(), str(create_valid_bambu_archive(tmp_path)), str(output))
+    updates, finished = [], []
+    worker.progress.connect(updates.append)
+    worker.finished.connect(finished.append)
+
+    worker.run()
+
+    assert finished == [str(output)]
+    assert updates[-1].finished
+
+
+def test_pyqt6_conversion_worker_cancel(tmp_path):
+    pytest.importorskip("PyQt6.QtCore")
+    from bambu_to_prusa.converter import BambuToPrusaConverter
+    from frontends.pyqt6.main import ConversionWorker
+    from test_converter import create_valid_bambu_archive
+
+    output = tmp_path / "out.3mf"
+    worker = ConversionWorker(BambuToPrusaConverter(), str(create_valid_bambu_archive(tmp_path)), str(output))
+    cancelled = []
+    worker.cancelled.connect(lambda: cancelled.append(True))
+
+    worker.cancel()
+    worker.run()
+
+    assert cancelled == [True]
+    assert not output.exists()
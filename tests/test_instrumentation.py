@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from bambu_to_prusa.converter import BambuToPrusaConverter
+from bambu_to_prusa.instrumentation import ConversionObserver, StageRecorder, measure
+from bambu_to_prusa.result_cache import ResultCache
+from test_converter import create_multi_model_archive, create_valid_bambu_archive
+
+
+def test_converter_reports_each_stage(tmp_path):
+    archive_path = create_valid_bambu_archive(tmp_path)
+    recorder = StageRecorder()
+
+    BambuToPrusaConverter(observer=recorder).convert_archive(str(archive_path), str(tmp_path / "out.3mf"))
+
+    assert [stats.stage for stats in recorder.stages] == [
+        "extract_model_objects",
+        "write_model_file",
+        "build_package",
+        "convert_archive",
+    ]
+    extract, write, package, archive = recorder.stages
+    assert extract.detail == write.detail == "bambu.model"
+    assert extract.wall_s <= write.wall_s <= archive.wall_s
+    assert write.bytes_in > 0 and write.bytes_out > 0
+    assert package.bytes_out > 0
+    assert archive.bytes_in == archive_path.stat().st_size
+    assert archive.bytes_out == (tmp_path / "out.3mf").stat().st_size
+
+
+def test_parallel_conversion_reports_worker_time(tmp_path):
+    archive_path = create_multi_model_archive(tmp_path)
+    recorder = StageRecorder()
+
+    BambuToPrusaConverter(workers=2, observer=recorder).convert_archive(str(archive_path), str(tmp_path / "out.3mf"))
+
+    totals = recorder.totals()
+    assert totals["write_model_file"]["count"] == 3
+    assert totals["write_model_file"]["cpu_s"] > 0
+
+
+def test_cache_stages_are_reported(tmp_path):
+    archive_path = create_valid_bambu_archive(tmp_path)
+    cache = ResultCache(tmp_path / "cache")
+    converter = BambuToPrusaConverter(cache=cache)
+    converter.convert_archive(str(archive_path), str(tmp_path / "first.3mf"))
+
+    converter.observer = recorder = StageRecorder()
+    converter.convert_archive(str(archive_path), str(tmp_path / "second.3mf"))
+
+    assert [stats.stage for stats in recorder.stages] == ["cache_lookup", "convert_archive"]
+    assert recorder.stages[0].bytes_out == (tmp_path / "second.3mf").stat().st_size
+
+
+def test_failed_stage_is_not_reported():
+    events = []
+
+    class Observer(ConversionObserver):
+        def stage_started(self, stage, detail=None):
+            events.append(("start", stage))
+
+        def stage_finished(self, stats):
+            events.append(("finish", stats.stage))
+
+    with pytest.raises(RuntimeError):
+        with measure(Observer(), "broken"):
+            raise RuntimeError("boom")
+
+    assert events == [("start", "broken")]
+
+
+def test_stage_report_is_json_serialisable():
+    recorder = StageRecorder()
+    with measure(recorder, "one") as stats:
+        stats.bytes_in = 10
+    with measure(recorder, "one") as stats:
+        stats.bytes_in = 5
+
+    report = json.loads(recorder.to_json())
+
+    assert report["totals"]["one"]["count"] == 2
+    assert report["totals"]["one"]["bytes_in"] == 15
+    assert len(report["stages"]) == 2
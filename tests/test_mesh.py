@@ -0,0 +1,81 @@
+import lxml.etree as ET
+import pytest
+
+from bambu_to_prusa import mesh as mesh_module
+from bambu_to_prusa.mesh import Mesh
+from bambu_to_prusa.model_processing import MODEL_NAMESPACE, SLIC3R_NAMESPACE
+
+OBJECT_XML = """<object xmlns="http://www.bambulab.com/schemas/3mf/2023" id="1" type="model">
+  <mesh>
+    <vertices>
+      <vertex x="0" y="0" z="0" />
+      <vertex x="10.5" y="0" z="-1.25" />
+      <vertex x="0" y="20" z="3" />
+      <vertex x="1e-05" y="4" z="2" />
+    </vertices>
+    <triangles>
+      <triangle v1="0" v2="1" v3="2" paint_color="4" />
+      <triangle v1="0" v2="2" v3="3" />
+      <triangle v1="1" v2="2" v3="3" paint_color="0C" />
+    </triangles>
+  </mesh>
+</object>
+"""
+
+
+@pytest.fixture(params=["numpy", "array"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(mesh_module, "np", None)
+    return request.param
+
+
+def test_mesh_parses_vertices_triangles_and_paint(backend):
+    mesh = Mesh.from_xml(OBJECT_XML)
+
+    assert (mesh.vertex_count, mesh.triangle_count) == (4, 3)
+    assert [list(row) for row in mesh_module._rows(mesh.triangles)] == [[0, 1, 2], [0, 2, 3], [1, 2, 3]]
+    assert mesh.paint == {0: "4", 2: "0C"}
+    assert mesh.bounds() == ((0.0, 0.0, -1.25), (10.5, 20.0, 3.0))
+
+
+def test_mesh_round_trips_through_prusa_xml(backend):
+    mesh = Mesh.from_xml(OBJECT_XML)
+
+    element = mesh.to_element()
+
+    assert element.tag == f"{{{MODEL_NAMESPACE}}}mesh"
+    triangles = element.findall(f"{{{MODEL_NAMESPACE}}}triangles/{{{MODEL_NAMESPACE}}}triangle")
+    assert triangles[2].get(f"{{{SLIC3R_NAMESPACE}}}mmu_segmentation") == "0C"
+    assert element.find(f".//{{{MODEL_NAMESPACE}}}vertex").attrib == {"x": "0", "y": "0", "z": "0"}
+    again = Mesh.from_element(element)
+    assert again.paint == mesh.paint
+    assert again.bounds() == mesh.bounds()
+    assert again.to_xml() == mesh.to_xml()
+
+
+def test_mesh_float32_is_compact_and_round_trips(backend):
+    mesh = Mesh.from_xml(OBJECT_XML, dtype="float32")
+
+    assert mesh.nbytes < Mesh.from_xml(OBJECT_XML).nbytes
+    wrapped = f'<object xmlns:slic3rpe="{SLIC3R_NAMESPACE}">{mesh.to_xml()}</object>'
+    assert Mesh.from_xml(wrapped, dtype="float32").to_xml() == mesh.to_xml()
+
+
+def test_mesh_accepts_rows_and_rejects_ragged_arrays(backend):
+    mesh = Mesh([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [(0, 1, 2)])
+
+    assert mesh.to_xml().count("<vertex ") == 3
+    assert Mesh().bounds() is None
+    with pytest.raises(ValueError):
+        Mesh([0.0, 1.0])
+    with pytest.raises(ValueError):
+        Mesh(dtype="float16")
+
+
+def test_mesh_without_mesh_element_is_empty(backend):
+    mesh = Mesh.from_element(ET.fromstring('<object id="2" type="support"/>'))
+
+    assert (mesh.vertex_count, mesh.triangle_count, mesh.paint) == (0, 0, {})
@@ -1,6 +1,16 @@
+import io
+
 import lxml.etree as ET
 
-from bambu_to_prusa.model_processing import clean_model_content, convert_model_file, extract_model_objects
+from bambu_to_prusa import model_processing
+from bambu_to_prusa.model_processing import (
+    SLIC3R_NAMESPACE,
+    clean_model_content,
+    convert_model_file,
+    extract_model_objects,
+    iter_model_objects,
+    iter_streamed_objects,
+)
 
 
 SAMPLE_XML = """<?xml version='1.0' encoding='UTF-16'?>
@@ -43,3 +53,86 @@ def test_convert_model_file_reads_and_converts(tmp_path):
     assert filename == "test.model"
     assert "1" in objects
     assert objects["1"].tag.endswith("object")
+
+
+PAINTED_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<model xmlns="http://www.bambulab.com/schemas/3mf/2023" xmlns:p="http://schemas.microsoft.com/3dmanufacturing/production/2015/06">
+  <resources>
+    <object id="3" type="model" p:UUID="abc">
+      <mesh>
+        <triangles>
+          <triangle v1="0" v2="1" v3="2" paint_color="4" paint_seam="8" />
+        </triangles>
+      </mesh>
+    </object>
+    <object id="4" type="model"><mesh /></object>
+  </resources>
+</model>
+"""
+
+
+def test_iter_model_objects_streams_from_binary_file(monkeypatch):
+    monkeypatch.setattr(model_processing, "READ_CHUNK_SIZE", 16)
+
+    objects = list(iter_model_objects(io.BytesIO(PAINTED_XML.encode("utf-8"))))
+
+    assert [object_id for object_id, _ in objects] == ["3", "4"]
+    element = objects[0][1]
+    assert element.tag == f"{{{model_processing.MODEL_NAMESPACE}}}object"
+    assert not any(name.endswith("UUID") for name in element.attrib)
+
+    triangle = element.find(".//{*}triangle")
+    assert triangle.attrib[f"{{{SLIC3R_NAMESPACE}}}mmu_segmentation"] == "4"
+    assert "paint_color" not in triangle.attrib
+    assert "paint_seam" not in triangle.attrib
+
+
+def test_model_parsers_are_reused_within_a_thread():
+    list(iter_model_objects(PAINTED_XML.encode("utf-8")))
+    parser = model_processing._parser_cache.pools[model_processing.OBJECT_PARSER][-1]
+
+    list(iter_model_objects(PAINTED_XML.encode("utf-8")))
+
+    assert model_processing._parser_cache.pools[model_processing.OBJECT_PARSER][-1] is parser
+
+
+def _objects_xml(prefix, count):
+    objects = "".join(f'<object id="{prefix}{index}" type="model"><mesh /></object>' for index in range(count))
+    return f'<model xmlns="http://example.com"><resources>{objects}</resources></model>'.encode("utf-8")
+
+
+def test_aborted_parse_does_not_leak_objects_into_the_next_one():
+    objects = iter_model_objects(_objects_xml("a", 3))
+    assert next(objects)[0] == "a0"
+    try:
+        objects.throw(RuntimeError("abort"))
+    except RuntimeError:
+        pass
+
+    assert [object_id for object_id, _ in iter_model_objects(_objects_xml("b", 2))] == ["b0", "b1"]
+
+
+def test_streamed_objects_match_tree_objects(monkeypatch):
+    monkeypatch.setattr(model_processing, "READ_CHUNK_SIZE", 16)
+    source = PAINTED_XML.replace('v3="2"', 'v3="2" name="a &amp; &lt;b&gt;"').encode("utf-8")
+
+    written = []
+    for object_id, streamed in iter_streamed_objects(io.BytesIO(source)):
+        buffer = io.BytesIO()
+        streamed.write_to(buffer.write)
+        written.append((object_id, buffer.getvalue()))
+
+    blank = ET.XMLParser(remove_blank_text=True)
+    expected = [
+        (object_id, ET.tostring(ET.fromstring(ET.tostring(element), blank), method="c14n", exclusive=True))
+        for object_id, element in iter_model_objects(source)
+    ]
+    assert [
+        (object_id, ET.tostring(ET.fromstring(data, blank), method="c14n", exclusive=True)) for object_id, data in written
+    ] == expected
+
+
+def test_streamed_objects_skip_unwritten_objects():
+    objects = iter_streamed_objects(PAINTED_XML.encode("utf-8"))
+
+    assert [object_id for object_id, _ in objects] == ["3", "4"]
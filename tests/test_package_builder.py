@@ -0,0 +1,55 @@
+import io
+import zipfile
+
+import lxml.etree as ET
+
+from bambu_to_prusa.model_processing import DEFAULT_TRANSFORM, iter_model_objects
+from bambu_to_prusa.package_builder import stream_model_member, write_prusa_model
+from bambu_to_prusa.template_registry import get_template_registry
+
+from test_converter import BAMBU_MODEL_XML
+
+TWO_OBJECTS_XML = BAMBU_MODEL_XML.replace(
+    '<object id="2" type="support" />', '<object id="2" type="model"><mesh /></object>'
+)
+
+
+def test_write_prusa_model_streams_objects_and_build_items():
+    buffer = io.BytesIO()
+
+    written = write_prusa_model(
+        buffer, iter_model_objects(TWO_OBJECTS_XML.encode("utf-8")), get_template_registry().model_tree()
+    )
+
+    assert written == ["1", "2"]
+    root = ET.fromstring(buffer.getvalue())
+    assert root.attrib["{http://www.w3.org/XML/1998/namespace}lang"] == "en-US"
+    assert [obj.attrib["id"] for obj in root.findall("{*}resources/{*}object")] == ["1", "2"]
+    items = root.findall("{*}build/{*}item")
+    assert [item.attrib["objectid"] for item in items] == ["1", "2"]
+    assert all(item.attrib["transform"] == DEFAULT_TRANSFORM for item in items)
+    assert root.find("{*}metadata[@name='Application']") is not None
+
+
+def test_write_prusa_model_pretty_print_is_optional():
+    compact = io.BytesIO()
+    pretty = io.BytesIO()
+    single_line = b'<model><resources><object id="1" type="model"><mesh><vertices><vertex x="0"/></vertices></mesh></object></resources></model>'
+
+    write_prusa_model(compact, iter_model_objects(single_line), get_template_registry().model_tree())
+    write_prusa_model(pretty, iter_model_objects(single_line), get_template_registry().model_tree(), pretty_print=True)
+
+    assert b"<mesh><vertices><vertex" in compact.getvalue()
+    assert b"<mesh><vertices>" not in pretty.getvalue()
+
+
+def test_stream_model_member_writes_into_zip():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zip_out:
+        arcname = stream_model_member(
+            iter_model_objects(BAMBU_MODEL_XML.encode("utf-8")), "part.model", get_template_registry().model_tree(), zip_out
+        )
+
+    with zipfile.ZipFile(buffer) as zip_in:
+        assert arcname == "3D/Objects/part.model"
+        assert ET.fromstring(zip_in.read(arcname)).find(".//{*}object") is not None
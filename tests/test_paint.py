@@ -0,0 +1,117 @@
+import io
+import logging
+
+import pytest
+
+from bambu_to_prusa import paint
+from bambu_to_prusa.model_processing import SLIC3R_NAMESPACE, iter_model_objects, iter_streamed_objects
+from bambu_to_prusa.paint import (
+    LEAF_CODES,
+    PaintError,
+    PaintTranscoder,
+    decode_segmentation,
+    encode_segmentation,
+    remap_states,
+)
+
+SEGMENTATION = f"{{{SLIC3R_NAMESPACE}}}mmu_segmentation"
+
+
+@pytest.mark.parametrize("code, state", [("0", 0), ("4", 1), ("8", 2), ("0C", 3), ("1C", 4), ("2FC", 20), ("0FFC", 33)])
+def test_leaf_codes_round_trip(code, state):
+    assert decode_segmentation(code) == state
+    assert encode_segmentation(state) == code
+
+
+def test_split_tree_round_trips():
+    tree = (1, 2, (1, (3, 0, (0, 2, 1, 4))))
+
+    code = encode_segmentation(tree)
+
+    assert decode_segmentation(code) == tree
+    assert decode_segmentation(code.lower()) == tree
+    assert LEAF_CODES[4] == "1C"
+
+
+@pytest.mark.parametrize("code", ["", "G", "3", "48", "4C3", "FFFFFFFF"])
+def test_invalid_codes_are_rejected(code):
+    with pytest.raises(PaintError):
+        decode_segmentation(code)
+
+
+def test_remap_states_swaps_leaves():
+    tree = (1, 0, (1, 2))
+
+    assert remap_states(tree, {1: 2, 2: 1}) == (1, 0, (2, 1))
+    assert remap_states(3, {1: 2}) == 3
+
+
+def test_transcoder_remaps_and_memoises(monkeypatch):
+    transcoder = PaintTranscoder({1: 2})
+    calls = []
+    monkeypatch.setattr(paint, "decode_segmentation", lambda code: calls.append(code) or decode_segmentation(code))
+
+    assert [transcoder(code) for code in ("4", "4", "8", "0C")] == ["8", "8", "8", "0C"]
+    assert calls == ["4", "8", "0C"]
+    assert transcoder.options() == {"extruder_map": [(1, 2)]}
+
+
+def test_transcoder_drops_invalid_codes_with_one_warning(caplog):
+    transcoder = PaintTranscoder()
+
+    with caplog.at_level(logging.WARNING):
+        assert transcoder("48") is None
+        assert transcoder("48") is None
+
+    assert transcoder.invalid_codes == 1
+    assert len(caplog.records) == 1
+    with pytest.raises(PaintError):
+        PaintTranscoder(strict=True)("48")
+    with pytest.raises(ValueError):
+        PaintTranscoder({1: -1})
+
+
+def test_transcoder_cache_is_bounded():
+    transcoder = PaintTranscoder(cache_size=2)
+
+    for code in ("4", "8", "0C"):
+        transcoder(code)
+
+    assert len(transcoder._cache) <= 2
+
+
+PAINTED_MODEL = b"""<?xml version="1.0" encoding="UTF-8"?>
+<model xmlns="http://www.bambulab.com/schemas/3mf/2023">
+  <resources>
+    <object id="1" type="model">
+      <mesh>
+        <vertices><vertex x="0" y="0" z="0" /><vertex x="1" y="0" z="0" /><vertex x="0" y="1" z="0" /></vertices>
+        <triangles>
+          <triangle v1="0" v2="1" v3="2" paint_color="4" />
+          <triangle v1="0" v2="1" v3="2" paint_color="48" />
+          <triangle v1="0" v2="1" v3="2" />
+        </triangles>
+      </mesh>
+    </object>
+  </resources>
+</model>
+"""
+
+
+def _streamed_states(transcoder):
+    buffer = io.BytesIO()
+    for _, streamed in iter_streamed_objects(io.BytesIO(PAINTED_MODEL), transcoder=transcoder):
+        streamed.write_to(buffer.write)
+    text = buffer.getvalue().decode("utf-8")
+    return [part.split('"')[1] for part in text.split("mmu_segmentation=")[1:]]
+
+
+def test_model_parsers_transcode_paint():
+    transcoder = PaintTranscoder({1: 2})
+
+    (_, element), = iter_model_objects(io.BytesIO(PAINTED_MODEL), transcoder=transcoder)
+    states = [triangle.get(SEGMENTATION) for triangle in element.iter("{*}triangle")]
+
+    assert states == ["8", None, None]
+    assert not any("paint_color" in triangle.attrib for triangle in element.iter("{*}triangle"))
+    assert _streamed_states(transcoder) == ["8"]
@@ -0,0 +1,176 @@
+import itertools
+import zipfile
+
+import lxml.etree as ET
+import pytest
+
+from bambu_to_prusa import placement
+from bambu_to_prusa.archive_index import read_build_transforms
+from bambu_to_prusa.converter import BambuToPrusaConverter
+from bambu_to_prusa.model_processing import DEFAULT_TRANSFORM
+from bambu_to_prusa.placement import (
+    BuildLayout,
+    arrange,
+    compose,
+    format_transform,
+    parse_transform,
+    world_bounds,
+)
+
+from test_converter import BAMBU_CONTENT_TYPES, BAMBU_RELS
+
+CUBE_MODEL = """<?xml version="1.0" encoding="UTF-8"?>
+<model unit="millimeter" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">
+ <resources>
+  <object id="1" type="model">
+   <mesh>
+    <vertices>
+     <vertex x="0" y="0" z="0"/><vertex x="20" y="0" z="0"/><vertex x="0" y="10" z="0"/><vertex x="0" y="0" z="5"/>
+    </vertices>
+    <triangles>
+     <triangle v1="0" v2="1" v3="2"/><triangle v1="0" v2="1" v3="3"/>
+    </triangles>
+   </mesh>
+  </object>
+ </resources>
+</model>
+"""
+
+ROOT_MODEL = """<?xml version="1.0" encoding="UTF-8"?>
+<model unit="millimeter" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+       xmlns:p="http://schemas.microsoft.com/3dmanufacturing/production/2015/06" requiredextensions="p">
+ <resources>
+  <object id="2" type="model">
+   <components>
+    <component p:path="/3D/Objects/object_1.model" objectid="1" transform="1 0 0 0 1 0 0 0 1 0 0 2"/>
+   </components>
+  </object>
+ </resources>
+ <build>
+  <item objectid="2" transform="1 0 0 0 1 0 0 0 1 100 50 0"/>
+  <item objectid="2" transform="0 1 0 -1 0 0 0 0 1 30 40 0"/>
+ </build>
+</model>
+"""
+
+
+def create_bambu_project(tmp_path):
+    archive_path = tmp_path / "project.3mf"
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", BAMBU_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", BAMBU_RELS)
+        archive.writestr("3D/3dmodel.model", ROOT_MODEL)
+        archive.writestr("3D/Objects/object_1.model", CUBE_MODEL)
+    return archive_path
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(placement, "np", None)
+    return request.param
+
+
+def test_compose_applies_inner_then_outer():
+    rotate = parse_transform("0 1 0 -1 0 0 0 0 1 0 0 0")
+    shift = parse_transform("1 0 0 0 1 0 0 0 1 10 0 0")
+
+    assert compose(shift, rotate) == pytest.approx(parse_transform("0 1 0 -1 0 0 0 0 1 0 10 0"))
+    assert compose(rotate, shift) == pytest.approx(parse_transform("0 1 0 -1 0 0 0 0 1 10 0 0"))
+    assert parse_transform(None) == placement.IDENTITY
+    assert format_transform(placement.IDENTITY) == placement.IDENTITY_TRANSFORM
+    with pytest.raises(ValueError):
+        parse_transform("1 0 0")
+
+
+def test_read_build_transforms_composes_items_and_components(tmp_path):
+    with zipfile.ZipFile(create_bambu_project(tmp_path)) as archive:
+        transforms = read_build_transforms(archive)
+
+    assert transforms == {
+        "3D/Objects/object_1.model": {
+            "1": ["1 0 0 0 1 0 0 0 1 100 50 2", "0 1 0 -1 0 0 0 0 1 30 40 2"],
+        }
+    }
+
+
+def test_converter_carries_over_project_placement(tmp_path):
+    output_path = tmp_path / "prusa.3mf"
+
+    BambuToPrusaConverter().convert_archive(str(create_bambu_project(tmp_path)), str(output_path))
+
+    with zipfile.ZipFile(output_path) as archive:
+        model = archive.read("3D/Objects/object_1.model").decode("utf-8")
+    assert 'transform="1 0 0 0 1 0 0 0 1 100 50 2"' in model
+    assert 'transform="0 1 0 -1 0 0 0 0 1 30 40 2"' in model
+
+
+def _placed_boxes(layout, object_bounds):
+    instances = layout.instances(list(object_bounds))
+    matrices = [parse_transform(transform) for _, transform in instances]
+    lower, upper = world_bounds([object_bounds[object_id] for object_id, _ in instances], matrices)
+    return [(tuple(low), tuple(high)) for low, high in zip(lower, upper)]
+
+
+def test_arrange_places_instances_on_the_bed_without_overlap(backend):
+    cube = ((0.0, 0.0, 0.0), (20.0, 10.0, 5.0))
+    tall = ((-5.0, -5.0, -3.0), (5.0, 25.0, 7.0))
+    layout = BuildLayout(
+        {"1": ["1 0 0 0 1 0 0 0 1 100 50 2"] * 6, "2": ["0 1 0 -1 0 0 0 0 1 30 40 0"] * 3},
+        placement="arrange",
+        bed_size=(250.0, 210.0),
+    )
+    layout.bounds = {"1": cube, "2": tall}
+
+    boxes = _placed_boxes(layout, layout.bounds)
+
+    assert len(boxes) == 9
+    for low, high in boxes:
+        assert low[2] == pytest.approx(0.0)
+        assert low[0] >= 0 and low[1] >= 0 and high[0] <= 250 and high[1] <= 210
+    for (low_a, high_a), (low_b, high_b) in itertools.combinations(boxes, 2):
+        apart_x = high_a[0] <= low_b[0] + 1e-6 or high_b[0] <= low_a[0] + 1e-6
+        apart_y = high_a[1] <= low_b[1] + 1e-6 or high_b[1] <= low_a[1] + 1e-6
+        assert apart_x or apart_y
+
+
+def test_arrange_handles_hundreds_of_instances(backend):
+    count = 400
+    boxes = [((0.0, 0.0, 0.0), (4.0, 3.0, 1.0))] * count
+    placed = arrange(boxes, [placement.IDENTITY] * count, bed_size=(250.0, 210.0), spacing=2.0)
+
+    lower, upper = world_bounds(boxes, placed)
+    corners = {(round(low[0], 6), round(low[1], 6)) for low in lower}
+    assert len(corners) == count
+    assert min(low[0] for low in lower) >= 0 and max(high[0] for high in upper) <= 250
+
+
+def test_layout_falls_back_to_default_transform():
+    layout = BuildLayout({"1": [None]})
+    layout.local_transforms = {"2": ["1 0 0 0 1 0 0 0 1 5 5 0"]}
+
+    assert layout.instances(["1", "2", "3"]) == [
+        ("1", placement.IDENTITY_TRANSFORM),
+        ("2", "1 0 0 0 1 0 0 0 1 5 5 0"),
+        ("3", DEFAULT_TRANSFORM),
+    ]
+    with pytest.raises(ValueError):
+        BuildLayout(placement="scatter")
+
+
+def test_arranged_conversion_matches_in_budget_mode(tmp_path):
+    project = create_bambu_project(tmp_path)
+    outputs = []
+    for max_memory in (None, 1):
+        output_path = tmp_path / f"arranged-{max_memory}.3mf"
+        converter = BambuToPrusaConverter(placement="arrange", bed_size=(200, 200), max_memory=max_memory)
+        converter.convert_archive(str(project), str(output_path))
+        with zipfile.ZipFile(output_path) as archive:
+            model_root = ET.fromstring(archive.read("3D/Objects/object_1.model"))
+        assert model_root.find(".//{*}resources/{*}object/{*}mesh/{*}vertices/{*}vertex") is not None
+        outputs.append(sorted(item.get("transform") for item in model_root.iterfind(".//{*}build/{*}item")))
+
+    assert outputs[0] == outputs[1]
+    assert len(outputs[0]) == 2
@@ -0,0 +1,77 @@
+import pytest
+
+from bambu_to_prusa.converter import BambuToPrusaConverter
+from bambu_to_prusa.progress import ProgressTracker
+from test_converter import create_multi_model_archive, create_valid_bambu_archive
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_tracker_throttles_updates():
+    clock = FakeClock()
+    updates = []
+    tracker = ProgressTracker(updates.append, bytes_total=100, models_total=1, interval=1.0, clock=clock)
+
+    tracker.report(force=True)
+    tracker.advance_bytes(10)
+    clock.now = 0.5
+    tracker.advance_bytes(10)
+    clock.now = 1.0
+    tracker.advance_bytes(30)
+
+    assert [update.bytes_done for update in updates] == [0, 50]
+    assert updates[-1].fraction == pytest.approx(0.5)
+    assert updates[-1].eta_s == pytest.approx(1.0)
+
+
+def test_tracker_holds_back_completion_until_finish():
+    clock = FakeClock()
+    updates = []
+    tracker = ProgressTracker(updates.append, bytes_total=10, models_total=1, interval=0.0, clock=clock)
+
+    tracker.advance_bytes(10)
+    assert updates[-1].fraction < 1.0
+    assert not updates[-1].finished
+
+    clock.now = 2.0
+    tracker.finish()
+    assert updates[-1].finished
+    assert updates[-1].eta_s == 0.0
+    assert updates[-1].elapsed_s == 2.0
+
+
+def test_convert_archive_reports_progress(tmp_path):
+    archive_path = create_valid_bambu_archive(tmp_path)
+    updates = []
+
+    BambuToPrusaConverter(progress_interval=0.0).convert_archive(
+        str(archive_path), str(tmp_path / "out.3mf"), progress=updates.append
+    )
+
+    fractions = [update.fraction for update in updates]
+    assert fractions == sorted(fractions)
+    assert fractions[0] == 0.0 and fractions[-1] == 1.0
+    assert updates[-2].bytes_done == updates[-2].bytes_total > 0
+    assert updates[-1].models_done == 1
+    assert updates[-1].triangles == 1
+    assert any(update.current == "bambu.model" for update in updates)
+
+
+def test_parallel_conversion_reports_models(tmp_path):
+    archive_path = create_multi_model_archive(tmp_path)
+    updates = []
+
+    BambuToPrusaConverter(workers=2, progress_interval=0.0).convert_archive(
+        str(archive_path), str(tmp_path / "out.3mf"), progress=updates.append
+    )
+
+    models_done = [update.models_done for update in updates]
+    assert models_done == sorted(models_done)
+    assert updates[-2].models_done == 3
+    assert updates[-1].finished
@@ -0,0 +1,91 @@
+import os
+import time
+
+import pytest
+
+from bambu_to_prusa.converter import BambuToPrusaConverter
+from bambu_to_prusa.result_cache import ResultCache
+from bambu_to_prusa.template_paths import get_template_paths
+
+from test_converter import create_valid_bambu_archive
+
+
+def test_second_conversion_is_served_from_cache(tmp_path, monkeypatch):
+    archive = create_valid_bambu_archive(tmp_path)
+    cache = ResultCache(tmp_path / "cache")
+    converter = BambuToPrusaConverter(cache=cache)
+
+    converter.convert_archive(str(archive), str(tmp_path / "first.3mf"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached conversions must not be recomputed")
+
+    monkeypatch.setattr("bambu_to_prusa.converter.iter_model_objects", fail)
+    converter.convert_archive(str(archive), str(tmp_path / "second.3mf"))
+
+    assert (tmp_path / "first.3mf").read_bytes() == (tmp_path / "second.3mf").read_bytes()
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.stores == 1
+
+
+def test_hardlinked_hits_share_the_entry(tmp_path):
+    archive = create_valid_bambu_archive(tmp_path)
+    cache = ResultCache(tmp_path / "cache", hardlink=True)
+    converter = BambuToPrusaConverter(cache=cache)
+
+    converter.convert_archive(str(archive), str(tmp_path / "first.3mf"))
+    converter.convert_archive(str(archive), str(tmp_path / "second.3mf"))
+
+    (entry, _), = cache.entries()
+    assert os.path.samefile(entry, tmp_path / "second.3mf")
+
+
+def test_cache_key_covers_inputs_and_options(tmp_path):
+    archive = create_valid_bambu_archive(tmp_path)
+    other = tmp_path / "other.3mf"
+    other.write_bytes(archive.read_bytes() + b"\0")
+    cache = ResultCache(tmp_path / "cache")
+    paths = get_template_paths()
+
+    key = cache.key_for(str(archive), paths)
+
+    assert key == cache.key_for(str(archive), paths)
+    assert key != cache.key_for(str(other), paths)
+    assert key != cache.key_for(str(archive), paths, {"compression": "store"})
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=25)
+    payload = tmp_path / "payload.3mf"
+    payload.write_bytes(b"x" * 10)
+
+    for key in ("aa01", "bb02"):
+        cache.store(key, str(payload))
+        time.sleep(0.01)
+    assert cache.fetch("aa01", str(tmp_path / "out.3mf"))
+    time.sleep(0.01)
+    cache.store("cc03", str(payload))
+
+    remaining = sorted(entry.stem for entry, _ in cache.entries())
+    assert remaining == ["aa01", "cc03"]
+    assert cache.stats.evictions == 1
+    assert cache.size() <= 25
+
+
+@pytest.mark.parametrize("flags", [["--cache-dir"], ["--cache", "--cache-dir"]])
+def test_cli_cache_dir_enables_cache(tmp_path, capsys, flags):
+    import sys
+    from unittest.mock import patch
+
+    from frontends.cli.main import main
+
+    archive = create_valid_bambu_archive(tmp_path)
+    argv = ["bambu2prusa-cli", str(archive), str(tmp_path / "out.3mf"), *flags, str(tmp_path / "cache")]
+    with patch.object(sys, "argv", argv):
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 0
+
+    assert "Cache: 0 hit(s), 1 miss(es)" in capsys.readouterr().out
+    assert ResultCache(tmp_path / "cache").entries()
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import socket
+import struct
+import sys
+import threading
+import time
+import zipfile
+
+import pytest
+
+from bambu_to_prusa.async_converter import AsyncConverter
+from bambu_to_prusa.converter import BambuToPrusaConverter
+from frontends.server.main import ConversionServer, is_local_host, main
+from test_converter import create_multi_model_archive
+
+
+async def _request(port, method, path, body=b"", headers=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost"]
+    if headers is None:
+        headers = {"Content-Length": str(len(body))} if body else {}
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    response_headers = dict(line.split(": ", 1) for line in header_lines)
+    return int(status_line.split(" ")[1]), response_headers, payload
+
+
+def _serve(coroutine_factory, **options):
+    """Run *coroutine_factory(server, port)* against a server on an ephemeral port."""
+
+    async def run():
+        server = ConversionServer(AsyncConverter(max_jobs=options.pop("max_jobs", 2)), **options)
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            async with listener:
+                return await coroutine_factory(server, port)
+        finally:
+            await server.converter.aclose()
+
+    return asyncio.run(run())
+
+
+async def _post_stalled(port, body):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"POST /convert HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    return reader, writer
+
+
+def _reset(writer):
+    # Closing with a zero linger time sends RST: the connection is lost, not half-closed.
+    writer.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    writer.transport.abort()
+
+
+def _stall_conversions(monkeypatch):
+    started, stopped = threading.Event(), threading.Event()
+
+    def stalled(self, input_file, zip_in, members, zip_out, tracker=None, cancel=None, transforms=None):
+        started.set()
+        try:
+            while True:
+                cancel.check()
+                time.sleep(0.01)
+        finally:
+            stopped.set()
+
+    monkeypatch.setattr(BambuToPrusaConverter, "_write_models", stalled)
+    return started, stopped
+
+
+def test_convert_streams_back_the_converted_archive(tmp_path):
+    archive_path = create_multi_model_archive(tmp_path)
+    expected = tmp_path / "expected.3mf"
+    BambuToPrusaConverter().convert_archive(str(archive_path), str(expected))
+    body = archive_path.read_bytes()
+
+    async def exercise(server, port):
+        converted = await _request(port, "POST", "/convert?filename=plate.3mf", body)
+        health = await _request(port, "GET", "/healthz")
+        metrics = await _request(port, "GET", "/metrics")
+        return converted, health, metrics
+
+    (status, headers, payload), health, metrics = _serve(exercise)
+
+    assert status == 200
+    assert headers["Content-Type"] == "model/3mf"
+    assert headers["Content-Disposition"] == 'attachment; filename="plate.3mf"'
+    assert int(headers["Content-Length"]) == len(payload)
+    output = tmp_path / "served.3mf"
+    output.write_bytes(payload)
+    with zipfile.ZipFile(output) as served, zipfile.ZipFile(expected) as blocking:
+        assert {name: served.read(name) for name in served.namelist()} == {
+            name: blocking.read(name) for name in blocking.namelist()
+        }
+    assert health[0] == 200 and json.loads(health[2]) == {"status": "ok"}
+    report = json.loads(metrics[2])
+    assert report["converted"] == 1 and report["bytes_in"] == len(body) and report["bytes_out"] == len(payload)
+    assert report["admitted"] == 0 and report["workers"] == 2
+
+
+def test_invalid_requests_are_refused_before_reading_the_body(tmp_path):
+    async def exercise(server, port):
+        return [
+            await _request(port, "POST", "/convert", headers={"Content-Length": "2048"}),
+            await _request(port, "POST", "/convert", headers={"Transfer-Encoding": "chunked"}),
+            await _request(port, "POST", "/convert", b"not a zip"),
+            await _request(port, "GET", "/convert"),
+            await _request(port, "GET", "/missing"),
+        ], server.metrics
+
+    responses, metrics = _serve(exercise, max_upload=1024)
+
+    assert [status for status, _, _ in responses] == [413, 411, 422, 405, 404]
+    assert responses[3][1]["Allow"] == "POST"
+    assert all("error" in json.loads(payload) for _, _, payload in responses)
+    assert (metrics.too_large, metrics.failed) == (1, 1)
+
+
+def test_full_queue_answers_503(tmp_path, monkeypatch):
+    body = create_multi_model_archive(tmp_path).read_bytes()
+    started, stopped = _stall_conversions(monkeypatch)
+
+    async def exercise(server, port):
+        reader, writer = await _post_stalled(port, body)
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        refused = await _request(port, "POST", "/convert", body)
+        _reset(writer)
+        while server.metrics.cancelled == 0:
+            await asyncio.sleep(0.01)
+        return refused, server
+
+    (status, headers, _), server = _serve(exercise, max_jobs=1, max_queue=0)
+
+    assert status == 503 and headers["Retry-After"]
+    assert server.metrics.rejected == 1 and stopped.is_set()
+
+
+def test_lost_connection_cancels_its_conversion(tmp_path, monkeypatch):
+    body = create_multi_model_archive(tmp_path).read_bytes()
+    started, stopped = _stall_conversions(monkeypatch)
+
+    async def exercise(server, port):
+        reader, writer = await _post_stalled(port, body)
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        _reset(writer)
+        while server.metrics.cancelled == 0:
+            await asyncio.sleep(0.01)
+        return server
+
+    server = _serve(exercise)
+
+    assert stopped.is_set()
+    assert server.admitted == 0 and server.converter.running == 0
+
+
+def test_half_closed_client_still_gets_its_archive(tmp_path):
+    body = create_multi_model_archive(tmp_path).read_bytes()
+
+    async def exercise(server, port):
+        reader, writer = await _post_stalled(port, body)
+        writer.write_eof()
+        response = await reader.read()
+        writer.close()
+        return response, server.metrics
+
+    response, metrics = _serve(exercise)
+
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert (metrics.converted, metrics.cancelled) == (1, 0)
+
+
+def test_unexpected_errors_are_answered_with_500(tmp_path, monkeypatch):
+    body = create_multi_model_archive(tmp_path).read_bytes()
+
+    def no_space(prefix):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(sys.modules[ConversionServer.__module__], "create_temp_dir", no_space)
+
+    status, _, payload = _serve(lambda server, port: _request(port, "POST", "/convert", body))
+
+    assert status == 500 and "No space left" in json.loads(payload)["error"]
+
+
+def test_server_listens_locally_unless_allowed():
+    assert is_local_host("127.0.0.1") and is_local_host("::1") and is_local_host("localhost")
+    assert not is_local_host("0.0.0.0") and not is_local_host("farm.example")
+    with pytest.raises(SystemExit):
+        main(["--host", "0.0.0.0"])
@@ -0,0 +1,58 @@
+import os
+import shutil
+
+import lxml.etree as ET
+
+from bambu_to_prusa import template_registry
+from bambu_to_prusa.template_paths import get_template_paths
+from bambu_to_prusa.template_registry import TemplateRegistry, get_template_registry
+
+
+def copy_templates(tmp_path):
+    base = tmp_path / "templates"
+    shutil.copytree(get_template_paths()["base_dir"], base)
+    return get_template_paths(base)
+
+
+def test_registry_parses_each_template_once(tmp_path, monkeypatch):
+    registry = TemplateRegistry(copy_templates(tmp_path))
+    calls = []
+    real_parse = ET.parse
+    monkeypatch.setattr(template_registry.ET, "parse", lambda path: calls.append(path) or real_parse(path))
+
+    first = registry.model_tree()
+    second = registry.model_tree()
+
+    assert len(calls) == 1
+    assert first is not second
+    first.getroot().find(".//{*}resources").append(ET.Element("object"))
+    assert len(second.getroot().find(".//{*}resources")) == 0
+
+
+def test_registry_reloads_changed_templates(tmp_path):
+    paths = copy_templates(tmp_path)
+    registry = TemplateRegistry(paths)
+    original = registry.content_types_bytes()
+
+    content_types = paths["content_types_template"]
+    with open(content_types, "ab") as file_handle:
+        file_handle.write(b"\n")
+    stat = os.stat(content_types)
+    os.utime(content_types, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert registry.content_types_bytes() == original + b"\n"
+
+
+def test_relationship_parts_wrap_children(tmp_path):
+    prefix, suffix = TemplateRegistry(copy_templates(tmp_path)).relationships_parts()
+
+    rels = ET.fromstring(prefix + b'<Relationship Id="rel-1"/>' + suffix)
+
+    assert [child.attrib["Id"] for child in rels] == ["rel-1"]
+
+
+def test_get_template_registry_is_shared_per_base_dir(tmp_path):
+    paths = copy_templates(tmp_path)
+
+    assert get_template_registry(paths) is get_template_registry(get_template_paths(paths["base_dir"]))
+    assert get_template_registry(paths) is not get_template_registry()